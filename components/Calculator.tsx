@@ -1,7 +1,7 @@
 'use client'
 
 import { useState, useEffect, useRef } from 'react'
-import { loadIndices, indicesState } from '@/lib/calculator-indices'
+import { loadIndices, indicesState, isProvisional } from '@/lib/calculator-indices'
 import { calculateRajahinta, formatPrice, getLatestIndex, Improvement, CalculationResult } from '@/lib/calculator'
 import { trackEvent } from '@/lib/analytics'
 import { setOnThemeChange } from '@/lib/theme'
@@ -55,7 +55,11 @@ export function Calculator() {
   } | null>(null)
   const [indicesLoaded, setIndicesLoaded] = useState(false)
   const [dataUpdated, setDataUpdated] = useState<string | null>(null)
-  const [latestIndexMonth, setLatestIndexMonth] = useState<{ year: number; month: number } | null>(null)
+  const [latestIndexMonth, setLatestIndexMonth] = useState<{
+    year: number
+    month: number
+    provisional: boolean
+  } | null>(null)
 
   const resultInfoRef = useRef<HTMLDivElement>(null)
 
@@ -75,7 +79,13 @@ export function Calculator() {
         const raw = indicesState.indicesData?.updated
         if (raw) setDataUpdated(formatFinnishDate(raw))
         const latest = getLatestIndex(indicesState.rakennuskustannusindeksi)
-        if (latest) setLatestIndexMonth({ year: latest.year, month: latest.month })
+        if (latest) {
+          setLatestIndexMonth({
+            year: latest.year,
+            month: latest.month,
+            provisional: isProvisional('rakennuskustannusindeksi', latest.year, latest.month),
+          })
+        }
       }
     })
   }, [])
@@ -491,7 +501,11 @@ export function Calculator() {
             <div style={{ marginTop: '4px', fontSize: '12px', opacity: 0.75 }}>
               Indeksitiedot päivitetty {dataUpdated}
               {latestIndexMonth && (
-                <> · uusin indeksi {monthNames[latestIndexMonth.month - 1].toLowerCase()} {latestIndexMonth.year}</>
+                <>
+                  {' '}
+                  · uusin indeksi {monthNames[latestIndexMonth.month - 1].toLowerCase()} {latestIndexMonth.year}
+                  {latestIndexMonth.provisional && ' (ennakkotieto)'}
+                </>
               )}
             </div>
           )}
@@ -14,7 +14,7 @@ import {
   Tooltip,
   Legend,
 } from 'chart.js'
-import { loadIndicesData } from '@/lib/indices'
+import { loadChartSeries, loadIndicesData } from '@/lib/indices'
 import { setOnThemeChange } from '@/lib/theme'
 import { ChartSection } from './ChartSection'
 
@@ -32,6 +32,50 @@ ChartJS.register(
   Legend
 )
 
+// The x axes are linear in months (year * 12 + month - 1) rather than
+// categories: the LTTB series keep only some months, and a category axis
+// would space them evenly and distort the time scale
+function monthOrdinal(label: string): number {
+  const [year, month] = label.split('-').map(Number)
+  return year * 12 + month - 1
+}
+
+function formatMonth(ordinal: number): string {
+  const year = Math.floor(ordinal / 12)
+  const month = Math.round(ordinal - year * 12) + 1
+  return `${year}-${String(month).padStart(2, '0')}`
+}
+
+function toPoints(labels: string[], values: (number | null)[]): { x: number; y: number | null }[] {
+  return labels.map((label, i) => ({ x: monthOrdinal(label), y: values[i] }))
+}
+
+function monthAxis(textColor: string, gridColor: string) {
+  return {
+    type: 'linear' as const,
+    bounds: 'data' as const,
+    ticks: {
+      color: textColor,
+      maxRotation: 45,
+      minRotation: 45,
+      autoSkip: true,
+      maxTicksLimit: 20,
+      // Ticks on whole years (every 1, 2, 5... years as space allows)
+      stepSize: 12,
+      callback: function (value: any) {
+        return formatMonth(Number(value))
+      },
+    },
+    grid: {
+      color: gridColor,
+    },
+  }
+}
+
+function monthTooltipTitle(items: any[]): string {
+  return items.length > 0 ? formatMonth(items[0].parsed.x) : ''
+}
+
 export function Charts() {
   const newChartRef = useRef<HTMLCanvasElement>(null)
   const oldChartRef = useRef<HTMLCanvasElement>(null)
@@ -76,16 +120,19 @@ export function Charts() {
       }
       setChartInstances({ new: null, old: null, rajaneliohinta: null })
 
-      const data = await loadIndicesData('/data/')
+      // Downsampled chart-ready series; the full snapshot only as a fallback
+      const chartSeries = await loadChartSeries('lttb', '/data/')
+      const views = chartSeries?.views
+      const data = views ? null : await loadIndicesData('/data/')
 
       // A newer load has started (unmount/remount/theme change) — bail out
       if (myId !== loadIdRef.current) return
 
-      if (!data.rakennuskustannusindeksi || typeof data.rakennuskustannusindeksi !== 'object') {
+      if (data && (!data.rakennuskustannusindeksi || typeof data.rakennuskustannusindeksi !== 'object')) {
         throw new Error('Invalid data: rakennuskustannusindeksi is missing or invalid')
       }
 
-      if (!data.markkinahintaindeksi || typeof data.markkinahintaindeksi !== 'object') {
+      if (data && (!data.markkinahintaindeksi || typeof data.markkinahintaindeksi !== 'object')) {
         throw new Error('Invalid data: markkinahintaindeksi is missing or invalid')
       }
 
@@ -105,36 +152,46 @@ export function Charts() {
       const rakennuskustannus: number[] = []
       const markkinahinta: (number | null)[] = []
 
-      try {
-        const newYears = Object.keys(data.rakennuskustannusindeksi)
-          .map(Number)
-          .filter((y) => !isNaN(y))
-          .sort((a, b) => a - b)
-
-        for (const year of newYears) {
-          if (!data.rakennuskustannusindeksi[year] || typeof data.rakennuskustannusindeksi[year] !== 'object') {
-            continue
-          }
-
-          const months = Object.keys(data.rakennuskustannusindeksi[year])
+      if (views) {
+        const view = views.new
+        if (!view) {
+          throw new Error('Invalid data: rakennuskustannusindeksi is missing or invalid')
+        }
+        newLabels.push(...view.labels)
+        rakennuskustannus.push(...(view.series.rakennuskustannusindeksi as number[]))
+        markkinahinta.push(...(view.series.markkinahintaindeksi ?? view.labels.map(() => null)))
+      } else {
+        try {
+          const newYears = Object.keys(data.rakennuskustannusindeksi)
             .map(Number)
-            .filter((m) => !isNaN(m) && m >= 1 && m <= 12)
+            .filter((y) => !isNaN(y))
             .sort((a, b) => a - b)
 
-          for (const month of months) {
-            const rkValue = data.rakennuskustannusindeksi[year][month]
-            const mhValue = data.markkinahintaindeksi[year]?.[month]
+          for (const year of newYears) {
+            if (!data.rakennuskustannusindeksi[year] || typeof data.rakennuskustannusindeksi[year] !== 'object') {
+              continue
+            }
+
+            const months = Object.keys(data.rakennuskustannusindeksi[year])
+              .map(Number)
+              .filter((m) => !isNaN(m) && m >= 1 && m <= 12)
+              .sort((a, b) => a - b)
+
+            for (const month of months) {
+              const rkValue = data.rakennuskustannusindeksi[year][month]
+              const mhValue = data.markkinahintaindeksi[year]?.[month]
 
-            if (typeof rkValue === 'number' && !isNaN(rkValue)) {
-              newLabels.push(`${year}-${String(month).padStart(2, '0')}`)
-              rakennuskustannus.push(rkValue)
-              markkinahinta.push(typeof mhValue === 'number' && !isNaN(mhValue) ? mhValue : null)
+              if (typeof rkValue === 'number' && !isNaN(rkValue)) {
+                newLabels.push(`${year}-${String(month).padStart(2, '0')}`)
+                rakennuskustannus.push(rkValue)
+                markkinahinta.push(typeof mhValue === 'number' && !isNaN(mhValue) ? mhValue : null)
+              }
             }
           }
+        } catch (error) {
+          console.error('Error parsing new indices data:', error)
+          throw new Error('Failed to parse indices data')
         }
-      } catch (error) {
-        console.error('Error parsing new indices data:', error)
-        throw new Error('Failed to parse indices data')
       }
 
       if (newChartRef.current) {
@@ -143,11 +200,10 @@ export function Charts() {
         const newChartInstance = new ChartJS(ctxNew, {
           type: 'line',
           data: {
-            labels: newLabels,
             datasets: [
               {
                 label: 'Rakennuskustannusindeksi',
-                data: rakennuskustannus,
+                data: toPoints(newLabels, rakennuskustannus),
                 borderColor: '#667eea',
                 backgroundColor: 'rgba(102, 126, 234, 0.1)',
                 borderWidth: 2,
@@ -156,7 +212,7 @@ export function Charts() {
               },
               {
                 label: 'Markkinahintaindeksi',
-                data: markkinahinta,
+                data: toPoints(newLabels, markkinahinta),
                 borderColor: '#51cf66',
                 backgroundColor: 'rgba(81, 207, 102, 0.1)',
                 borderWidth: 2,
@@ -185,6 +241,7 @@ export function Charts() {
                 mode: 'index',
                 intersect: false,
                 callbacks: {
+                  title: monthTooltipTitle,
                   label: function (context: any) {
                     return context.dataset.label + ': ' + context.parsed.y.toFixed(2)
                   },
@@ -192,18 +249,7 @@ export function Charts() {
               },
             },
             scales: {
-              x: {
-                ticks: {
-                  color: textColor,
-                  maxRotation: 45,
-                  minRotation: 45,
-                  autoSkip: true,
-                  maxTicksLimit: 20,
-                },
-                grid: {
-                  color: gridColor,
-                },
-              },
+              x: monthAxis(textColor, gridColor),
               y: {
                 ticks: {
                   color: textColor,
@@ -224,7 +270,10 @@ export function Charts() {
       const oldLabels: string[] = []
       const vanhatMarkkinahinta: number[] = []
 
-      if (data.vanhat_markkinahintaindeksi && typeof data.vanhat_markkinahintaindeksi === 'object') {
+      if (views?.old) {
+        oldLabels.push(...views.old.labels)
+        vanhatMarkkinahinta.push(...(views.old.series.vanhat_markkinahintaindeksi as number[]))
+      } else if (data?.vanhat_markkinahintaindeksi && typeof data.vanhat_markkinahintaindeksi === 'object') {
         try {
           const oldYears = Object.keys(data.vanhat_markkinahintaindeksi)
             .map(Number)
@@ -260,11 +309,10 @@ export function Charts() {
         const oldChartInstance = new ChartJS(ctxOld, {
           type: 'line',
           data: {
-            labels: oldLabels,
             datasets: [
               {
                 label: 'Vanhat markkinahintaindeksi',
-                data: vanhatMarkkinahinta,
+                data: toPoints(oldLabels, vanhatMarkkinahinta),
                 borderColor: '#ff6b6b',
                 backgroundColor: 'rgba(255, 107, 107, 0.1)',
                 borderWidth: 2,
@@ -293,6 +341,7 @@ export function Charts() {
                 mode: 'index',
                 intersect: false,
                 callbacks: {
+                  title: monthTooltipTitle,
                   label: function (context: any) {
                     return context.dataset.label + ': ' + context.parsed.y.toFixed(2)
                   },
@@ -300,18 +349,7 @@ export function Charts() {
               },
             },
             scales: {
-              x: {
-                ticks: {
-                  color: textColor,
-                  maxRotation: 45,
-                  minRotation: 45,
-                  autoSkip: true,
-                  maxTicksLimit: 20,
-                },
-                grid: {
-                  color: gridColor,
-                },
-              },
+              x: monthAxis(textColor, gridColor),
               y: {
                 ticks: {
                   color: textColor,
@@ -332,7 +370,10 @@ export function Charts() {
       const rajaneliohintaLabels: string[] = []
       const rajaneliohinta: number[] = []
 
-      if (data.rajaneliohinta_tilasto && typeof data.rajaneliohinta_tilasto === 'object') {
+      if (views?.rajaneliohinta) {
+        rajaneliohintaLabels.push(...views.rajaneliohinta.labels)
+        rajaneliohinta.push(...(views.rajaneliohinta.series.rajaneliohinta_tilasto as number[]))
+      } else if (data?.rajaneliohinta_tilasto && typeof data.rajaneliohinta_tilasto === 'object') {
         try {
           const rajahintaYears = Object.keys(data.rajaneliohinta_tilasto)
             .map(Number)
@@ -368,11 +409,10 @@ export function Charts() {
         const rajaneliohintaChartInstance = new ChartJS(ctxRajahinta, {
           type: 'line',
           data: {
-            labels: rajaneliohintaLabels,
             datasets: [
               {
                 label: 'Rajaneliöhinta (€/m²)',
-                data: rajaneliohinta,
+                data: toPoints(rajaneliohintaLabels, rajaneliohinta),
                 borderColor: '#ffa94d',
                 backgroundColor: 'rgba(255, 169, 77, 0.1)',
                 borderWidth: 2,
@@ -401,6 +441,7 @@ export function Charts() {
                 mode: 'index',
                 intersect: false,
                 callbacks: {
+                  title: monthTooltipTitle,
                   label: function (context: any) {
                     return context.dataset.label + ': ' + context.parsed.y.toFixed(0) + ' €/m²'
                   },
@@ -408,18 +449,7 @@ export function Charts() {
               },
             },
             scales: {
-              x: {
-                ticks: {
-                  color: textColor,
-                  maxRotation: 45,
-                  minRotation: 45,
-                  autoSkip: true,
-                  maxTicksLimit: 20,
-                },
-                grid: {
-                  color: gridColor,
-                },
-              },
+              x: monthAxis(textColor, gridColor),
               y: {
                 ticks: {
                   color: textColor,
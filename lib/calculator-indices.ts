@@ -1,5 +1,5 @@
 // Calculator indices loading and management module
-import { findLatestIndicesFile } from './indices';
+import { loadIndicesData } from './indices';
 
 // Global state for indices - use object for reactivity
 export const indicesState = {
@@ -7,10 +7,20 @@ export const indicesState = {
   markkinahintaindeksi: {} as Record<number, Record<number, number>>,
   vanhatMarkkinahintaindeksi: {} as Record<number, Record<number, number>>,
   rajaneliohinta: null as any,
+  // Provisional (parenthesised in the source PDF) months per series: { series: { year: [months] } }
+  provisional: {} as Record<string, Record<string, number[]>>,
   indicesLoaded: false,
   indicesData: null as any, // Store raw JSON data for charts
 };
 
+/**
+ * Check whether an index value is provisional and may still be revised
+ */
+export function isProvisional(series: string, year: number, month: number): boolean {
+  const months = indicesState.provisional[series]?.[String(year)];
+  return Array.isArray(months) && months.includes(month);
+}
+
 /**
  * Validate indices data structure
  */
@@ -99,15 +109,9 @@ function parseIndexData(
  */
 export async function loadIndices(): Promise<boolean> {
   try {
-    // Find the latest indices file automatically
+    // Resolve the latest indices file via latest.json and load it
     // In Next.js, public/ files are served from root, so use /data/
-    const indicesFile = await findLatestIndicesFile('/data/');
-    const response = await fetch(indicesFile);
-    if (!response.ok) {
-      throw new Error(`Failed to load indices file: ${response.status} ${response.statusText}`);
-    }
-
-    const data = await response.json();
+    const data = await loadIndicesData('/data/');
 
     // Validate data structure
     const validationErrors = validateIndicesData(data);
@@ -138,6 +142,9 @@ export async function loadIndices(): Promise<boolean> {
       indicesState.vanhatMarkkinahintaindeksi = {};
     }
 
+    indicesState.provisional =
+      data.provisional && typeof data.provisional === 'object' ? data.provisional : {};
+
     // Parse rajaneliöhinta safely
     if (data.rajaneliohinta) {
       try {
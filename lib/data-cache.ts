@@ -0,0 +1,94 @@
+// Persistent cache of the parsed indices data in IndexedDB
+
+// One record per snapshot, keyed by the content hash the updater stamps
+// into every published payload (scripts/snapshot_store.py)
+export interface CachedIndices {
+  sha256: string;
+  data: any;
+  stored: number;
+}
+
+const DB_NAME = 'rajahinta';
+const DB_VERSION = 1;
+const STORE_NAME = 'indices';
+
+let dbPromise: Promise<IDBDatabase | null> | null = null;
+
+function openDatabase(): Promise<IDBDatabase | null> {
+  if (!dbPromise) {
+    dbPromise = new Promise((resolve) => {
+      // Not available during prerendering and in some private modes
+      if (typeof indexedDB === 'undefined') {
+        resolve(null);
+        return;
+      }
+      try {
+        const request = indexedDB.open(DB_NAME, DB_VERSION);
+        request.onupgradeneeded = () => {
+          request.result.createObjectStore(STORE_NAME, { keyPath: 'sha256' });
+        };
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => resolve(null);
+        request.onblocked = () => resolve(null);
+      } catch (e) {
+        resolve(null);
+      }
+    });
+  }
+  return dbPromise;
+}
+
+function requestResult<T>(request: IDBRequest<T>): Promise<T> {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+/**
+ * The cached data of a snapshot, or of the most recently stored one when
+ * no hash is given (e.g. offline). Returns null on a miss or any error.
+ */
+export async function readCachedIndices(sha256?: string): Promise<CachedIndices | null> {
+  const db = await openDatabase();
+  if (!db) {
+    return null;
+  }
+  try {
+    const store = db.transaction(STORE_NAME, 'readonly').objectStore(STORE_NAME);
+    if (sha256) {
+      return (await requestResult(store.get(sha256))) ?? null;
+    }
+    const records: CachedIndices[] = await requestResult(store.getAll());
+    return records.reduce<CachedIndices | null>(
+      (newest, record) => (!newest || record.stored > newest.stored ? record : newest),
+      null
+    );
+  } catch (e) {
+    return null;
+  }
+}
+
+/**
+ * Store the data of a snapshot, replacing older snapshots: only the
+ * current one is ever needed again.
+ */
+export async function writeCachedIndices(sha256: string, data: any): Promise<void> {
+  const db = await openDatabase();
+  if (!db) {
+    return;
+  }
+  try {
+    const transaction = db.transaction(STORE_NAME, 'readwrite');
+    const store = transaction.objectStore(STORE_NAME);
+    store.clear();
+    store.put({ sha256, data, stored: Date.now() } as CachedIndices);
+    await new Promise<void>((resolve, reject) => {
+      transaction.oncomplete = () => resolve();
+      transaction.onerror = () => reject(transaction.error);
+      transaction.onabort = () => reject(transaction.error);
+    });
+  } catch (e) {
+    // Quota or private mode: the data is simply fetched again next time
+  }
+}
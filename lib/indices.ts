@@ -1,12 +1,96 @@
 // Indices loading utilities
-export async function findLatestIndicesFile(relativePath = '/data/'): Promise<string> {
-  const maxDaysBack = 30; // Try up to 30 days back
-  const today = new Date();
+import { readCachedIndices, writeCachedIndices } from './data-cache';
+
+// Manifest written by scripts/snapshot_store.py on every update run
+export interface IndicesManifest {
+  version: number;
+  updated: string;
+  file: string;
+  sha256: string;
+  bytes: number;
+  series: Record<string, { last_year: number; last_month: number | null }>;
+  charts?: Partial<Record<ChartResolution, { file: string; bytes: number }>>;
+}
+
+// latest.sha256: the current snapshot's content hash and file, nothing else
+export interface IndicesStamp {
+  sha256: string;
+  file: string;
+}
 
+// Chart-ready series written by scripts/chart_series.py
+export type ChartResolution = 'full' | 'yearly' | 'lttb';
+
+export interface ChartView {
+  labels: string[];
+  series: Record<string, (number | null)[]>;
+}
+
+export interface ChartSeries {
+  version: number;
+  sha256: string;
+  resolution: ChartResolution;
+  points: number | null;
+  views: Record<string, ChartView>;
+}
+
+function normalizeDataPath(relativePath: string): string {
   // Ensure path starts with / for absolute path from root
   const path = relativePath.startsWith('/') ? relativePath : `/${relativePath}`;
   // Ensure path ends with / for proper filename concatenation
-  const normalizedPath = path.endsWith('/') ? path : `${path}/`;
+  return path.endsWith('/') ? path : `${path}/`;
+}
+
+/**
+ * Load latest.json, which names the current snapshot in a single request.
+ * Returns null for old deployments that only have dated files.
+ */
+export async function loadIndicesManifest(relativePath = '/data/'): Promise<IndicesManifest | null> {
+  const normalizedPath = normalizeDataPath(relativePath);
+
+  try {
+    // Always revalidate: the manifest is the only file that changes in place
+    const response = await fetch(`${normalizedPath}latest.json`, { cache: 'no-cache' });
+    if (!response.ok) {
+      return null;
+    }
+    const manifest = await response.json();
+    if (manifest && typeof manifest.file === 'string') {
+      return manifest as IndicesManifest;
+    }
+  } catch (e) {
+    // Fall back to probing dated files
+  }
+  return null;
+}
+
+/**
+ * Load latest.sha256 ("<sha256>  <file>"), the smallest request that tells
+ * whether a cached copy is current. Returns null when it is missing or
+ * the network is unavailable.
+ */
+export async function loadIndicesStamp(relativePath = '/data/'): Promise<IndicesStamp | null> {
+  const normalizedPath = normalizeDataPath(relativePath);
+
+  try {
+    const response = await fetch(`${normalizedPath}latest.sha256`, { cache: 'no-cache' });
+    if (!response.ok) {
+      return null;
+    }
+    const [sha256, file] = (await response.text()).trim().split(/\s+/);
+    if (/^[0-9a-f]{64}$/.test(sha256) && file) {
+      return { sha256, file };
+    }
+  } catch (e) {
+    // Offline or an old deployment
+  }
+  return null;
+}
+
+// Legacy lookup: probe indices-YYYY-MM-DD.json backwards from today
+async function probeLatestIndicesFile(normalizedPath: string): Promise<string> {
+  const maxDaysBack = 30; // Try up to 30 days back
+  const today = new Date();
 
   for (let daysBack = 0; daysBack < maxDaysBack; daysBack++) {
     const date = new Date(today);
@@ -18,7 +102,7 @@ export async function findLatestIndicesFile(relativePath = '/data/'): Promise<st
     const filename = `${normalizedPath}indices-${year}-${month}-${day}.json`;
 
     try {
-      const response = await fetch(filename);
+      const response = await fetch(filename, { method: 'HEAD' });
       if (response.ok) {
         return filename;
       }
@@ -30,12 +114,104 @@ export async function findLatestIndicesFile(relativePath = '/data/'): Promise<st
   throw new Error('Could not find any indices file within the last 30 days.');
 }
 
-export async function loadIndicesData(relativePath = '/data/'): Promise<any> {
-  const indicesFile = await findLatestIndicesFile(relativePath);
-  const response = await fetch(indicesFile);
+export async function findLatestIndicesFile(relativePath = '/data/'): Promise<string> {
+  const normalizedPath = normalizeDataPath(relativePath);
+
+  const manifest = await loadIndicesManifest(normalizedPath);
+  if (manifest) {
+    return `${normalizedPath}${manifest.file}`;
+  }
+
+  return probeLatestIndicesFile(normalizedPath);
+}
+
+async function fetchIndicesData(
+  normalizedPath: string,
+  stamp: IndicesStamp | null
+): Promise<{ data: any; sha256: string | null }> {
+  let indicesFile: string;
+  let sha256: string | null = stamp?.sha256 ?? null;
+  let init: RequestInit | undefined;
+  const manifest = stamp ? null : await loadIndicesManifest(normalizedPath);
+  if (stamp || manifest) {
+    indicesFile = `${normalizedPath}${stamp ? stamp.file : manifest!.file}`;
+    sha256 = sha256 ?? manifest!.sha256;
+    // Snapshot names are content hashes, so a cached copy is always valid
+    init = { cache: 'force-cache' };
+  } else {
+    indicesFile = await probeLatestIndicesFile(normalizedPath);
+  }
+
+  const response = await fetch(indicesFile, init);
   if (!response.ok) {
     throw new Error(`Failed to load indices file: ${response.status} ${response.statusText}`);
   }
-  return await response.json();
+  const data = await response.json();
+  // Stamped payloads carry their own hash
+  return { data, sha256: typeof data?.sha256 === 'string' ? data.sha256 : sha256 };
+}
+
+/**
+ * Load the current indices data. The parsed data is kept in IndexedDB under
+ * the snapshot's content hash, so a repeat visit only revalidates it with
+ * latest.sha256; offline, the last stored data is used. The delta patches
+ * listed in latest.json are not applied here: the canonical hash tells
+ * 102.0 from 102, which JSON.parse does not, so a patched payload could
+ * not be verified (scripts/snapshot_patches.py sync uses them).
+ */
+export async function loadIndicesData(relativePath = '/data/'): Promise<any> {
+  const normalizedPath = normalizeDataPath(relativePath);
+
+  const stamp = await loadIndicesStamp(normalizedPath);
+  if (stamp) {
+    const cached = await readCachedIndices(stamp.sha256);
+    if (cached) {
+      return cached.data;
+    }
+  }
+
+  try {
+    const { data, sha256 } = await fetchIndicesData(normalizedPath, stamp);
+    if (sha256) {
+      await writeCachedIndices(sha256, data);
+    }
+    return data;
+  } catch (e) {
+    const cached = await readCachedIndices();
+    if (cached) {
+      console.warn('Could not load the indices, using the data stored in this browser:', e);
+      return cached.data;
+    }
+    throw e;
+  }
 }
 
+/**
+ * Load the chart series of the current snapshot at one resolution.
+ * Returns null when the deployment has none or they belong to another
+ * snapshot, so the caller can fall back to loadIndicesData.
+ */
+export async function loadChartSeries(
+  resolution: ChartResolution = 'lttb',
+  relativePath = '/data/'
+): Promise<ChartSeries | null> {
+  const normalizedPath = normalizeDataPath(relativePath);
+  const manifest = await loadIndicesManifest(normalizedPath);
+  const entry = manifest?.charts?.[resolution];
+  if (!manifest || !entry) {
+    return null;
+  }
+
+  try {
+    // The file is rewritten in place, so the snapshot hash versions the URL
+    const version = manifest.sha256.slice(0, 16);
+    const response = await fetch(`${normalizedPath}${entry.file}?v=${version}`, { cache: 'force-cache' });
+    if (!response.ok) {
+      return null;
+    }
+    const series = (await response.json()) as ChartSeries;
+    return series.sha256 === manifest.sha256 ? series : null;
+  } catch (e) {
+    return null;
+  }
+}
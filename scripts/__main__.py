@@ -0,0 +1,65 @@
+"""
+Command line entry point for the updater scripts.
+
+Each subcommand imports only its own module, so "python -m scripts update"
+does not pay for numpy, the pricing server or the benchmarks, and the
+updater itself defers pdfplumber and pypdfium2 until a PDF is parsed.
+
+Usage (from the repository root):
+    python -m scripts update [--force] [--report run.json] ...
+    python -m scripts snapshots manifest
+    python -m scripts history revisions markkinahintaindeksi 2025-06
+    python -m scripts importtime
+    python -m scripts <command> --help
+"""
+
+import sys
+import importlib
+from pathlib import Path
+
+# The scripts import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).parent))
+
+# command: (module with a main(argv) function, help)
+COMMANDS = {
+    "update": ("update_indices", "download, parse and publish the indices"),
+    "snapshots": ("snapshot_store", "inspect or compact the snapshot store"),
+    "patches": ("snapshot_patches", "build, verify or sync the delta patch chain"),
+    "history": ("history_store", "query the SQLite history of published values"),
+    "backfill": ("git_history", "rebuild the revision history from git"),
+    "price": ("hitas_pricing", "benchmark or check the vectorized pricing engine"),
+    "portfolio": ("price_portfolio", "price a CSV/Parquet file of apartments"),
+    "serve": ("pricing_server", "run the local pricing HTTP service"),
+    "loadtest": ("loadtest_pricing", "load test the pricing service"),
+    "benchmark": ("benchmark_pipeline", "benchmark the update pipeline stages"),
+    "backends": ("benchmark_pdf_backends", "check the PDF backends and select the fastest"),
+    "pageworkers": ("benchmark_page_workers", "benchmark page-sharded parsing"),
+    "importtime": ("import_budget", "check the import time of the updater"),
+}
+
+
+def usage():
+    lines = ["usage: python -m scripts <command> [args]", "", "commands:"]
+    lines += [f"  {name:<12} {help}" for name, (_, help) in COMMANDS.items()]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0 if argv else 2
+
+    command, args = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"Unknown command: {command}\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    module_name, _ = COMMANDS[command]
+    # Subcommand help and errors show the full command
+    sys.argv = [f"python -m scripts {command}"] + args
+    return importlib.import_module(module_name).main(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
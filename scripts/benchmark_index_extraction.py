@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark the region-based index parser against the full-text parser.
+Uses example-data/hitas-indeksit-2005-100.pdf unless another PDF is given.
+
+Usage:
+    python scripts/benchmark_index_extraction.py [pdf] [--rounds N]
+"""
+
+import io
+import sys
+import time
+import argparse
+import contextlib
+from pathlib import Path
+
+from update_indices import extract_indices_from_pdf, extract_indices_full_text
+
+EXAMPLE_PDF = (
+    Path(__file__).parent.parent / "example-data" / "hitas-indeksit-2005-100.pdf"
+)
+
+
+def time_parser(parser, pdf_bytes, rounds):
+    """Run a parser rounds times; returns (result, list of seconds)."""
+    result = None
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        # The parsers report progress with print; keep the table readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = parser(io.BytesIO(pdf_bytes))
+        times.append(time.perf_counter() - start)
+    return result, times
+
+
+def main(argv=None):
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdf", nargs="?", default=str(EXAMPLE_PDF))
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    pdf_bytes = Path(args.pdf).read_bytes()
+    print(f"Benchmarking {args.pdf} ({len(pdf_bytes)} bytes, {args.rounds} rounds)")
+    print("=" * 50)
+
+    baseline, baseline_times = time_parser(
+        extract_indices_full_text, pdf_bytes, args.rounds
+    )
+    result, region_times = time_parser(extract_indices_from_pdf, pdf_bytes, args.rounds)
+
+    for name, times in (
+        ("full text (pdfplumber)", baseline_times),
+        ("table regions (pdfium)", region_times),
+    ):
+        print(
+            f"{name:<26} min {min(times) * 1000:8.1f} ms"
+            f"   mean {sum(times) / len(times) * 1000:8.1f} ms"
+        )
+
+    print(f"Speedup (min): {min(baseline_times) / min(region_times):.1f}x")
+
+    if result != baseline:
+        print("\n❌ Parsers disagree on the extracted indices")
+        return 1
+
+    print("\n✅ Both parsers return identical indices")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
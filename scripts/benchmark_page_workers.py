@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark of page-sharded parsing (update_indices --page-workers).
+
+Writes synthetic source PDFs with a long history spread over many pages,
+then parses them with 1, 2, 4, ... page workers. Every worker count must
+give exactly the result of the serial parse; the table shows the best time
+of --rounds, the speedup over one worker and the parallel efficiency.
+Worker counts above the number of CPUs are still run but cannot scale.
+
+Usage:
+    python scripts/benchmark_page_workers.py [--workers 1,2,4] [--rounds 3]
+    python scripts/benchmark_page_workers.py --backend pdfium --output scaling.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+
+from pdf_backends import BACKENDS, REFERENCE_BACKEND, get_backend, page_count
+from synthetic_pdfs import RENDERERS, write_fixture_set, FIXTURE_NAMES
+
+
+def _parsers(backend):
+    from import_old_market_index import parse_old_market_index_table
+    from update_indices import extract_indices_incremental
+
+    return {
+        "indices": lambda path, workers: extract_indices_incremental(path, workers=workers),
+        "old_market_index": lambda path, workers: parse_old_market_index_table(
+            path, get_backend(backend, workers)
+        ),
+    }
+
+
+def measure(parser, path, workers, rounds):
+    """Returns (result, best seconds)."""
+    best = None
+    result = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        # The parsers report progress with print; keep the table readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = parser(path, workers)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--years", type=int, default=96, help="history of the index PDF")
+    parser.add_argument("--old-years", type=int, default=118, help="history of the old index")
+    parser.add_argument("--rows-per-page", type=int, default=8)
+    parser.add_argument("--backend", choices=list(BACKENDS), default=REFERENCE_BACKEND)
+    parser.add_argument("--renderer", choices=RENDERERS, default="auto")
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    counts = sorted({int(count) for count in args.workers.split(",")} | {1})
+    results = {"cpus": os.cpu_count(), "backend": args.backend, "sources": {}}
+    failures = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_fixture_set(
+            tmp,
+            args.years,
+            old_years=args.old_years,
+            rows_per_page=args.rows_per_page,
+            renderer=args.renderer,
+        )
+        print(f"Page workers on {os.cpu_count()} CPU(s), {args.backend} backend")
+        print("=" * 50)
+        print(f"{'source':<18} {'pages':>5} {'workers':>7} {'time':>10} {'speedup':>8} {'eff.':>6}")
+
+        for source, parse in _parsers(args.backend).items():
+            path = str(Path(tmp) / FIXTURE_NAMES[source])
+            pages = page_count(path)
+            serial, baseline = measure(parse, path, 1, args.rounds)
+            runs = []
+            for workers in counts:
+                result, seconds = (
+                    (serial, baseline) if workers == 1 else measure(parse, path, workers, args.rounds)
+                )
+                if result != serial:
+                    failures.append(f"{source} with {workers} workers")
+                speedup = baseline / seconds
+                runs.append({"workers": workers, "seconds": round(seconds, 6), "speedup": round(speedup, 3)})
+                print(
+                    f"{source:<18} {pages:>5} {workers:>7} {seconds * 1000:7.1f} ms"
+                    f" {speedup:7.2f}x {speedup / workers:6.0%}"
+                )
+            results["sources"][source] = {"pages": pages, "runs": runs}
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"\nWrote {args.output}")
+
+    if failures:
+        print(f"\n❌ Sharded parse differs from the serial one: {', '.join(failures)}")
+        return 1
+    print("\n✅ Every worker count gives the serial result")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Parity and speed check of the PDF backends (see pdf_backends).
+
+Runs every available backend through the importers on the example PDF, on
+the source PDFs the updater last fetched (.cache/http) and on synthetic
+source PDFs (one- and multi-page), and compares the parsed {year: {month:
+value}} tables and rajaneliöhinta with what the reference backend
+(pdfplumber) gives. Reports the time (best of --rounds, summed over the
+documents) and the peak Python heap of each backend per source.
+
+With --write the fastest backend that matches the reference on every
+document of a source is recorded in .cache/pdf-backends.json; the updater
+then parses that source with it. A source without a fetched real PDF keeps
+the reference backend: the synthetic PDFs alone do not prove parity on
+the documents the updater actually reads. Run the updater first, and
+re-run the selection when the PDF libraries change.
+
+Usage:
+    python scripts/benchmark_pdf_backends.py [--rounds 3] [--years 50] [--write]
+    python -m scripts backends --write
+"""
+
+import io
+import sys
+import json
+import time
+import argparse
+import contextlib
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from pdf_backends import (
+    BACKEND_SOURCES,
+    REFERENCE_BACKEND,
+    SELECTION_FILE,
+    available_backends,
+)
+from http_cache import cached_body
+from synthetic_pdfs import RENDERERS, fixture_set
+
+EXAMPLE_PDF = (
+    Path(__file__).parent.parent / "example-data" / "hitas-indeksit-2005-100.pdf"
+)
+
+
+def _parsers():
+    from import_old_market_index import parse_old_market_index_table
+    from import_rajaneliohinta import parse_rajaneliohinta_from_pdf
+    from update_indices import extract_indices_full_text
+
+    return {
+        "indices": extract_indices_full_text,
+        "old_market_index": parse_old_market_index_table,
+        "rajaneliohinta": parse_rajaneliohinta_from_pdf,
+    }
+
+
+def documents(years=50, renderer="auto", cache_dir=None):
+    """
+    Return [(source, label, pdf bytes, real)] to check the backends on;
+    real is False for the synthetic PDFs.
+    """
+    from update_indices import SOURCES
+
+    docs = []
+    if EXAMPLE_PDF.exists():
+        docs.append(("indices", EXAMPLE_PDF.name, EXAMPLE_PDF.read_bytes(), True))
+    for source, url in SOURCES:
+        path = cached_body(url, cache_dir)
+        if path:
+            docs.append((source, f"fetched {url.rsplit('/', 1)[-1]}", path.read_bytes(), True))
+    for label, rows_per_page in (("synthetic", None), ("synthetic paged", 15)):
+        fixtures = fixture_set(
+            years, provisional=2, rows_per_page=rows_per_page, renderer=renderer
+        )
+        docs += [(source, label, pdf, False) for source, pdf in fixtures["pdfs"].items()]
+    return docs
+
+
+def run(parser, pdf, backend, rounds):
+    """Parse rounds times; returns (result, best seconds, peak heap in KB)."""
+    best = None
+    result = None
+    # The parsers report progress with print; keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(rounds):
+            start = time.perf_counter()
+            result = parser(io.BytesIO(pdf), backend)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        # Measured separately, as tracing slows the parsers down
+        tracemalloc.start()
+        parser(io.BytesIO(pdf), backend)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, best, peak // 1024
+
+
+def compare(docs, backends, rounds=3):
+    """
+    Run every backend on every document. Returns {source: {backend:
+    {"seconds", "peak_kb", "parity", "mismatches", "real"}}}, where real
+    counts the real documents checked.
+    """
+    parsers = _parsers()
+    results = {}
+    for source, label, pdf, real in docs:
+        reference, _, _ = run(parsers[source], pdf, REFERENCE_BACKEND, 1)
+        for backend in backends:
+            result, seconds, peak_kb = run(parsers[source], pdf, backend, rounds)
+            entry = results.setdefault(source, {}).setdefault(
+                backend,
+                {"seconds": 0.0, "peak_kb": 0, "parity": True, "mismatches": [], "real": 0},
+            )
+            entry["seconds"] += seconds
+            entry["real"] += real
+            entry["peak_kb"] = max(entry["peak_kb"], peak_kb)
+            if not result or result != reference:
+                entry["parity"] = False
+                entry["mismatches"].append(label)
+    return results
+
+
+def select(results):
+    """
+    The fastest backend with parity, including on at least one real PDF,
+    for each source the updater reads through a backend; the full-text
+    indices parser is only reported.
+    """
+    selected = {}
+    for source in BACKEND_SOURCES:
+        passing = [
+            (entry["seconds"], backend)
+            for backend, entry in results.get(source, {}).items()
+            if entry["parity"] and entry["real"]
+        ]
+        selected[source] = min(passing)[1] if passing else REFERENCE_BACKEND
+    return selected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--years", type=int, default=50, help="history in the synthetic PDFs")
+    parser.add_argument("--renderer", choices=RENDERERS, default="auto")
+    parser.add_argument(
+        "--write", action="store_true", help=f"record the selection in {SELECTION_FILE}"
+    )
+    args = parser.parse_args(argv)
+
+    backends = available_backends()
+    docs = documents(args.years, args.renderer)
+    print(f"Comparing {', '.join(backends)} on {len(docs)} PDFs ({args.rounds} rounds)")
+    print("=" * 50)
+
+    results = compare(docs, backends, args.rounds)
+    print(f"{'source':<18} {'backend':<11} {'time':>10} {'heap':>10}  parity")
+    for source, entries in results.items():
+        for backend, entry in sorted(entries.items(), key=lambda item: item[1]["seconds"]):
+            mark = "✅" if entry["parity"] else "❌ " + ", ".join(entry["mismatches"])
+            if not entry["real"]:
+                mark += " (synthetic PDFs only)"
+            print(
+                f"{source:<18} {backend:<11} {entry['seconds'] * 1000:7.1f} ms"
+                f" {entry['peak_kb']:7d} KB  {mark}"
+            )
+
+    selected = select(results)
+    unchecked = [
+        source
+        for source in BACKEND_SOURCES
+        if not any(entry["real"] for entry in results.get(source, {}).values())
+    ]
+    if unchecked:
+        print(
+            f"\nNo fetched PDF of {', '.join(unchecked)} in the HTTP cache; "
+            f"keeping {REFERENCE_BACKEND} (run the updater first)"
+        )
+    print("\nSelected:")
+    for source, backend in selected.items():
+        print(f"  {source:<18} {backend}")
+
+    if args.write:
+        SELECTION_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = SELECTION_FILE.with_name(SELECTION_FILE.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "checked": datetime.now().isoformat(timespec="seconds"),
+                    "selected": selected,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+            f.write("\n")
+        tmp_path.replace(SELECTION_FILE)
+        print(f"\nWrote {SELECTION_FILE}")
+
+    print("\n✅ Backend comparison complete")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Benchmark the stages of the index update pipeline.
+
+Measures download_pdf, extract_indices_from_pdf,
+parse_old_market_index_table, parse_rajaneliohinta_from_pdf and
+create_json_file on three fixture sets: the example PDF and synthetic
+sources with 50 and 100 years of rows (see synthetic_pdfs). The sources are
+served from a local HTTP server, and every stage runs in its own process,
+so the reported peak RSS belongs to that stage alone ("startup" is the
+baseline of a process that only imports the pipeline).
+
+Results are written as JSON (default benchmarks/pipeline-<commit>.json);
+pass an earlier file with --compare to see the change per stage.
+
+Usage:
+    python scripts/benchmark_pipeline.py [--rounds N] [--fixtures example,synthetic-50]
+        [--output FILE] [--compare FILE]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import contextlib
+import subprocess
+from datetime import datetime
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import synthetic_pdfs
+from run_metrics import peak_rss_kb
+
+REPO_DIR = Path(__file__).parent.parent
+EXAMPLE_PDF = REPO_DIR / "example-data" / "hitas-indeksit-2005-100.pdf"
+RESULTS_DIR = REPO_DIR / "benchmarks"
+
+STAGES = (
+    "startup",
+    "download",
+    "extract_indices",
+    "parse_old_market_index",
+    "parse_rajaneliohinta",
+    "create_json",
+)
+FIXTURES = {
+    # name: years of synthetic rows (the example set uses the real index PDF)
+    "example": 50,
+    "synthetic-50": 50,
+    "synthetic-100": 100,
+}
+
+
+def write_fixture(name, out_dir):
+    """Write the three source PDFs of a fixture set under their source names."""
+    synthetic_pdfs.write_fixture_set(out_dir, FIXTURES[name])
+    if name == "example":
+        shutil.copy(EXAMPLE_PDF, Path(out_dir) / synthetic_pdfs.FIXTURE_NAMES["indices"])
+
+
+def parse_inputs(fixture_dir):
+    """Parse a fixture set once to get the inputs of create_json_file."""
+    from import_old_market_index import parse_old_market_index_table
+    from import_rajaneliohinta import parse_rajaneliohinta_from_pdf
+    from import_rajaneliohinta_tilasto import get_rajaneliohinta_tilasto_data
+    from update_indices import extract_indices_from_pdf
+
+    def read(source):
+        return io.BytesIO((fixture_dir / synthetic_pdfs.FIXTURE_NAMES[source]).read_bytes())
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        rakennuskustannus, markkinahinta = extract_indices_from_pdf(read("indices"))
+        return {
+            "rakennuskustannus": rakennuskustannus,
+            "markkinahinta": markkinahinta,
+            "old_market_index": parse_old_market_index_table(read("old_market_index")),
+            "rajaneliohinta": parse_rajaneliohinta_from_pdf(read("rajaneliohinta")),
+            "tilasto": get_rajaneliohinta_tilasto_data(),
+        }
+
+
+def run_stage(stage, fixture_dir, rounds):
+    """Run one stage rounds times in this process; returns seconds per round."""
+    import http_cache
+    from import_old_market_index import parse_old_market_index_table
+    from import_rajaneliohinta import parse_rajaneliohinta_from_pdf
+    from update_indices import create_json_file, download_pdf, extract_indices_from_pdf
+
+    if stage == "startup":
+        return []
+
+    def read(source):
+        return (fixture_dir / synthetic_pdfs.FIXTURE_NAMES[source]).read_bytes()
+
+    if stage == "download":
+        def call():
+            # Cold cache every round, so each round is a full download
+            shutil.rmtree(http_cache.CACHE_DIR, ignore_errors=True)
+            return download_pdf()
+    elif stage == "extract_indices":
+        data = read("indices")
+        call = lambda: extract_indices_from_pdf(io.BytesIO(data))
+    elif stage == "parse_old_market_index":
+        data = read("old_market_index")
+        call = lambda: parse_old_market_index_table(io.BytesIO(data))
+    elif stage == "parse_rajaneliohinta":
+        data = read("rajaneliohinta")
+        call = lambda: parse_rajaneliohinta_from_pdf(io.BytesIO(data))
+    elif stage == "create_json":
+        with open(fixture_dir / "inputs.json", "r", encoding="utf-8") as f:
+            inputs = json.load(f)
+        # Inside HITAS_CACHE_DIR, which the parent removes afterwards
+        data_root = http_cache.CACHE_DIR.parent / "data"
+
+        def call():
+            data_dir = data_root / f"data-{time.perf_counter_ns()}"
+            return create_json_file(
+                inputs["rakennuskustannus"],
+                inputs["markkinahinta"],
+                inputs["old_market_index"],
+                inputs["rajaneliohinta"],
+                inputs["tilasto"],
+                data_dir=data_dir,
+            )
+    else:
+        raise ValueError(f"unknown stage {stage}")
+
+    seconds = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            call()
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def measure(stage, fixture_dir, rounds, env):
+    """Run a stage in a child process; returns {"seconds", "peak_rss_kb"}."""
+    process = subprocess.run(
+        [sys.executable, __file__, "--child", stage, str(fixture_dir), "--rounds", str(rounds)],
+        env=env,
+        capture_output=True,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"{stage} failed:\n{process.stderr.decode(errors='replace')}")
+    return json.loads(process.stdout.decode().strip().splitlines()[-1])
+
+
+def summarize(measured):
+    seconds = measured["seconds"]
+    summary = {"peak_rss_kb": measured["peak_rss_kb"]}
+    if seconds:
+        summary.update(
+            min_ms=round(min(seconds) * 1000, 2),
+            mean_ms=round(sum(seconds) / len(seconds) * 1000, 2),
+            max_ms=round(max(seconds) * 1000, 2),
+        )
+    return summary
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def serve(directory):
+    """Serve a directory on a free local port; returns the server."""
+
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), partial(QuietHandler, directory=str(directory))
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def print_report(results, previous=None):
+    print(f"\n{'fixture':<15} {'stage':<24} {'min ms':>9} {'mean ms':>9} {'peak RSS':>10}")
+    for fixture, stages in results["fixtures"].items():
+        for stage, summary in stages.items():
+            line = (
+                f"{fixture:<15} {stage:<24} {summary.get('min_ms', '-'):>9} "
+                f"{summary.get('mean_ms', '-'):>9} {summary['peak_rss_kb'] / 1024:>7.1f} MB"
+            )
+            before = (previous or {}).get("fixtures", {}).get(fixture, {}).get(stage)
+            if before and before.get("min_ms") and summary.get("min_ms"):
+                change = (summary["min_ms"] / before["min_ms"] - 1) * 100
+                line += f"   {change:+6.1f}% time"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--fixtures", default=",".join(FIXTURES))
+    parser.add_argument("--output", help="results JSON (default benchmarks/pipeline-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--child", nargs=2, metavar=("STAGE", "FIXTURE_DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        stage, fixture_dir = args.child
+        seconds = run_stage(stage, Path(fixture_dir), args.rounds)
+        print(json.dumps({"seconds": seconds, "peak_rss_kb": peak_rss_kb()}))
+        return 0
+
+    fixtures = [name for name in args.fixtures.split(",") if name]
+    unknown = [name for name in fixtures if name not in FIXTURES]
+    if unknown:
+        print(f"Unknown fixtures: {', '.join(unknown)} (choose from {', '.join(FIXTURES)})")
+        return 1
+
+    commit = _git_commit()
+    results = {
+        "commit": commit,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "pdf_renderer": synthetic_pdfs.resolve_renderer(),
+        "rounds": args.rounds,
+        "fixtures": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        server = serve(tmp)
+        port = server.server_address[1]
+        try:
+            for fixture in fixtures:
+                fixture_dir = tmp / fixture
+                write_fixture(fixture, fixture_dir)
+                with open(fixture_dir / "inputs.json", "w", encoding="utf-8") as f:
+                    json.dump(parse_inputs(fixture_dir), f)
+
+                stages = {}
+                for stage in STAGES:
+                    env = dict(
+                        os.environ,
+                        HITAS_SOURCE_BASE_URL=f"http://127.0.0.1:{port}/{fixture}/",
+                        HITAS_CACHE_DIR=str(tmp / "cache" / fixture / stage),
+                    )
+                    print(f"Running {fixture} / {stage}...")
+                    stages[stage] = summarize(measure(stage, fixture_dir, args.rounds, env))
+                results["fixtures"][fixture] = stages
+        finally:
+            server.shutdown()
+
+    previous = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    print_report(results, previous)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"pipeline-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+    print(f"\nResults written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
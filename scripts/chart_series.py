@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Chart-ready series for the graphs page, plus the placeholder images.
+
+For each chart (view) the series are flattened into labels and values at
+three resolutions and written to public/data/charts/<resolution>.json:
+
+    full    every published month ("YYYY-MM")
+    yearly  the mean of each year ("YYYY")
+    lttb    Largest-Triangle-Three-Buckets downsampled to about --points
+            points, which keeps the visual shape with a fraction of the data
+
+The files record the payload hash of the snapshot they were built from and
+are rewritten only when it changes. The placeholder PNGs shown while the
+charts load (public/chart-placeholders) are rendered from the same series
+as SVG through cairosvg, also only when the hash changes; without cairo
+they are left as they are. This is the only place they are rendered. The
+hash they were rendered from is kept in .cache/chart-placeholders.json
+(override the root with HITAS_CACHE_DIR), outside the deployed tree.
+
+Usage:
+    python scripts/chart_series.py [--points 240] [--force]
+"""
+
+import os
+import sys
+import math
+import json
+import argparse
+from pathlib import Path
+
+from snapshot_store import (
+    CHARTS_DIR_NAME,
+    DATA_DIR,
+    load_snapshot,
+    payload_hash,
+    refresh_manifest,
+)
+
+PLACEHOLDER_DIR_NAME = "chart-placeholders"
+PLACEHOLDER_STAMP = Path(
+    os.environ.get("HITAS_CACHE_DIR", Path(__file__).parent.parent / ".cache")
+) / "chart-placeholders.json"
+RESOLUTIONS = ("full", "yearly", "lttb")
+DEFAULT_POINTS = 240
+CHARTS_VERSION = 1
+
+# view: (placeholder image, [(series key, label, color)], value suffix)
+VIEWS = {
+    "new": (
+        "new-indices-chart.png",
+        [
+            ("rakennuskustannusindeksi", "Rakennuskustannusindeksi", "#667eea"),
+            ("markkinahintaindeksi", "Markkinahintaindeksi", "#51cf66"),
+        ],
+        "",
+    ),
+    "old": (
+        "old-indices-chart.png",
+        [("vanhat_markkinahintaindeksi", "Vanhat markkinahintaindeksi", "#ff6b6b")],
+        "",
+    ),
+    "rajaneliohinta": (
+        "rajaneliohinta-chart.png",
+        [("rajaneliohinta_tilasto", "Rajaneliöhinta (€/m²)", "#ffa94d")],
+        " €/m²",
+    ),
+}
+
+
+def charts_relpath(resolution):
+    """Path of a chart series file relative to the data directory."""
+    return f"{CHARTS_DIR_NAME}/{resolution}.json"
+
+
+def _months(series):
+    """Sorted [((year, month), value)] of a nested series with any key type."""
+    return sorted(
+        ((int(year), int(month)), value)
+        for year, months in (series or {}).items()
+        for month, value in months.items()
+        if isinstance(value, (int, float))
+    )
+
+
+def full_view(data, keys):
+    """
+    Monthly labels of the first series with the other series aligned to
+    them (None where a month is missing), as Charts.tsx has always drawn.
+    """
+    points = _months(data.get(keys[0]))
+    lookups = [dict(_months(data.get(key))) for key in keys]
+    return {
+        "labels": [f"{year}-{month:02d}" for (year, month), _ in points],
+        "series": {
+            key: [lookup.get(month) for month, _ in points]
+            for key, lookup in zip(keys, lookups)
+        },
+    }
+
+
+def yearly_view(view):
+    """Average each series over the calendar years of a full view."""
+    years = sorted({label[:4] for label in view["labels"]})
+    series = {}
+    for key, values in view["series"].items():
+        by_year = {}
+        for label, value in zip(view["labels"], values):
+            if value is not None:
+                by_year.setdefault(label[:4], []).append(value)
+        series[key] = [
+            round(sum(by_year[year]) / len(by_year[year]), 2) if year in by_year else None
+            for year in years
+        ]
+    return {"labels": years, "series": series}
+
+
+def lttb_indices(xs, ys, threshold):
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps out of
+    (xs, ys): the first and last point, plus from each of threshold - 2
+    buckets the point forming the largest triangle with the previously kept
+    point and the average of the next bucket.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    kept = [0]
+    bucket = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        next_end = min(int((i + 2) * bucket) + 1, n)
+        if i == threshold - 3:
+            # The last bucket is followed by the last point only
+            next_start, next_end = n - 1, n
+        else:
+            next_start = end
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs(
+                (xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a])
+            )
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
+
+
+def lttb_view(view, points):
+    """
+    Downsample a full view with LTTB. Each series gets an equal share of
+    the points and the union of the kept months is used, so series sharing
+    a chart keep common labels.
+    """
+    keep = set()
+    share = max(3, points // max(1, len(view["series"])))
+    for values in view["series"].values():
+        present = [i for i, value in enumerate(values) if value is not None]
+        xs = [_ordinal(view["labels"][i]) for i in present]
+        ys = [values[i] for i in present]
+        keep.update(present[i] for i in lttb_indices(xs, ys, share))
+    rows = sorted(keep)
+    return {
+        "labels": [view["labels"][i] for i in rows],
+        "series": {key: [values[i] for i in rows] for key, values in view["series"].items()},
+    }
+
+
+def _ordinal(label):
+    year, month = label.split("-")
+    return int(year) * 12 + int(month) - 1
+
+
+def build_chart_series(data, points=DEFAULT_POINTS):
+    """Return {resolution: payload} for a snapshot."""
+    digest = payload_hash(data)
+    full = {}
+    for view, (_, series, _) in VIEWS.items():
+        keys = [key for key, _, _ in series]
+        if data.get(keys[0]):
+            full[view] = full_view(data, keys)
+
+    views = {
+        "full": full,
+        "yearly": {view: yearly_view(payload) for view, payload in full.items()},
+        "lttb": {view: lttb_view(payload, points) for view, payload in full.items()},
+    }
+    return {
+        resolution: {
+            "version": CHARTS_VERSION,
+            "sha256": digest,
+            "resolution": resolution,
+            "points": points if resolution == "lttb" else None,
+            "views": views[resolution],
+        }
+        for resolution in RESOLUTIONS
+    }
+
+
+def _current_stamp(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return payload.get("sha256"), payload.get("points")
+
+
+def write_chart_series(data, data_dir=DATA_DIR, points=DEFAULT_POINTS, force=False):
+    """
+    Write charts/<resolution>.json for a payload unless they already match
+    its hash. Returns True if the files were written.
+    """
+    data_dir = Path(data_dir)
+    digest = payload_hash(data)
+    if not force and _current_stamp(data_dir / charts_relpath("lttb")) == (digest, points):
+        return False
+
+    for resolution, payload in build_chart_series(data, points).items():
+        path = data_dir / charts_relpath(resolution)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"), ensure_ascii=False)
+            f.write("\n")
+        tmp_path.replace(path)
+    print(f"Wrote chart series for {digest[:16]} ({', '.join(RESOLUTIONS)})")
+    return True
+
+
+def _nice_step(span, ticks=6):
+    """A 1/2/2.5/5 x 10^n step that splits span into about ticks parts."""
+    raw = span / ticks if span > 0 else 1
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for factor in (1, 2, 2.5, 5, 10):
+        if raw <= factor * magnitude:
+            return factor * magnitude
+    return 10 * magnitude
+
+
+def render_chart_svg(view, series, suffix="", width=1200, height=600):
+    """Draw a view as a line chart in the style of the Chart.js placeholders."""
+    text_color = "#333"
+    grid_color = "rgba(0, 0, 0, 0.15)"
+    left, right, top, bottom = 80, 20, 60, 90
+    plot_w, plot_h = width - left - right, height - top - bottom
+
+    labels = view["labels"]
+    values = [v for key, _, _ in series for v in view["series"].get(key, []) if v is not None]
+    low, high = min(values), max(values)
+    step = _nice_step(high - low)
+    y_min = step * int(low // step)
+    y_max = step * (int(high // step) + 1)
+
+    def x_at(i):
+        return left + plot_w * (i / max(1, len(labels) - 1))
+
+    def y_at(value):
+        return top + plot_h * (1 - (value - y_min) / (y_max - y_min))
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="Helvetica, Arial, sans-serif">'
+    ]
+
+    # Horizontal grid and y ticks
+    value = y_min
+    while value <= y_max + step / 2:
+        y = y_at(value)
+        parts.append(
+            f'<line x1="{left}" y1="{y:.1f}" x2="{width - right}" y2="{y:.1f}" '
+            f'stroke="{grid_color}"/>'
+        )
+        text = f"{value:.0f}{suffix}" if suffix else f"{value:g}"
+        parts.append(
+            f'<text x="{left - 8}" y="{y + 4:.1f}" font-size="12" fill="{text_color}" '
+            f'text-anchor="end">{text}</text>'
+        )
+        value += step
+
+    # Up to 20 rotated x labels, like autoSkip with maxTicksLimit: 20
+    skip = max(1, -(-len(labels) // 20))
+    for i in range(0, len(labels), skip):
+        x = x_at(i)
+        parts.append(
+            f'<line x1="{x:.1f}" y1="{top}" x2="{x:.1f}" y2="{top + plot_h}" '
+            f'stroke="{grid_color}"/>'
+        )
+        parts.append(
+            f'<text x="{x:.1f}" y="{top + plot_h + 14}" font-size="12" fill="{text_color}" '
+            f'text-anchor="end" transform="rotate(-45 {x:.1f} {top + plot_h + 14})">'
+            f"{labels[i]}</text>"
+        )
+
+    # Legend centred above the plot
+    legend_width = sum(60 + 7 * len(label) for _, label, _ in series)
+    x = (width - legend_width) / 2
+    for key, label, color in series:
+        parts.append(
+            f'<rect x="{x:.1f}" y="20" width="40" height="12" fill="{color}" '
+            f'fill-opacity="0.1" stroke="{color}" stroke-width="2"/>'
+        )
+        parts.append(
+            f'<text x="{x + 48:.1f}" y="31" font-size="12" fill="{text_color}">{label}</text>'
+        )
+        x += 60 + 7 * len(label)
+
+    for key, _, color in series:
+        segments, current = [], []
+        for i, value in enumerate(view["series"].get(key, [])):
+            if value is None:
+                if current:
+                    segments.append(current)
+                current = []
+            else:
+                current.append(f"{x_at(i):.1f},{y_at(value):.1f}")
+        if current:
+            segments.append(current)
+        for points in segments:
+            parts.append(
+                f'<polyline points="{" ".join(points)}" fill="none" stroke="{color}" '
+                f'stroke-width="2" stroke-linejoin="round"/>'
+            )
+
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def update_placeholders(data, data_dir=DATA_DIR, force=False, stamp_path=PLACEHOLDER_STAMP):
+    """
+    Render the placeholder PNGs from a payload when its hash differs from
+    the one they were last rendered from. Returns True if they were written.
+    """
+    placeholder_dir = Path(data_dir).parent / PLACEHOLDER_DIR_NAME
+    stamp_path = Path(stamp_path)
+    digest = payload_hash(data)
+    if not force and (_current_stamp(stamp_path) or (None,))[0] == digest:
+        return False
+    try:
+        # Imported here so the updater does not load cairo on every run
+        import cairosvg
+    except (ImportError, OSError):
+        # OSError: cairosvg is installed but the cairo library is missing
+        print("cairosvg (or the cairo library) not available, keeping chart placeholders")
+        return False
+
+    placeholder_dir.mkdir(parents=True, exist_ok=True)
+    full = build_chart_series(data)["full"]["views"]
+    for view, (filename, series, suffix) in VIEWS.items():
+        if view not in full:
+            continue
+        svg = render_chart_svg(full[view], series, suffix)
+        cairosvg.svg2png(
+            bytestring=svg.encode("utf-8"),
+            write_to=str(placeholder_dir / filename),
+            output_width=1200,
+            output_height=600,
+        )
+        print(f"Rendered {PLACEHOLDER_DIR_NAME}/{filename}")
+
+    stamp_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(stamp_path, "w", encoding="utf-8") as f:
+        json.dump({"sha256": digest}, f, indent=2)
+        f.write("\n")
+    return True
+
+
+def refresh_chart_series(data_dir=DATA_DIR):
+    """
+    Write missing or outdated chart series and placeholders for the current
+    snapshot, e.g. on runs that skip parsing. Returns True if anything
+    changed.
+    """
+    snapshot = load_snapshot(data_dir)
+    if not snapshot:
+        return False
+    written = write_chart_series(snapshot, data_dir)
+    if written:
+        refresh_manifest(data_dir)
+    return update_placeholders(snapshot, data_dir) or written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--points", type=int, default=DEFAULT_POINTS)
+    parser.add_argument("--force", action="store_true", help="rewrite even if up to date")
+    args = parser.parse_args()
+
+    snapshot = load_snapshot()
+    if not snapshot:
+        print("Snapshot store is empty")
+        sys.exit(1)
+
+    if write_chart_series(snapshot, points=args.points, force=args.force):
+        from compress_artifacts import compress_published
+
+        refresh_manifest()
+        compress_published()
+    update_placeholders(snapshot, force=args.force)
+
+    payloads = build_chart_series(snapshot, args.points)
+    print("\n" + "=" * 50)
+    for resolution, payload in payloads.items():
+        size = len(json.dumps(payload, separators=(",", ":"), ensure_ascii=False))
+        points = sum(len(view["labels"]) for view in payload["views"].values())
+        print(f"{resolution:<8} {points:>5} points {size:>8} bytes")
+
+    # The downsampled series keep the first and last month of every view
+    full, lttb = payloads["full"]["views"], payloads["lttb"]["views"]
+    ok = all(
+        lttb[view]["labels"][0] == full[view]["labels"][0]
+        and lttb[view]["labels"][-1] == full[view]["labels"][-1]
+        for view in full
+    )
+    print("\n✅ Chart series written" if ok else "\n❌ LTTB dropped an end point")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Write pre-compressed .gz and .br siblings of the published data files.
+
+The current snapshot, its dense copy, the ratio tables, the chart series
+and latest.json are compressed with a fixed gzip mtime and no embedded
+filename, so unchanged data always produces byte-identical artifacts.
+Brotli is optional: without the brotli package only .gz files are written.
+
+Usage:
+    python scripts/compress_artifacts.py
+"""
+
+import sys
+import gzip
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from snapshot_store import DATA_DIR, LATEST_NAME, SNAPSHOT_DIR_NAME, load_latest
+
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+def _write_if_changed(path, data):
+    """Write bytes to path unless it already holds exactly these bytes."""
+    if path.exists() and path.read_bytes() == data:
+        return False
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
+    return True
+
+
+def compress_file(path):
+    """
+    Write path.gz (and path.br when brotli is available).
+    Returns {"raw": bytes, ".gz": bytes, ".br": bytes} sizes.
+    """
+    path = Path(path)
+    raw = path.read_bytes()
+    sizes = {"raw": len(raw)}
+
+    # mtime=0 keeps the gzip header independent of when the file was written
+    gz = gzip.compress(raw, compresslevel=9, mtime=0)
+    _write_if_changed(path.with_name(path.name + ".gz"), gz)
+    sizes[".gz"] = len(gz)
+
+    if brotli is not None:
+        br = brotli.compress(raw, quality=11)
+        _write_if_changed(path.with_name(path.name + ".br"), br)
+        sizes[".br"] = len(br)
+
+    return sizes
+
+
+def prune_compressed(keep, data_dir=DATA_DIR):
+    """Remove compressed siblings of snapshots that are no longer current."""
+    removed = 0
+    for path in (Path(data_dir) / SNAPSHOT_DIR_NAME).iterdir():
+        if path.suffix in COMPRESSED_SUFFIXES and path.with_suffix("") not in keep:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def compress_published(data_dir=DATA_DIR):
+    """
+    Compress the files latest.json points to, plus latest.json itself.
+    Returns {relative path: sizes} for the size report.
+    """
+    data_dir = Path(data_dir)
+    latest = load_latest(data_dir)
+    if not latest:
+        return {}
+
+    relpaths = [latest["file"]]
+    for derived in ("dense", "ratios"):
+        if latest.get(derived):
+            relpaths.append(latest[derived]["file"])
+    relpaths += [chart["file"] for chart in latest.get("charts", {}).values()]
+    relpaths.append(LATEST_NAME)
+
+    report = {relpath: compress_file(data_dir / relpath) for relpath in relpaths}
+    prune_compressed({data_dir / relpath for relpath in relpaths}, data_dir)
+    return report
+
+
+def print_size_report(report):
+    """Print raw and compressed sizes of each published file."""
+    print("\n" + "=" * 50)
+    print("PAYLOAD SIZES")
+    print("=" * 50)
+    print(f"{'file':<40} {'raw':>7} {'gzip':>7} {'brotli':>7}")
+    for relpath, sizes in report.items():
+        br = sizes.get(".br")
+        print(
+            f"{relpath:<40} {sizes['raw']:>7} {sizes['.gz']:>7} "
+            f"{br if br is not None else '-':>7}"
+        )
+    if brotli is None:
+        print("(brotli not installed, .br files skipped)")
+
+
+if __name__ == "__main__":
+    report = compress_published()
+    if not report:
+        print("Snapshot store is empty")
+        sys.exit(1)
+    print_size_report(report)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Dense columnar encoding of the published index data.
+
+Each {year: {month: value}} series becomes a start year/month plus a flat
+list of monthly values (null for missing months), optionally packed as a
+base64 little-endian float32 blob. Everything else in the payload is
+copied as-is, so to_nested(to_dense(data)) == data.
+
+Usage:
+    python scripts/dense_format.py   # round-trip check of every stored snapshot
+"""
+
+import sys
+import math
+import base64
+import struct
+
+FORMAT = "hitas-dense/1"
+
+# Series stored as {year: {month: value}}
+SERIES_KEYS = (
+    "rakennuskustannusindeksi",
+    "markkinahintaindeksi",
+    "vanhat_markkinahintaindeksi",
+    "rajaneliohinta_tilasto",
+)
+
+# float32 keeps ~7 significant digits; the sources publish at most 2 decimals
+F32_DECIMALS = 2
+
+
+def encode_series(series, encoding="array"):
+    """
+    Encode one {year: {month: value}} series (int or str keys).
+    encoding is "array" for a JSON list or "f32" for packed float32.
+    """
+    points = {
+        (int(year), int(month)): value
+        for year, months in series.items()
+        for month, value in months.items()
+    }
+    if not points:
+        return {"start": None, "values": []}
+
+    first = min(points)
+    last = max(points)
+    start_index = first[0] * 12 + first[1] - 1
+    end_index = last[0] * 12 + last[1] - 1
+
+    values = []
+    for index in range(start_index, end_index + 1):
+        values.append(points.get((index // 12, index % 12 + 1)))
+
+    encoded = {"start": [first[0], first[1]]}
+    if encoding == "f32":
+        packed = struct.pack(
+            f"<{len(values)}f",
+            *(math.nan if value is None else value for value in values),
+        )
+        encoded["f32"] = base64.b64encode(packed).decode("ascii")
+    else:
+        encoded["values"] = values
+    return encoded
+
+
+def decode_series(encoded):
+    """Decode a dense series back to {"year": {"month": value}} with str keys."""
+    if encoded.get("f32") is not None:
+        packed = base64.b64decode(encoded["f32"])
+        values = [
+            None if math.isnan(value) else round(value, F32_DECIMALS)
+            for value in struct.unpack(f"<{len(packed) // 4}f", packed)
+        ]
+    else:
+        values = encoded.get("values", [])
+
+    series = {}
+    if not encoded.get("start"):
+        return series
+
+    start_year, start_month = encoded["start"]
+    index = start_year * 12 + start_month - 1
+    for value in values:
+        if value is not None:
+            year, month = divmod(index, 12)
+            series.setdefault(str(year), {})[str(month + 1)] = value
+        index += 1
+    return series
+
+
+def to_dense(data, encoding="array"):
+    """Convert a published payload to the dense format."""
+    dense = {"format": FORMAT}
+    dense.update({key: value for key, value in data.items() if key not in SERIES_KEYS})
+    dense["series"] = {
+        key: encode_series(data[key], encoding) for key in SERIES_KEYS if key in data
+    }
+    return dense
+
+
+def to_nested(dense):
+    """Convert a dense document back to the nested published payload."""
+    data = {
+        key: value for key, value in dense.items() if key not in ("format", "series")
+    }
+    for key, encoded in dense.get("series", {}).items():
+        data[key] = decode_series(encoded)
+    return data
+
+
+def _same_values(nested, decoded):
+    """Compare nested payloads; float32 values compare at F32_DECIMALS."""
+    if isinstance(nested, dict):
+        return (
+            isinstance(decoded, dict)
+            and set(nested) == set(decoded)
+            and all(_same_values(nested[key], decoded[key]) for key in nested)
+        )
+    if isinstance(nested, float) or isinstance(decoded, float):
+        return round(nested, F32_DECIMALS) == round(decoded, F32_DECIMALS)
+    return nested == decoded
+
+
+if __name__ == "__main__":
+    import json
+    from pathlib import Path
+
+    from snapshot_store import DATA_DIR, load_history
+
+    print("Testing dense format round trip...")
+    print("=" * 50)
+
+    failures = 0
+    for version in {v["file"]: v for v in load_history()}.values():
+        with open(DATA_DIR / version["file"], "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        nested_size = len(json.dumps(data, indent=2, ensure_ascii=False).encode())
+        sizes = []
+        for encoding in ("array", "f32"):
+            dense = to_dense(data, encoding)
+            text = json.dumps(dense, separators=(",", ":"), ensure_ascii=False)
+            sizes.append(len(text.encode()))
+            if not _same_values(data, to_nested(json.loads(text))):
+                print(f"❌ {version['file']}: {encoding} round trip differs")
+                failures += 1
+
+        print(
+            f"{Path(version['file']).name}: nested {nested_size} B, "
+            f"array {sizes[0]} B, f32 {sizes[1]} B"
+        )
+
+    if failures:
+        sys.exit(1)
+    print("\n✅ All snapshots round-trip")
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Backfill of the published history from the git history of public/data.
+
+Every payload the updater ever committed is still in git: first as dated
+indices-YYYY-MM-DD.json files, later as content-addressed snapshots. A
+single "git log --raw" lists the blob of every payload a commit added or
+changed, and one long-running "git cat-file --batch" process streams those
+blobs, so nothing is checked out. Blobs are read once per id (the same file
+renamed or re-added is one blob), parsed in a process pool and reduced to
+the distinct payloads in publication order.
+
+From those the backfill writes a compact revision timeline per series to
+.cache/revisions.json (override the root with HITAS_CACHE_DIR):
+
+    {"head": commit,
+     "versions": [{"date", "sha256", "commit"}, ...],
+     "series": {series: {"YYYY-MM": [[date, value, provisional], ...]}}}
+
+Each list holds only the changes of a value; a null value means it was no
+longer published. head is the commit the history was read up to; when the
+timeline is already current for it, the backfill does nothing (--force
+reads the history again). With --history the payloads are also recorded in the
+SQLite history store (see history_store), and the rajaneliöhinta tilasto
+importer fills in months that the latest snapshot has lost from it.
+
+Usage:
+    python scripts/git_history.py [--rev HEAD] [--workers 4] [--history] [--force]
+    python -m scripts backfill --output revisions.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import subprocess
+from pathlib import Path
+
+from dense_format import SERIES_KEYS
+from snapshot_store import DATED_FILE_PATTERN, HISTORY_NAME, SNAPSHOT_DIR_NAME, payload_hash
+
+REPO_ROOT = Path(__file__).parent.parent
+DATA_PATH = "public/data"
+TIMELINE_PATH = Path(
+    os.environ.get("HITAS_CACHE_DIR", REPO_ROOT / ".cache")
+) / "revisions.json"
+TIMELINE_VERSION = 1
+
+
+def is_payload_path(path):
+    """Whether a path under public/data is a published payload."""
+    directory, _, name = path.rpartition("/")
+    if directory == DATA_PATH:
+        return bool(DATED_FILE_PATTERN.match(name))
+    return (
+        directory == f"{DATA_PATH}/{SNAPSHOT_DIR_NAME}"
+        and name.endswith(".json")
+        and name != HISTORY_NAME
+        and not name.endswith(".dense.json")
+    )
+
+
+def _git(repo, *args):
+    return subprocess.run(
+        ["git", "-C", str(repo), *args], check=True, capture_output=True, text=True
+    ).stdout
+
+
+def resolve_rev(repo=REPO_ROOT, rev="HEAD"):
+    """Full commit id of a revision."""
+    return _git(repo, "rev-parse", "--verify", f"{rev}^{{commit}}").strip()
+
+
+def payload_blobs(repo=REPO_ROOT, rev="HEAD"):
+    """
+    Return [(commit, commit date, blob id)] for every payload file a commit
+    added or modified, oldest commit first, from a single git log.
+    """
+    output = _git(
+        repo,
+        "log",
+        "--reverse",
+        "--raw",
+        "--no-renames",
+        "--no-abbrev",
+        "--format=commit %H %cs",
+        rev,
+        "--",
+        DATA_PATH,
+    )
+    blobs = []
+    commit = day = None
+    for line in output.splitlines():
+        if line.startswith("commit "):
+            _, commit, day = line.split()
+        elif line.startswith(":"):
+            # :old_mode new_mode old_blob new_blob status<TAB>path
+            meta, path = line.split("\t", 1)
+            _, _, _, blob, status = meta.split()
+            if status != "D" and is_payload_path(path):
+                blobs.append((commit, day, blob))
+    return blobs
+
+
+def read_blobs(blob_ids, repo=REPO_ROOT):
+    """
+    Yield (blob id, content) for each id through one git cat-file --batch
+    process. The ids are written from a thread so neither pipe can fill up
+    while the other side waits.
+    """
+    process = subprocess.Popen(
+        ["git", "-C", str(repo), "cat-file", "--batch"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+
+    def write_ids():
+        try:
+            for blob_id in blob_ids:
+                process.stdin.write(f"{blob_id}\n".encode())
+        except BrokenPipeError:
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    writer = threading.Thread(target=write_ids, daemon=True)
+    writer.start()
+    try:
+        for blob_id in blob_ids:
+            header = process.stdout.readline().split()
+            if len(header) != 3 or header[1] != b"blob":
+                raise ValueError(f"git cat-file could not read {blob_id}")
+            content = process.stdout.read(int(header[2]))
+            process.stdout.read(1)  # the newline after each object
+            yield blob_id, content
+    finally:
+        if process.poll() is None and writer.is_alive():
+            # Stopped early: unblock the writer instead of draining git
+            process.kill()
+        writer.join()
+        process.stdout.close()
+        process.wait()
+
+
+def _parse_blob(content):
+    """Parse a payload blob; returns (payload hash, payload) or None."""
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or not any(key in data for key in SERIES_KEYS):
+        return None
+    return payload_hash(data), data
+
+
+def parse_blobs(contents, workers=None):
+    """Parse blob contents, in a process pool when workers > 1."""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(contents) <= 1:
+        return [_parse_blob(content) for content in contents]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(contents) // (workers * 4))
+        return list(executor.map(_parse_blob, contents, chunksize=chunksize))
+
+
+def load_versions(repo=REPO_ROOT, rev="HEAD", workers=None, blobs=None):
+    """
+    Return the distinct payloads in git history, oldest first, as
+    [{"date", "sha256", "commit", "data"}]. A payload is dated by its own
+    "updated" field, or else by the commit that added it; a payload equal
+    to the one before it (apart from the date) is not a new version. blobs
+    can be passed in if payload_blobs() was already called.
+    """
+    blobs = payload_blobs(repo, rev) if blobs is None else blobs
+    unique = list(dict.fromkeys(blob for _, _, blob in blobs))
+    contents = [content for _, content in read_blobs(unique, repo)]
+    parsed = dict(zip(unique, parse_blobs(contents, workers)))
+
+    dated = [
+        (parsed[blob][1].get("updated") or day, commit, *parsed[blob])
+        for commit, day, blob in blobs
+        if parsed[blob] is not None
+    ]
+    # Stable, so payloads of the same date keep their commit order
+    dated.sort(key=lambda entry: entry[0])
+
+    versions = []
+    for day, commit, digest, data in dated:
+        if versions and versions[-1]["sha256"] == digest:
+            continue
+        versions.append({"date": day, "sha256": digest, "commit": commit, "data": data})
+    return versions
+
+
+def build_timeline(versions, head=None):
+    """
+    Reduce the versions to {series: {"YYYY-MM": [[date, value, provisional]]}}
+    holding only the changes of each value. head is the commit read up to.
+    """
+    from history_store import _observations
+
+    series = {}
+    current = {}
+    for version in versions:
+        day = version["date"]
+        published = set()
+        for key, year, month, value, provisional in _observations(version["data"]):
+            month_key = f"{year}-{month:02d}"
+            published.add((key, month_key))
+            if current.get((key, month_key)) != (value, provisional):
+                current[(key, month_key)] = (value, provisional)
+                series.setdefault(key, {}).setdefault(month_key, []).append(
+                    [day, value, int(provisional)]
+                )
+        for key, month_key in list(current):
+            if (key, month_key) not in published:
+                del current[(key, month_key)]
+                series[key][month_key].append([day, None, 0])
+
+    return {
+        "version": TIMELINE_VERSION,
+        "head": head,
+        "versions": [
+            {field: version[field] for field in ("date", "sha256", "commit")}
+            for version in versions
+        ],
+        "series": {
+            key: dict(sorted(months.items())) for key, months in sorted(series.items())
+        },
+    }
+
+
+def write_timeline(timeline, path=TIMELINE_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(timeline, f, separators=(",", ":"))
+        f.write("\n")
+    tmp_path.replace(path)
+
+
+def load_timeline(path=TIMELINE_PATH):
+    """Return the written revision timeline, or None if there is none."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def last_values(timeline, series):
+    """
+    The last published value of every month of a series in the timeline,
+    including months that later disappeared: {year: {month: value}}.
+    """
+    values = {}
+    for month_key, revisions in (timeline or {}).get("series", {}).get(series, {}).items():
+        published = [value for _, value, _ in revisions if value is not None]
+        if published:
+            year, month = map(int, month_key.split("-"))
+            values.setdefault(year, {})[month] = published[-1]
+    return values
+
+
+def record_history(versions, db_path=None):
+    """
+    Record the versions in the history store, skipping those older than
+    what it already holds. Returns the number recorded.
+    """
+    import history_store
+
+    conn = history_store.connect(db_path)
+    try:
+        return sum(
+            history_store.record_snapshot(conn, version["data"], version["date"]) is not None
+            for version in versions
+        )
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repo", default=str(REPO_ROOT))
+    parser.add_argument("--rev", default="HEAD", help="history to read (default HEAD)")
+    parser.add_argument("--workers", type=int, help="parse processes (default: CPUs)")
+    parser.add_argument("--output", default=str(TIMELINE_PATH), help="timeline JSON")
+    parser.add_argument(
+        "--history", action="store_true", help="also record the payloads in the history store"
+    )
+    parser.add_argument("--db", help="history database path (with --history)")
+    parser.add_argument(
+        "--force", action="store_true", help="read the history even if the timeline is current"
+    )
+    args = parser.parse_args(argv)
+
+    head = resolve_rev(args.repo, args.rev)
+    current = load_timeline(args.output)
+    if not args.force and current and current.get("head") == head:
+        print(f"{args.output} is current for {head[:12]}, nothing to backfill")
+        return 0
+
+    start = time.perf_counter()
+    blobs = payload_blobs(args.repo, head)
+    versions = load_versions(args.repo, head, args.workers, blobs)
+    timeline = build_timeline(versions, head)
+    write_timeline(timeline, args.output)
+    elapsed = time.perf_counter() - start
+
+    commits = len({commit for commit, _, _ in blobs})
+    unique = len({blob for _, _, blob in blobs})
+    print(f"Read {unique} blobs ({len(blobs)} payload files) from {commits} commits")
+    print(f"{len(versions)} distinct payloads, {elapsed * 1000:.0f} ms")
+    for series, months in timeline["series"].items():
+        revised = sum(len(revisions) > 1 for revisions in months.values())
+        print(f"  {series:<28} {len(months):>5} months, {revised} revised")
+    print(f"Wrote {args.output}")
+
+    if args.history:
+        print(f"Recorded {record_history(versions, args.db)} payloads in the history store")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
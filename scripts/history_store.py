@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+SQLite history of every published index value.
+
+Each row is one revision of a (series, year, month) value: the value, its
+provisional flag, the date it was first published (first_seen), the last
+date an update run saw it unchanged (last_seen), and the date a different
+value replaced it or it disappeared (superseded, NULL while current). Point
+in time lookups and revision lists are indexed queries instead of scans over
+JSON files.
+
+The database lives in .cache/history.sqlite (override the root with
+HITAS_CACHE_DIR). The published snapshots remain the durable record: a
+missing database is rebuilt from public/data/snapshots/index.json, and
+export_payload() turns the store back into the published JSON layout.
+
+Usage:
+    python scripts/history_store.py sync                      # import published snapshots
+    python scripts/history_store.py at SERIES YYYY-MM [--date YYYY-MM-DD]
+    python scripts/history_store.py revisions SERIES YYYY-MM
+    python scripts/history_store.py export [--date YYYY-MM-DD]
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import argparse
+from datetime import date
+from pathlib import Path
+
+from dense_format import SERIES_KEYS
+from snapshot_store import DATA_DIR, load_history, load_latest, payload_hash
+
+DB_PATH = Path(
+    os.environ.get("HITAS_CACHE_DIR", Path(__file__).parent.parent / ".cache")
+) / "history.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    series      TEXT    NOT NULL,
+    year        INTEGER NOT NULL,
+    month       INTEGER NOT NULL,
+    value       REAL    NOT NULL,
+    provisional INTEGER NOT NULL DEFAULT 0,
+    first_seen  TEXT    NOT NULL,
+    last_seen   TEXT    NOT NULL,
+    superseded  TEXT,
+    snapshot    TEXT    NOT NULL,
+    PRIMARY KEY (series, year, month, first_seen)
+);
+CREATE INDEX IF NOT EXISTS observations_current
+    ON observations (series, superseded);
+CREATE TABLE IF NOT EXISTS snapshots (
+    sha256     TEXT PRIMARY KEY,
+    first_seen TEXT NOT NULL,
+    last_seen  TEXT NOT NULL
+);
+"""
+
+
+def connect(db_path=None):
+    """Open (and create) the history database."""
+    db_path = Path(db_path) if db_path else DB_PATH
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _observations(data):
+    """Yield (series, year, month, value, provisional) from a payload."""
+    provisional = data.get("provisional") or {}
+    for key in SERIES_KEYS:
+        flagged = provisional.get(key, {})
+        for year, months in (data.get(key) or {}).items():
+            flagged_months = set(flagged.get(str(year), ()))
+            for month, value in months.items():
+                if isinstance(value, (int, float)):
+                    yield key, int(year), int(month), value, int(month) in flagged_months
+
+
+def last_recorded(conn):
+    """Date of the most recent recorded snapshot, or None."""
+    return conn.execute("SELECT MAX(last_seen) FROM snapshots").fetchone()[0]
+
+
+def record_snapshot(conn, data, seen=None):
+    """
+    Record a published payload as seen on a date (ISO string, default today).
+    Unchanged values only get a new last_seen, so recording the same data
+    again is cheap. Returns {"added", "revised", "retired"} counts, or None
+    if seen is older than what is already recorded.
+    """
+    seen = seen or date.today().isoformat()
+    latest = last_recorded(conn)
+    if latest and seen < latest:
+        return None
+
+    digest = payload_hash(data)
+    current = {
+        (row["series"], row["year"], row["month"]): (row["value"], bool(row["provisional"]))
+        for row in conn.execute(
+            "SELECT series, year, month, value, provisional FROM observations "
+            "WHERE superseded IS NULL"
+        )
+    }
+
+    counts = {"added": 0, "revised": 0, "retired": 0}
+    unchanged = []
+    with conn:
+        for series, year, month, value, provisional in _observations(data):
+            key = (series, year, month)
+            previous = current.pop(key, None)
+            if previous == (value, provisional):
+                unchanged.append((seen, series, year, month))
+                continue
+
+            if previous is not None:
+                conn.execute(
+                    "UPDATE observations SET superseded = ? "
+                    "WHERE series = ? AND year = ? AND month = ? AND superseded IS NULL",
+                    (seen, series, year, month),
+                )
+                counts["revised"] += 1
+            else:
+                counts["added"] += 1
+            conn.execute(
+                "INSERT OR REPLACE INTO observations "
+                "(series, year, month, value, provisional, first_seen, last_seen, snapshot) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (series, year, month, value, int(provisional), seen, seen, digest),
+            )
+
+        conn.executemany(
+            "UPDATE observations SET last_seen = ? "
+            "WHERE series = ? AND year = ? AND month = ? AND superseded IS NULL",
+            unchanged,
+        )
+
+        # Values missing from this snapshot are no longer published
+        for series, year, month in current:
+            conn.execute(
+                "UPDATE observations SET superseded = ? "
+                "WHERE series = ? AND year = ? AND month = ? AND superseded IS NULL",
+                (seen, series, year, month),
+            )
+            counts["retired"] += 1
+
+        conn.execute(
+            "INSERT INTO snapshots (sha256, first_seen, last_seen) VALUES (?, ?, ?) "
+            "ON CONFLICT (sha256) DO UPDATE SET last_seen = excluded.last_seen",
+            (digest, seen, seen),
+        )
+    return counts
+
+
+def sync(conn, data_dir=DATA_DIR):
+    """
+    Record every published snapshot not yet in the database, oldest first,
+    dated by its publication date. Returns the number of snapshots recorded.
+    """
+    data_dir = Path(data_dir)
+    versions = load_history(data_dir)
+    latest = load_latest(data_dir)
+    if latest and latest.get("updated"):
+        versions = versions + [{"file": latest["file"], "published": latest["updated"]}]
+
+    recorded = 0
+    since = last_recorded(conn)
+    for version in versions:
+        if since and version["published"] < since:
+            continue
+        with open(data_dir / version["file"], "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if record_snapshot(conn, data, version["published"]) is not None:
+            recorded += 1
+    return recorded
+
+
+def update_history(data, seen=None, data_dir=DATA_DIR, db_path=None):
+    """
+    Record a payload from the updater. An empty database is first rebuilt
+    from the published snapshots so first_seen dates reach back in time.
+    """
+    conn = connect(db_path)
+    try:
+        if last_recorded(conn) is None:
+            print(f"History store is empty, imported {sync(conn, data_dir)} snapshots")
+        counts = record_snapshot(conn, data, seen)
+    finally:
+        conn.close()
+
+    if counts and (counts["added"] or counts["revised"] or counts["retired"]):
+        print(
+            f"History: {counts['added']} new, {counts['revised']} revised, "
+            f"{counts['retired']} retired values"
+        )
+    return counts
+
+
+def value_at(conn, series, year, month, as_of=None):
+    """
+    The value of (series, year, month) as published on a date (default:
+    now). Returns {"value", "provisional", "first_seen"} or None.
+    """
+    as_of = as_of or date.today().isoformat()
+    row = conn.execute(
+        "SELECT value, provisional, first_seen FROM observations "
+        "WHERE series = ? AND year = ? AND month = ? AND first_seen <= ? "
+        "AND (superseded IS NULL OR superseded > ?) "
+        "ORDER BY first_seen DESC LIMIT 1",
+        (series, year, month, as_of, as_of),
+    ).fetchone()
+    if row is None:
+        return None
+    return {
+        "value": row["value"],
+        "provisional": bool(row["provisional"]),
+        "first_seen": row["first_seen"],
+    }
+
+
+def revisions(conn, series, year, month):
+    """Every published revision of one value, oldest first."""
+    return [
+        dict(row, provisional=bool(row["provisional"]))
+        for row in conn.execute(
+            "SELECT value, provisional, first_seen, last_seen, superseded, snapshot "
+            "FROM observations WHERE series = ? AND year = ? AND month = ? "
+            "ORDER BY first_seen",
+            (series, year, month),
+        )
+    ]
+
+
+def series_as_of(conn, series, as_of=None):
+    """{year: {month: value}} (int keys) of a series as published on a date."""
+    as_of = as_of or date.today().isoformat()
+    result = {}
+    for row in conn.execute(
+        "SELECT year, month, value FROM observations "
+        "WHERE series = ? AND first_seen <= ? AND (superseded IS NULL OR superseded > ?) "
+        "ORDER BY year, month",
+        (series, as_of, as_of),
+    ):
+        result.setdefault(row["year"], {})[row["month"]] = row["value"]
+    return result
+
+
+def export_payload(conn, as_of=None):
+    """
+    Export the series and provisional flags as published on a date, in the
+    layout written by create_json_file (string keys).
+    """
+    as_of = as_of or date.today().isoformat()
+    data = {}
+    provisional = {}
+    for key in SERIES_KEYS:
+        rows = conn.execute(
+            "SELECT year, month, value, provisional FROM observations "
+            "WHERE series = ? AND first_seen <= ? AND (superseded IS NULL OR superseded > ?) "
+            "ORDER BY year, month",
+            (key, as_of, as_of),
+        ).fetchall()
+        if not rows:
+            continue
+        series = data.setdefault(key, {})
+        for row in rows:
+            series.setdefault(str(row["year"]), {})[str(row["month"])] = row["value"]
+            if row["provisional"]:
+                provisional.setdefault(key, {}).setdefault(str(row["year"]), []).append(
+                    row["month"]
+                )
+    if provisional:
+        data["provisional"] = provisional
+    return data
+
+
+def _year_month(text):
+    year, month = text.split("-")
+    return int(year), int(month)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", help=f"database path (default {DB_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("sync", help="import published snapshots")
+
+    at = commands.add_parser("at", help="value as published on a date")
+    at.add_argument("series", choices=SERIES_KEYS)
+    at.add_argument("month", type=_year_month, help="YYYY-MM")
+    at.add_argument("--date", help="YYYY-MM-DD (default today)")
+
+    history = commands.add_parser("revisions", help="all revisions of a value")
+    history.add_argument("series", choices=SERIES_KEYS)
+    history.add_argument("month", type=_year_month, help="YYYY-MM")
+
+    export = commands.add_parser("export", help="print the payload as of a date")
+    export.add_argument("--date", help="YYYY-MM-DD (default today)")
+
+    args = parser.parse_args(argv)
+    conn = connect(args.db)
+
+    if args.command == "sync":
+        print(f"Recorded {sync(conn)} snapshots")
+    elif args.command == "at":
+        result = value_at(conn, args.series, *args.month, as_of=args.date)
+        if result is None:
+            print("Not published")
+            return 1
+        print(json.dumps(result, ensure_ascii=False))
+    elif args.command == "revisions":
+        for row in revisions(conn, args.series, *args.month):
+            print(json.dumps(row, ensure_ascii=False))
+    elif args.command == "export":
+        print(json.dumps(export_payload(conn, args.date), indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
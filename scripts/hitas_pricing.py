@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Vectorized HITAS maximum price calculation for whole portfolios.
+
+Implements the rules of lib/calculator.ts (calculateRajahinta) over NumPy
+arrays: purchases before 2011 are indexed with vanhat_markkinahintaindeksi,
+later ones with both rakennuskustannusindeksi and markkinahintaindeksi.
+Improvements are indexed after the omavastuu deduction (30 €/m²) and added
+to every index price, and rajaneliöhinta (size × €/m²) is the floor. The
+maximum price is the highest of the available candidates.
+
+A price that cannot be calculated (missing index value, or a month outside
+1..12) is NaN, where the TypeScript version returns null.
+
+Usage:
+    python scripts/hitas_pricing.py [--rows N]    # benchmark N random apartments
+    python scripts/hitas_pricing.py --parity      # compare with the committed golden file
+    python scripts/hitas_pricing.py --parity FILE # compare with pricing-parity.ts output
+"""
+
+import sys
+import json
+import time
+import argparse
+from collections import namedtuple
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from dense_format import encode_series
+
+# Reference results of lib/calculator.ts, written by scripts/pricing-parity.ts
+PARITY_PATH = Path(__file__).parent.parent / "example-data" / "pricing-parity.json"
+
+# Deductible per improvement, €/m² (lib/calculator.ts)
+OMAVASTUU_PER_SQM = 30
+
+# Purchases and improvements before this year use vanhat_markkinahintaindeksi
+OLD_INDEX_BEFORE_YEAR = 2011
+
+PRICE_KEYS = ("rakennuskustannus", "markkinahinta", "vanhat_markkinahinta")
+
+# Monthly values from start (year * 12 + month - 1); missing months are NaN
+SeriesArray = namedtuple("SeriesArray", ["start", "values", "current"])
+PricingTables = namedtuple(
+    "PricingTables",
+    ["rakennuskustannus", "markkinahinta", "vanhat_markkinahinta", "price_per_sqm"],
+)
+
+
+def series_array(series, today):
+    """
+    Convert a {year: {month: value}} series to a SeriesArray. current is the
+    latest value not in the future (getLatestIndex), or NaN.
+    """
+    encoded = encode_series(series or {})
+    if not encoded["start"]:
+        return SeriesArray(0, np.empty(0), np.nan)
+
+    start = encoded["start"][0] * 12 + encoded["start"][1] - 1
+    # Zero and missing values both count as unavailable, as in the TypeScript checks
+    values = np.array(
+        [value if value else np.nan for value in encoded["values"]], dtype=np.float64
+    )
+
+    now = today.year * 12 + today.month - 1 - start
+    past = values[: max(now + 1, 0)]
+    available = np.flatnonzero(~np.isnan(past))
+    current = past[available[-1]] if len(available) else np.nan
+    return SeriesArray(start, values, current)
+
+
+def load_pricing_tables(data, today=None):
+    """Build pricing tables from a payload written by create_json_file."""
+    today = today or date.today()
+    raja = data.get("rajaneliohinta") or {}
+    return PricingTables(
+        series_array(data.get("rakennuskustannusindeksi"), today),
+        series_array(data.get("markkinahintaindeksi"), today),
+        series_array(data.get("vanhat_markkinahintaindeksi"), today),
+        raja.get("price_per_sqm") or np.nan,
+    )
+
+
+def _multipliers(series, year, month):
+    """
+    current / value at (year, month) for each row; NaN where unavailable,
+    including months outside 1..12 (which would roll into the next year).
+    """
+    index = year * 12 + month - 1 - series.start
+    valid = (month >= 1) & (month <= 12) & (index >= 0) & (index < len(series.values))
+    values = np.full(index.shape, np.nan)
+    values[valid] = series.values[index[valid]]
+    return series.current / values
+
+
+def index_improvements(tables, price, year, month, size):
+    """
+    Indexed value of each improvement (getImprovementIndexedValue).
+    size is the size of the apartment the improvement belongs to.
+    """
+    amount = price - size * OMAVASTUU_PER_SQM
+    old = year < OLD_INDEX_BEFORE_YEAR
+
+    rk = np.nan_to_num(amount * _multipliers(tables.rakennuskustannus, year, month))
+    mh = np.nan_to_num(amount * _multipliers(tables.markkinahinta, year, month))
+    vanhat = np.nan_to_num(
+        amount * _multipliers(tables.vanhat_markkinahinta, year, month)
+    )
+
+    new = np.where((rk >= mh) & (rk > 0), rk, np.where(mh > 0, mh, 0.0))
+    indexed = np.where(old, vanhat, new)
+    return np.where(amount > 0, indexed, 0.0)
+
+
+def price_batch(
+    tables,
+    original_price,
+    year,
+    month,
+    size,
+    improvement_owner=None,
+    improvement_price=None,
+    improvement_year=None,
+    improvement_month=None,
+):
+    """
+    Price N apartments in one pass.
+
+    Apartment arguments are length-N arrays. Improvements are flat length-M
+    arrays; improvement_owner holds the row of the apartment each belongs to.
+    Returns a dict of length-N arrays: rakennuskustannus, markkinahinta,
+    vanhat_markkinahinta, rajaneliohinta, improvements and max_price. A
+    month outside 1..12 has no index value, as in calculator.ts.
+    """
+    original_price = np.asarray(original_price, dtype=np.float64)
+    year = np.asarray(year, dtype=np.int64)
+    month = np.asarray(month, dtype=np.int64)
+    size = np.asarray(size, dtype=np.float64)
+    old = year < OLD_INDEX_BEFORE_YEAR
+
+    prices = {
+        "rakennuskustannus": np.where(
+            old, np.nan, original_price * _multipliers(tables.rakennuskustannus, year, month)
+        ),
+        "markkinahinta": np.where(
+            old, np.nan, original_price * _multipliers(tables.markkinahinta, year, month)
+        ),
+        "vanhat_markkinahinta": np.where(
+            old,
+            original_price * _multipliers(tables.vanhat_markkinahinta, year, month),
+            np.nan,
+        ),
+    }
+
+    improvements = np.zeros(len(original_price))
+    if improvement_owner is not None and len(improvement_owner):
+        owner = np.asarray(improvement_owner, dtype=np.int64)
+        indexed = index_improvements(
+            tables,
+            np.asarray(improvement_price, dtype=np.float64),
+            np.asarray(improvement_year, dtype=np.int64),
+            np.asarray(improvement_month, dtype=np.int64),
+            size[owner],
+        )
+        improvements = np.bincount(owner, weights=indexed, minlength=len(original_price))
+        for key in PRICE_KEYS:
+            # NaN prices stay NaN: improvements only add to calculable prices
+            prices[key] = prices[key] + improvements
+
+    # Size 0 has no rajaneliöhinta, like the truthiness check in TypeScript
+    prices["rajaneliohinta"] = np.where(size > 0, size * tables.price_per_sqm, np.nan)
+    prices["improvements"] = improvements
+
+    candidates = np.stack(
+        [prices[key] for key in PRICE_KEYS + ("rajaneliohinta",)]
+    )
+    prices["max_price"] = np.where(
+        np.isnan(candidates).all(axis=0),
+        0.0,
+        np.nanmax(np.where(np.isnan(candidates), -np.inf, candidates), axis=0),
+    )
+    return prices
+
+
+def _finite(value):
+    number = float(value)
+    if not np.isfinite(number):
+        raise ValueError(f"{value!r} is not a number")
+    return number
+
+
+def _month(year, month):
+    year, month = int(year), int(month)
+    if not 1 <= month <= 12:
+        raise ValueError(f"month {month} is not in 1..12")
+    return year, month
+
+
+def parse_record(record):
+    """
+    Validate an apartment record and convert its fields to numbers. Raises
+    ValueError (or TypeError) for a missing or malformed value, including
+    months outside 1..12 in the purchase or an improvement.
+    """
+    year, month = _month(record["year"], record["month"])
+    improvements = []
+    for improvement in record.get("improvements") or ():
+        improvement_year, improvement_month = _month(improvement["year"], improvement["month"])
+        improvements.append(
+            {
+                "price": _finite(improvement["price"]),
+                "year": improvement_year,
+                "month": improvement_month,
+            }
+        )
+    return {
+        "original_price": _finite(record["original_price"]),
+        "year": year,
+        "month": month,
+        "size": _finite(record["size"]),
+        "improvements": improvements,
+    }
+
+
+def records_to_arrays(records):
+    """
+    Flatten apartment records ({original_price, year, month, size,
+    improvements}) into keyword arguments for price_batch. Raises
+    ValueError for a record parse_record rejects.
+    """
+    records = [parse_record(record) for record in records]
+    owners = []
+    improvements = []
+    for row, record in enumerate(records):
+        for improvement in record["improvements"]:
+            owners.append(row)
+            improvements.append(improvement)
+
+    return {
+        "original_price": [record["original_price"] for record in records],
+        "year": [record["year"] for record in records],
+        "month": [record["month"] for record in records],
+        "size": [record["size"] for record in records],
+        "improvement_owner": owners,
+        "improvement_price": [item["price"] for item in improvements],
+        "improvement_year": [item["year"] for item in improvements],
+        "improvement_month": [item["month"] for item in improvements],
+    }
+
+
+def series_multiplier(tables, key, year, month):
+    """current / value of one series at (year, month), or NaN (key as in PRICE_KEYS)."""
+    series = getattr(tables, key)
+    index = year * 12 + month - 1 - series.start
+    if 1 <= month <= 12 and 0 <= index < len(series.values):
+        return float(series.current / series.values[index])
+    return np.nan
+
+
+def price_apartment(
+    tables, original_price, year, month, size, improvements=(), multiplier=None
+):
+    """
+    Price one apartment without array overhead; same rules and result keys
+    as one row of price_batch. improvements are {"price", "year", "month"}
+    mappings. multiplier(key, year, month) can be replaced with a memoized
+    lookup; it defaults to series_multiplier on tables.
+    """
+    if multiplier is None:
+        def multiplier(key, year, month):
+            return series_multiplier(tables, key, year, month)
+
+    total = 0.0
+    for improvement in improvements:
+        amount = improvement["price"] - size * OMAVASTUU_PER_SQM
+        if amount <= 0:
+            continue
+        if improvement["year"] < OLD_INDEX_BEFORE_YEAR:
+            vanhat = amount * multiplier(
+                "vanhat_markkinahinta", improvement["year"], improvement["month"]
+            )
+            total += 0.0 if np.isnan(vanhat) else vanhat
+            continue
+        rk = amount * multiplier("rakennuskustannus", improvement["year"], improvement["month"])
+        mh = amount * multiplier("markkinahinta", improvement["year"], improvement["month"])
+        rk = 0.0 if np.isnan(rk) else rk
+        mh = 0.0 if np.isnan(mh) else mh
+        if rk >= mh and rk > 0:
+            total += rk
+        elif mh > 0:
+            total += mh
+
+    if year < OLD_INDEX_BEFORE_YEAR:
+        keys = ("vanhat_markkinahinta",)
+    else:
+        keys = ("rakennuskustannus", "markkinahinta")
+    prices = {key: np.nan for key in PRICE_KEYS}
+    for key in keys:
+        prices[key] = original_price * multiplier(key, year, month) + total
+
+    prices["rajaneliohinta"] = size * tables.price_per_sqm if size > 0 else np.nan
+    prices["improvements"] = total
+
+    candidates = [
+        prices[key] for key in PRICE_KEYS + ("rajaneliohinta",) if not np.isnan(prices[key])
+    ]
+    prices["max_price"] = max(candidates) if candidates else 0.0
+    return prices
+
+
+def random_portfolio(rows, rng, first_year=1990, last_year=None):
+    """Random apartments and improvements (about one per two apartments)."""
+    last_year = last_year or date.today().year
+    apartments = {
+        "original_price": rng.uniform(50_000, 600_000, rows).round(),
+        "year": rng.integers(first_year, last_year + 1, rows),
+        "month": rng.integers(1, 13, rows),
+        "size": rng.uniform(20, 150, rows).round(1),
+    }
+    count = rows // 2
+    owner = rng.integers(0, rows, count)
+    improvements = {
+        "improvement_owner": owner,
+        "improvement_price": rng.uniform(0, 40_000, count).round(),
+        "improvement_year": np.maximum(
+            apartments["year"][owner], rng.integers(first_year, last_year + 1, count)
+        ),
+        "improvement_month": rng.integers(1, 13, count),
+    }
+    return apartments, improvements
+
+
+def check_parity(tables, cases):
+    """
+    Compare price_batch and price_apartment with TypeScript results.
+    Returns the number of mismatching values.
+    """
+    apartments = {
+        "original_price": [case["originalPrice"] for case in cases],
+        "year": [case["year"] for case in cases],
+        "month": [case["month"] for case in cases],
+        "size": [case["size"] for case in cases],
+    }
+    flat = [
+        (row, improvement)
+        for row, case in enumerate(cases)
+        for improvement in case["improvements"]
+    ]
+    improvements = {
+        "improvement_owner": [row for row, _ in flat],
+        "improvement_price": [improvement["price"] for _, improvement in flat],
+        "improvement_year": [improvement["year"] for _, improvement in flat],
+        "improvement_month": [improvement["month"] for _, improvement in flat],
+    }
+    prices = price_batch(tables, **apartments, **improvements)
+
+    mismatches = 0
+    for row, case in enumerate(cases):
+        single = price_apartment(
+            tables,
+            case["originalPrice"],
+            case["year"],
+            case["month"],
+            case["size"],
+            case["improvements"],
+        )
+        for key, value in case["expected"].items():
+            for path, actual in (("batch", prices[key][row]), ("single", single[key])):
+                if value is None:
+                    same = bool(np.isnan(actual))
+                else:
+                    same = bool(np.isclose(actual, value, rtol=1e-9, atol=1e-6))
+                if not same:
+                    mismatches += 1
+                    print(f"❌ case {row} {key} ({path}): expected {value}, got {actual}")
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument(
+        "--parity",
+        nargs="?",
+        const=str(PARITY_PATH),
+        help="JSON written by scripts/pricing-parity.ts (default: the committed golden file)",
+    )
+    args = parser.parse_args(argv)
+
+    from snapshot_store import load_snapshot
+
+    if args.parity:
+        with open(args.parity, "r", encoding="utf-8") as f:
+            golden = json.load(f)
+        tables = load_pricing_tables(
+            golden["data"], date.fromisoformat(golden["today"])
+        )
+        mismatches = check_parity(tables, golden["cases"])
+        if mismatches:
+            print(f"\n❌ {mismatches} values differ from lib/calculator.ts")
+            return 1
+        print(f"✅ {len(golden['cases'])} cases match lib/calculator.ts")
+        return 0
+
+    data = load_snapshot()
+    if not data:
+        print("Snapshot store is empty")
+        return 1
+
+    tables = load_pricing_tables(data)
+    apartments, improvements = random_portfolio(args.rows, np.random.default_rng(0))
+
+    start = time.perf_counter()
+    prices = price_batch(tables, **apartments, **improvements)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"Priced {args.rows} apartments with "
+        f"{len(improvements['improvement_owner'])} improvements "
+        f"in {elapsed * 1000:.0f} ms ({args.rows / elapsed:,.0f} rows/s)"
+    )
+    print(f"Mean maximum price: {np.mean(prices['max_price']):,.0f} €")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
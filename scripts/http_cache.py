@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP cache for the source PDFs.
+
+Every download sends If-None-Match/If-Modified-Since from the previous
+response. Bodies are stored by SHA-256 and metadata by URL, so a 304 or a
+byte-identical body can be reported as unchanged and the updater can skip
+parsing and writing altogether.
+
+Downloads go through the shared pooled client in http_client.py (retries,
+timeouts, size cap) and are streamed straight into the body store, so a
+FetchResult points at a file that parsers can map instead of holding the
+PDF in memory.
+
+The cache lives in .cache/http (override with HITAS_CACHE_DIR) and the
+source base URL can be pointed at a local stand-in server with
+HITAS_SOURCE_BASE_URL.
+"""
+
+import os
+import json
+import mmap
+import hashlib
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_SOURCE_BASE_URL = "https://www.hel.fi/static/kv/asunto-osasto/"
+SOURCE_BASE_URL = os.environ.get("HITAS_SOURCE_BASE_URL", DEFAULT_SOURCE_BASE_URL)
+
+CACHE_DIR = Path(
+    os.environ.get("HITAS_CACHE_DIR", Path(__file__).parent.parent / ".cache")
+) / "http"
+
+
+class FetchResult:
+    """
+    A fetched body in the cache. path: the stored body, sha256: hex digest
+    of it, changed: False on a 304 or when the body is identical to the
+    previously cached one, status: HTTP status. data reads the body.
+    """
+
+    def __init__(self, path, sha256, changed, status=200):
+        self.path = Path(path)
+        self.sha256 = sha256
+        self.changed = changed
+        self.status = status
+        self.size = self.path.stat().st_size
+
+    @property
+    def data(self):
+        return self.path.read_bytes()
+
+    def __repr__(self):
+        return (
+            f"FetchResult({self.path.name}, size={self.size}, "
+            f"changed={self.changed}, status={self.status})"
+        )
+
+
+@contextmanager
+def map_file(path):
+    """Map a stored body read-only; yields a file-like mmap for pdfplumber."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            yield f
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            yield view
+
+
+def source_url(filename):
+    """Build the URL of a source document under the configured base URL."""
+    base = SOURCE_BASE_URL if SOURCE_BASE_URL.endswith("/") else SOURCE_BASE_URL + "/"
+    return base + filename
+
+
+def _meta_path(url, cache_dir):
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+    return cache_dir / "meta" / f"{key}.json"
+
+
+def _body_path(digest, cache_dir):
+    return cache_dir / "bodies" / digest
+
+
+def _load_meta(url, cache_dir):
+    meta_path = _meta_path(url, cache_dir)
+    if not meta_path.exists():
+        return None
+
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # Metadata without its body is useless for revalidation
+    if not _body_path(meta.get("sha256", ""), cache_dir).exists():
+        return None
+    return meta
+
+
+def _store(url, tmp_path, digest, headers, cache_dir):
+    """Move a downloaded body into the store and record its metadata."""
+    body_path = _body_path(digest, cache_dir)
+    if body_path.exists():
+        tmp_path.unlink()
+    else:
+        tmp_path.replace(body_path)
+
+    meta = {
+        "url": url,
+        "sha256": digest,
+        "size": body_path.stat().st_size,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+    }
+    meta_path = _meta_path(url, cache_dir)
+    meta_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return body_path
+
+
+def cached_body(url, cache_dir=None):
+    """Path of the last fetched body of a URL in the cache, or None."""
+    cache_dir = Path(cache_dir) if cache_dir else CACHE_DIR
+    meta = _load_meta(url, cache_dir)
+    return _body_path(meta["sha256"], cache_dir) if meta else None
+
+
+def fetch(url, cache_dir=None, client=None):
+    """
+    Fetch a URL through the cache.
+    Returns a FetchResult, or raises http_client.HTTPStatusError, a
+    network error or ResponseTooLarge once retries are exhausted.
+    """
+    # http.client pulls in ssl and email; only load them when downloading
+    from http_client import HTTPStatusError, default_client
+
+    cache_dir = Path(cache_dir) if cache_dir else CACHE_DIR
+    meta = _load_meta(url, cache_dir)
+
+    headers = {}
+    if meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    client = client or default_client()
+    response = client.download(url, cache_dir / "bodies", headers)
+
+    if response.status == 304:
+        if not meta:
+            # Nothing was asked conditionally, so there is no copy to reuse
+            raise HTTPStatusError(304, url)
+        body_path = _body_path(meta["sha256"], cache_dir)
+        print(f"Not modified (304), using cached copy ({body_path.stat().st_size} bytes)")
+        return FetchResult(body_path, meta["sha256"], False, 304)
+
+    digest = response.sha256
+    changed = not meta or meta["sha256"] != digest
+    body_path = _store(url, response.path, digest, response.headers, cache_dir)
+
+    if not changed:
+        print(f"Downloaded body is identical to cached copy ({response.size} bytes)")
+    return FetchResult(body_path, digest, changed)
+
+
+if __name__ == "__main__":
+    # Self-check against a local stand-in server
+    import tempfile
+    import threading
+    from functools import partial
+    from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+    print("Testing HTTP cache against a local server...")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        serve_dir = Path(tmp) / "serve"
+        serve_dir.mkdir()
+        (serve_dir / "test.pdf").write_bytes(b"%PDF-1.4 test body")
+
+        handler = partial(SimpleHTTPRequestHandler, directory=str(serve_dir))
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/test.pdf"
+
+        try:
+            first = fetch(url, Path(tmp) / "cache")
+            second = fetch(url, Path(tmp) / "cache")
+            with map_file(second.path) as view:
+                assert view.read() == b"%PDF-1.4 test body"
+            assert first.changed, "first fetch should report a change"
+            assert not second.changed, "second fetch should be served from cache"
+            assert first.data == second.data
+
+            (serve_dir / "test.pdf").write_bytes(b"%PDF-1.4 new body")
+            os.utime(serve_dir / "test.pdf", (2000000000, 2000000000))
+            third = fetch(url, Path(tmp) / "cache")
+            assert third.changed and third.data == b"%PDF-1.4 new body"
+        finally:
+            server.shutdown()
+
+    print("\n✅ HTTP cache works")
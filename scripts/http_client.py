@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for the source downloads.
+
+One HttpClient keeps a small pool of keep-alive connections per host, so
+the three source PDFs on www.hel.fi reuse connections instead of doing a
+TLS handshake each. Every request has a connect and a read timeout.
+Connection errors, timeouts and 429/5xx responses are retried with
+exponentially growing, fully jittered backoff (honouring a numeric
+Retry-After). Bodies are streamed in chunks to a temporary file next to
+their destination, hashed on the way and capped in size. The file can then
+be renamed into place (see http_cache) and mapped with http_cache.map_file()
+instead of being held in memory.
+
+Limits can be tuned with HITAS_HTTP_TIMEOUT (read timeout in seconds),
+HITAS_HTTP_ATTEMPTS and HITAS_MAX_DOWNLOAD_BYTES (default 50 MB).
+"""
+
+import os
+import sys
+import time
+import random
+import hashlib
+import tempfile
+import threading
+import http.client
+from collections import namedtuple
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+import run_metrics
+
+CONNECT_TIMEOUT = 10.0
+READ_TIMEOUT = float(os.environ.get("HITAS_HTTP_TIMEOUT", 30))
+MAX_ATTEMPTS = int(os.environ.get("HITAS_HTTP_ATTEMPTS", 4))
+MAX_DOWNLOAD_BYTES = int(os.environ.get("HITAS_MAX_DOWNLOAD_BYTES", 50 * 1024 * 1024))
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+CHUNK_SIZE = 64 * 1024
+MAX_IDLE_PER_HOST = 4
+MAX_REDIRECTS = 5
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+USER_AGENT = "rajahinta-updater (+https://github.com/vepasto/rajahinta)"
+
+# status: 200 or 304, headers: response headers, path: temporary file with
+# the body (None on a 304), size and sha256 of the body, url: final URL
+Download = namedtuple("Download", ["status", "headers", "path", "size", "sha256", "url"])
+
+
+class HTTPStatusError(OSError):
+    """A response other than 200, 304 or a redirect."""
+
+    def __init__(self, status, url, retry_after=None):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.url = url
+        self.retry_after = retry_after
+
+
+class ResponseTooLarge(ValueError):
+    """The body is larger than the configured cap."""
+
+
+def _retry_after(headers):
+    value = headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        # HTTP-date values are rare enough to fall back to the backoff
+        return None
+
+
+class HttpClient:
+    """Thread-safe GET client with pooled keep-alive connections."""
+
+    def __init__(
+        self,
+        connect_timeout=CONNECT_TIMEOUT,
+        read_timeout=READ_TIMEOUT,
+        max_attempts=MAX_ATTEMPTS,
+        max_bytes=MAX_DOWNLOAD_BYTES,
+        verify=False,
+    ):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_attempts = max_attempts
+        self.max_bytes = max_bytes
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._ssl_context = None
+        self._verify = verify
+
+    def _context(self):
+        if self._ssl_context is None:
+            import ssl
+
+            # Certificates are not verified by default (for compatibility),
+            # as the downloaders always did; the bodies are checksummed
+            self._ssl_context = (
+                ssl.create_default_context() if self._verify else ssl._create_unverified_context()
+            )
+        return self._ssl_context
+
+    def _acquire(self, scheme, netloc):
+        """Return (connection, reused) for a host, preferring an idle one."""
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop(), True
+        return self._connect(scheme, netloc), False
+
+    def _connect(self, scheme, netloc):
+        if scheme == "https":
+            connection = http.client.HTTPSConnection(
+                netloc, timeout=self.connect_timeout, context=self._context()
+            )
+        elif scheme == "http":
+            connection = http.client.HTTPConnection(netloc, timeout=self.connect_timeout)
+        else:
+            raise ValueError(f"unsupported URL scheme {scheme}")
+        connection.connect()
+        connection.sock.settimeout(self.read_timeout)
+        return connection
+
+    def _release(self, scheme, netloc, connection, response):
+        """Return a connection to the pool if the server keeps it open."""
+        if response.will_close:
+            connection.close()
+            return
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < MAX_IDLE_PER_HOST:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        """Close every idle connection."""
+        with self._lock:
+            connections = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for connection in connections:
+            connection.close()
+
+    def _stream(self, response, dest_dir, max_bytes):
+        """Write a response body to a temporary file; returns (path, size, sha256)."""
+        length = response.getheader("Content-Length")
+        if length and length.isdigit() and int(length) > max_bytes:
+            raise ResponseTooLarge(f"body of {length} bytes exceeds {max_bytes}")
+
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=dest_dir, suffix=".tmp", delete=False) as f:
+            try:
+                while True:
+                    chunk = response.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise ResponseTooLarge(f"body exceeds {max_bytes} bytes")
+                    digest.update(chunk)
+                    f.write(chunk)
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+        return Path(f.name), size, digest.hexdigest()
+
+    def _request(self, scheme, netloc, path, headers):
+        """Send a GET; returns (connection, response)."""
+        connection, reused = self._acquire(scheme, netloc)
+        try:
+            connection.request("GET", path, headers=headers)
+            return connection, connection.getresponse()
+        except ConnectionError:
+            # RemoteDisconnected included
+            connection.close()
+            if not reused:
+                raise
+        except BaseException:
+            connection.close()
+            raise
+        # The server closed an idle keep-alive connection, which says nothing
+        # about the request, so it is sent again at once on a new connection
+        connection = self._connect(scheme, netloc)
+        try:
+            connection.request("GET", path, headers=headers)
+            return connection, connection.getresponse()
+        except BaseException:
+            connection.close()
+            raise
+
+    def _get_once(self, url, dest_dir, headers, max_bytes):
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+            connection, response = self._request(parts.scheme, parts.netloc, path, headers)
+            status = response.status
+            try:
+                if status == 200:
+                    body = self._stream(response, dest_dir, max_bytes)
+                else:
+                    # Drain so the connection can be reused
+                    response.read()
+            except BaseException:
+                connection.close()
+                raise
+            self._release(parts.scheme, parts.netloc, connection, response)
+
+            if status == 200:
+                return Download(status, response.headers, *body, url)
+            if status == 304:
+                return Download(status, response.headers, None, 0, None, url)
+            if status in REDIRECT_STATUSES and response.getheader("Location"):
+                url = urljoin(url, response.getheader("Location"))
+                continue
+            raise HTTPStatusError(status, url, _retry_after(response.headers))
+        raise HTTPStatusError(status, url)
+
+    def download(self, url, dest_dir, headers=None, max_bytes=None):
+        """
+        GET a URL and stream a 200 body into a temporary file in dest_dir
+        (the caller renames or deletes it). Redirects are followed and
+        transient failures retried. Returns a Download; raises
+        HTTPStatusError, ResponseTooLarge or the last network error.
+        """
+        request_headers = {
+            "User-Agent": USER_AGENT,
+            "Accept-Encoding": "identity",
+            **(headers or {}),
+        }
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return self._get_once(url, Path(dest_dir), request_headers, max_bytes)
+            except HTTPStatusError as e:
+                if e.status not in RETRY_STATUSES or attempt == self.max_attempts:
+                    raise
+                error, delay = e, e.retry_after
+            except (OSError, http.client.HTTPException) as e:
+                # Connection errors and timeouts (socket.timeout is an OSError)
+                if attempt == self.max_attempts:
+                    raise
+                error, delay = e, None
+
+            backoff = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** (attempt - 1)))
+            delay = min(BACKOFF_CAP, delay) if delay is not None else backoff
+            print(f"Retrying {url} in {delay:.1f} s ({error})", file=sys.stderr)
+            run_metrics.count("http_retries")
+            time.sleep(delay)
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def default_client():
+    """The process-wide client shared by all downloaders."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
+
+
+if __name__ == "__main__":
+    # Self-check against a local server that fails, redirects and keeps alive
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    body = os.urandom(300_000)
+    connections = []
+    failures = {"count": 2}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            connections.append(self.client_address)
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, payload=b"", headers=()):
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == "/flaky" and failures["count"]:
+                failures["count"] -= 1
+                self._send(503, b"busy", [("Retry-After", "0")])
+            elif self.path == "/moved":
+                self._send(302, headers=[("Location", "/body")])
+            elif self.path in ("/body", "/flaky"):
+                if self.headers.get("If-None-Match") == '"v1"':
+                    self._send(304)
+                else:
+                    self._send(200, body, [("ETag", '"v1"')])
+            else:
+                self._send(404, b"missing")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print("Testing HTTP client against a local server...")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as tmp:
+        client = HttpClient()
+        try:
+            first = client.download(f"{base}/body", tmp)
+            assert first.path.read_bytes() == body
+            assert first.sha256 == hashlib.sha256(body).hexdigest()
+
+            assert client.download(f"{base}/moved", tmp).sha256 == first.sha256
+            assert client.download(f"{base}/flaky", tmp).size == len(body)
+            assert client.download(f"{base}/body", tmp, {"If-None-Match": '"v1"'}).status == 304
+
+            try:
+                client.download(f"{base}/missing", tmp)
+                raise AssertionError("404 should not be retried into success")
+            except HTTPStatusError as e:
+                assert e.status == 404
+            try:
+                client.download(f"{base}/body", tmp, max_bytes=1000)
+                raise AssertionError("oversized body should be rejected")
+            except ResponseTooLarge:
+                pass
+
+            print(f"{len(connections)} connection(s) for 9 responses")
+            assert len(connections) <= 2, "keep-alive connections should be reused"
+            assert len(list(Path(tmp).iterdir())) == 3, "only the 200 bodies are kept"
+        finally:
+            client.close()
+            server.shutdown()
+
+    print("\n✅ HTTP client works")
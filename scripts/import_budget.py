@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for the updater.
+
+Imports each entry module in a fresh interpreter with -X importtime and
+fails if it pulls in a heavy dependency that should only load on demand
+(pdfplumber, pdfminer, pypdfium2, numpy, cairosvg) or if its cumulative
+import time exceeds the budget. The best of several runs is used, since a
+single cold start is noisy. Run it after changing imports of the updater
+modules so the "nothing changed" path keeps starting in milliseconds.
+
+Usage:
+    python scripts/import_budget.py [--runs 5] [--scale 2.0]
+    python -m scripts importtime
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+
+# Module: cumulative import time budget in milliseconds
+BUDGETS_MS = {
+    "update_indices": 80,
+    "snapshot_store": 40,
+    "history_store": 40,
+}
+DEFERRED_MODULES = ("pdfplumber", "pdfminer", "pypdfium2", "numpy", "cairosvg")
+
+
+def import_times(module):
+    """
+    Import a module in a new interpreter with -X importtime.
+    Returns {imported module: cumulative microseconds}.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SCRIPTS_DIR,
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE=""),
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{process.stderr}")
+
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def check_module(module, runs=5):
+    """Returns (best cumulative ms, deferred modules that were imported)."""
+    best = None
+    heavy = set()
+    for _ in range(runs):
+        times = import_times(module)
+        heavy |= {name.split(".")[0] for name in times} & set(DEFERRED_MODULES)
+        elapsed = times[module] / 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, sorted(heavy)
+
+
+def startup_ms(runs=5):
+    """Best wall-clock time of `python -m scripts update --help`."""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "scripts", "update", "--help"],
+            cwd=SCRIPTS_DIR.parent,
+            capture_output=True,
+            check=True,
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiply the budgets (slow machines)"
+    )
+    args = parser.parse_args(argv)
+
+    print("Import time budget")
+    print("=" * 50)
+    failures = []
+    for module, budget in BUDGETS_MS.items():
+        budget *= args.scale
+        elapsed, heavy = check_module(module, args.runs)
+        ok = elapsed <= budget and not heavy
+        print(f"{'✅' if ok else '❌'} {module:<20} {elapsed:7.1f} ms (budget {budget:.0f} ms)")
+        if heavy:
+            print(f"   imports deferred modules: {', '.join(heavy)}")
+        if not ok:
+            failures.append(module)
+
+    print(f"\npython -m scripts update --help: {startup_ms(args.runs):.1f} ms wall clock")
+
+    if failures:
+        print(f"\n❌ Over budget: {', '.join(failures)}")
+        return 1
+    print("\n✅ All entry modules are within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
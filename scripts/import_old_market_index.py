@@ -5,18 +5,14 @@ Source: https://www.hel.fi/static/kv/asunto-osasto/hitas-markkinahintaindeksi.pd
 """
 
 import re
-import io
-import urllib.request
-import ssl
 
-try:
-    import pdfplumber
-except ImportError:
-    print("Error: pdfplumber not installed. Install with: pip install pdfplumber")
-    raise
+from http_cache import fetch, source_url
+from pdf_backends import get_backend
 
 
-OLD_INDEX_PDF_URL = "https://www.hel.fi/static/kv/asunto-osasto/hitas-markkinahintaindeksi.pdf"
+OLD_INDEX_PDF_URL = source_url("hitas-markkinahintaindeksi.pdf")
+# Bump when the output of parse_old_market_index_table changes (invalidates the parse cache)
+PARSER_VERSION = 1
 
 
 def download_old_index_pdf():
@@ -24,101 +20,91 @@ def download_old_index_pdf():
     print(f"Downloading old market index PDF from {OLD_INDEX_PDF_URL}...")
     
     try:
-        # Create SSL context that doesn't verify certificates (for compatibility)
-        ssl_context = ssl._create_unverified_context()
-        
-        with urllib.request.urlopen(OLD_INDEX_PDF_URL, context=ssl_context) as response:
-            pdf_data = response.read()
-        print(f"Old market index PDF downloaded successfully ({len(pdf_data)} bytes)")
-        return io.BytesIO(pdf_data)
+        result = fetch(OLD_INDEX_PDF_URL)
+        print(f"Old market index PDF downloaded successfully ({result.size} bytes)")
+        # The parsers open the cached file themselves; no copy in memory
+        return result.path
     except Exception as e:
         print(f"Error downloading old market index PDF: {e}")
         return None
 
 
-def parse_old_market_index_table(pdf_data):
+def parse_old_market_index_table(pdf_data, backend=None):
     """
     Parse the old market price index table from PDF.
     The table structure is:
     V/KK | 1 | 2 | 3 | 4 | 5 | 6 | 7 | 8 | 9 | 10 | 11 | 12
     2025 | 501.6 | 504.3 | ...
     
+    backend names the pdf_backends backend that extracts the table rows
+    (default: pdfplumber's table extraction).
     Returns a dictionary: {year: {month: value}}
     """
     indices = {}
     
     print("Parsing old market index PDF...")
     
-    with pdfplumber.open(pdf_data) as pdf:
-        for page_num, page in enumerate(pdf.pages, 1):
-            # Extract tables from the page
-            tables = page.extract_tables()
+    for rows in get_backend(backend).table_rows(pdf_data):
+        # Process each row
+        for row in rows:
+            if not row or len(row) < 2:
+                continue
             
-            for table in tables:
-                # Skip empty tables
-                if not table:
-                    continue
-                
-                # Process each row
-                for row in table:
-                    if not row or len(row) < 2:
-                        continue
-                    
-                    # Try to find the year in the first few columns
-                    year = None
-                    year_col_idx = None
-                    
-                    for i in range(min(3, len(row))):
-                        if row[i]:
-                            cell_str = str(row[i]).strip()
-                            if cell_str.isdigit() and len(cell_str) == 4:
-                                try:
-                                    potential_year = int(cell_str)
-                                    if 1978 <= potential_year <= 2100:
-                                        year = potential_year
-                                        year_col_idx = i
-                                        break
-                                except ValueError:
-                                    pass
-                    
-                    # Skip if no valid year found
-                    if year is None:
-                        continue
-                    
-                    # Initialize year in indices
-                    if year not in indices:
-                        indices[year] = {}
-                    
-                    # Extract monthly values from remaining columns
-                    # We expect 12 months of data after the year column
-                    values = []
-                    for i in range(year_col_idx + 1, len(row)):
-                        if row[i] is not None:
-                            value_str = str(row[i]).strip()
-                            if value_str and value_str != "" and value_str != "None":
-                                try:
-                                    value = float(value_str)
-                                    values.append(value)
-                                except ValueError:
-                                    pass
-                    
-                    # Assign values to months
-                    # The pattern seems to be: each value might be repeated (e.g., 504.3, 504.3, 504.3)
-                    # So we need to extract unique consecutive values or take every nth value
-                    # Based on the data structure, values appear to be in groups
-                    
-                    # For simplicity, let's just take the first 12 non-None numeric values
-                    month = 1
-                    for value in values:
-                        if month <= 12:
-                            # Only set if not already set (avoid overwriting with repeated values)
-                            if month not in indices[year]:
-                                indices[year][month] = value
-                                month += 1
-                            elif indices[year][month] == value:
-                                # Skip duplicate values
-                                month += 1
-    
+            # Try to find the year in the first few columns
+            year = None
+            year_col_idx = None
+            
+            for i in range(min(3, len(row))):
+                if row[i]:
+                    cell_str = str(row[i]).strip()
+                    if cell_str.isdigit() and len(cell_str) == 4:
+                        try:
+                            potential_year = int(cell_str)
+                            if 1978 <= potential_year <= 2100:
+                                year = potential_year
+                                year_col_idx = i
+                                break
+                        except ValueError:
+                            pass
+            
+            # Skip if no valid year found
+            if year is None:
+                continue
+            
+            # Initialize year in indices
+            if year not in indices:
+                indices[year] = {}
+            
+            # Extract monthly values from remaining columns
+            # We expect 12 months of data after the year column
+            values = []
+            for i in range(year_col_idx + 1, len(row)):
+                if row[i] is not None:
+                    value_str = str(row[i]).strip()
+                    if value_str and value_str != "" and value_str != "None":
+                        try:
+                            value = float(value_str)
+                            values.append(value)
+                        except ValueError:
+                            pass
+            
+            # Assign values to months
+            # The pattern seems to be: each value might be repeated (e.g., 504.3, 504.3, 504.3)
+            # So we need to extract unique consecutive values or take every nth value
+            # Based on the data structure, values appear to be in groups
+            
+            # For simplicity, let's just take the first 12 non-None numeric values
+            month = 1
+            for value in values:
+                if month <= 12:
+                    # Only set if not already set (avoid overwriting with repeated values)
+                    if month not in indices[year]:
+                        indices[year][month] = value
+                        month += 1
+                    elif indices[year][month] == value:
+                        # Skip duplicate values
+                        month += 1
+
     # Remove years with no data
     indices = {year: months for year, months in indices.items() if months}
     
@@ -137,12 +123,14 @@ def parse_old_market_index_table(pdf_data):
     return indices
 
 
-def get_old_market_index():
+def get_old_market_index(pdf_data=None):
     """
     Download and parse the old market price index.
+    An already downloaded PDF can be passed in as pdf_data.
     Returns a dictionary: {year: {month: value}}
     """
-    pdf_data = download_old_index_pdf()
+    if pdf_data is None:
+        pdf_data = download_old_index_pdf()
     if not pdf_data:
         return {}
     
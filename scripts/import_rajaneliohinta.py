@@ -5,19 +5,15 @@ Source: https://www.hel.fi/static/kv/asunto-osasto/hitas-rajahinta.pdf
 """
 
 import re
-import io
-import urllib.request
-import ssl
 from datetime import datetime
 
-try:
-    import pdfplumber
-except ImportError:
-    print("Error: pdfplumber not installed. Install with: pip install pdfplumber")
-    raise
+from http_cache import fetch, source_url
+from pdf_backends import get_backend
 
 
-RAJAHINTA_PDF_URL = "https://www.hel.fi/static/kv/asunto-osasto/hitas-rajahinta.pdf"
+RAJAHINTA_PDF_URL = source_url("hitas-rajahinta.pdf")
+# Bump when the output of parse_rajaneliohinta_from_pdf changes (invalidates the parse cache)
+PARSER_VERSION = 1
 
 
 def download_rajahinta_pdf():
@@ -25,19 +21,16 @@ def download_rajahinta_pdf():
     print(f"Downloading rajaneliöhinta PDF from {RAJAHINTA_PDF_URL}...")
 
     try:
-        # Create SSL context that doesn't verify certificates (for compatibility)
-        ssl_context = ssl._create_unverified_context()
-
-        with urllib.request.urlopen(RAJAHINTA_PDF_URL, context=ssl_context) as response:
-            pdf_data = response.read()
-        print(f"Rajaneliöhinta PDF downloaded successfully ({len(pdf_data)} bytes)")
-        return io.BytesIO(pdf_data)
+        result = fetch(RAJAHINTA_PDF_URL)
+        print(f"Rajaneliöhinta PDF downloaded successfully ({result.size} bytes)")
+        # The parsers open the cached file themselves; no copy in memory
+        return result.path
     except Exception as e:
         print(f"Error downloading rajaneliöhinta PDF: {e}")
         return None
 
 
-def parse_rajaneliohinta_from_pdf(pdf_data):
+def parse_rajaneliohinta_from_pdf(pdf_data, backend=None):
     """
     Parse the rajaneliöhinta (price per sqm) and validity period from PDF.
 
@@ -45,76 +38,76 @@ def parse_rajaneliohinta_from_pdf(pdf_data):
     - price_per_sqm: float
     - valid_from: str (YYYY-MM-DD)
     - valid_until: str (YYYY-MM-DD)
+
+    backend names the pdf_backends backend that extracts the page text
+    (default: pdfplumber).
     """
     result = None
 
     print("Parsing rajaneliöhinta PDF...")
 
-    with pdfplumber.open(pdf_data) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-
-            if not text:
-                continue
-
-            # Look for the price pattern: "rajaneliöhinta on XXXX euroa/m²"
-            price_match = re.search(
-                r"rajaneliöhinta on\s+(\d+(?:\s+\d+)*)\s+euroa?/m", text, re.IGNORECASE
+    for text in get_backend(backend).page_texts(pdf_data):
+        if not text:
+            continue
+
+        # Look for the price pattern: "rajaneliöhinta on XXXX euroa/m²"
+        price_match = re.search(
+            r"rajaneliöhinta on\s+(\d+(?:\s+\d+)*)\s+euroa?/m", text, re.IGNORECASE
+        )
+
+        if price_match:
+            # Extract price and remove spaces
+            price_str = price_match.group(1).replace(" ", "")
+            price = float(price_str)
+
+            # Look for validity period: "voimassa X.Y.ZZZZ asti" or "voimassa DD.MM.YYYY - DD.MM.YYYY"
+            validity_match = re.search(
+                r"voimassa\s+(\d{1,2})\.(\d{1,2})\.(\d{4})\s+asti",
+                text,
+                re.IGNORECASE,
             )
 
-            if price_match:
-                # Extract price and remove spaces
-                price_str = price_match.group(1).replace(" ", "")
-                price = float(price_str)
-
-                # Look for validity period: "voimassa X.Y.ZZZZ asti" or "voimassa DD.MM.YYYY - DD.MM.YYYY"
-                validity_match = re.search(
-                    r"voimassa\s+(\d{1,2})\.(\d{1,2})\.(\d{4})\s+asti",
-                    text,
-                    re.IGNORECASE,
+            if validity_match:
+                day = int(validity_match.group(1))
+                month = int(validity_match.group(2))
+                year = int(validity_match.group(3))
+                valid_until = f"{year:04d}-{month:02d}-{day:02d}"
+
+                # Calculate valid_from (3 months before valid_until)
+                # Rajaneliöhinta is updated quarterly: Feb, May, Aug, Nov
+                # Valid for 3 months each time
+                # If valid until 31.1.2026, it started 1.11.2025
+                # Rajaneliöhinta quarters: Q1 Feb–Apr, Q2 May–Jul, Q3 Aug–Oct, Q4 Nov–Jan
+                if month <= 1:  # Valid until Jan -> started in Nov of previous year (Q4)
+                    from_month = 11
+                    from_year = year - 1
+                elif month <= 4:  # Valid until Feb-Apr -> started in Feb (Q1)
+                    from_month = 2
+                    from_year = year
+                elif month <= 7:  # Valid until May-Jul -> started in May (Q2)
+                    from_month = 5
+                    from_year = year
+                elif month <= 10:  # Valid until Aug-Oct -> started in Aug (Q3)
+                    from_month = 8
+                    from_year = year
+                else:  # Valid until Nov-Dec -> started in Nov (Q4)
+                    from_month = 11
+                    from_year = year
+
+                valid_from = f"{from_year:04d}-{from_month:02d}-01"
+
+                result = {
+                    "price_per_sqm": price,
+                    "valid_from": valid_from,
+                    "valid_until": valid_until,
+                    "description": "Kaikkien Hitas-yhtiöiden keskimääräisten neliöhintojen perusteella laskettu rajaneliöhinta. Päivitetään neljännesvuosittain.",
+                    "source": RAJAHINTA_PDF_URL,
+                }
+
+                print(
+                    f"Parsed rajaneliöhinta: {price} €/m² (valid {valid_from} - {valid_until})"
                 )
-
-                if validity_match:
-                    day = int(validity_match.group(1))
-                    month = int(validity_match.group(2))
-                    year = int(validity_match.group(3))
-                    valid_until = f"{year:04d}-{month:02d}-{day:02d}"
-
-                    # Calculate valid_from (3 months before valid_until)
-                    # Rajaneliöhinta is updated quarterly: Feb, May, Aug, Nov
-                    # Valid for 3 months each time
-                    # If valid until 31.1.2026, it started 1.11.2025
-                    # Rajaneliöhinta quarters: Q1 Feb–Apr, Q2 May–Jul, Q3 Aug–Oct, Q4 Nov–Jan
-                    if month <= 1:  # Valid until Jan -> started in Nov of previous year (Q4)
-                        from_month = 11
-                        from_year = year - 1
-                    elif month <= 4:  # Valid until Feb-Apr -> started in Feb (Q1)
-                        from_month = 2
-                        from_year = year
-                    elif month <= 7:  # Valid until May-Jul -> started in May (Q2)
-                        from_month = 5
-                        from_year = year
-                    elif month <= 10:  # Valid until Aug-Oct -> started in Aug (Q3)
-                        from_month = 8
-                        from_year = year
-                    else:  # Valid until Nov-Dec -> started in Nov (Q4)
-                        from_month = 11
-                        from_year = year
-
-                    valid_from = f"{from_year:04d}-{from_month:02d}-01"
-
-                    result = {
-                        "price_per_sqm": price,
-                        "valid_from": valid_from,
-                        "valid_until": valid_until,
-                        "description": "Kaikkien Hitas-yhtiöiden keskimääräisten neliöhintojen perusteella laskettu rajaneliöhinta. Päivitetään neljännesvuosittain.",
-                        "source": RAJAHINTA_PDF_URL,
-                    }
-
-                    print(
-                        f"Parsed rajaneliöhinta: {price} €/m² (valid {valid_from} - {valid_until})"
-                    )
-                    break
+                break
 
     if not result:
         print("Warning: Could not parse rajaneliöhinta from PDF")
@@ -122,12 +115,14 @@ def parse_rajaneliohinta_from_pdf(pdf_data):
     return result
 
 
-def get_rajaneliohinta():
+def get_rajaneliohinta(pdf_data=None):
     """
     Download and parse the rajaneliöhinta.
+    An already downloaded PDF can be passed in as pdf_data.
     Returns a dictionary with price and validity information.
     """
-    pdf_data = download_rajahinta_pdf()
+    if pdf_data is None:
+        pdf_data = download_rajahinta_pdf()
     if not pdf_data:
         return None
 
@@ -4,13 +4,15 @@ Import historical rajaneliöhinta data from tilasto PDF.
 Source: https://www.hel.fi/static/kv/asunto-osasto/hitas-rajahintatilasto.pdf
 
 This module accumulates historical data by:
-1. Loading existing data from JSON files
+1. Loading existing data from the latest published snapshot (and the
+   git history backfill, when it has been run)
 2. Adding new values when they become available
 3. Using hardcoded initial data as fallback
 """
 
 import json
-from pathlib import Path
+
+from snapshot_store import DATA_DIR, load_latest, load_snapshot
 
 
 def get_rajaneliohinta_tilasto_data():
@@ -106,38 +108,43 @@ def get_rajaneliohinta_tilasto_data():
     return rajaneliohinta_data
 
 
-def load_existing_tilasto_from_json():
+def load_existing_tilasto_from_json(data_dir=DATA_DIR, timeline_path=None):
     """
-    Load existing rajaneliöhinta tilasto from the latest JSON file.
+    Load existing rajaneliöhinta tilasto from the latest published snapshot.
+    Months found in the git history backfill (.cache/revisions.json, see
+    git_history.py) but missing from the snapshot are filled in from their
+    last published value.
     Returns a dictionary: {year: {month: price}} or None if not found
     """
-    data_dir = Path(__file__).parent.parent / "docs" / "data"
-
-    if not data_dir.exists():
-        return None
-
-    # Find the latest indices JSON file
-    json_files = sorted(data_dir.glob("indices-*.json"), reverse=True)
-
-    for json_file in json_files:
-        try:
-            with open(json_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+    from git_history import TIMELINE_PATH, last_values, load_timeline
 
-            if "rajaneliohinta_tilasto" in data:
-                # Convert string keys back to integers
-                tilasto = {}
-                for year_str, months in data["rajaneliohinta_tilasto"].items():
-                    year = int(year_str)
-                    tilasto[year] = {int(m): p for m, p in months.items()}
-
-                print(f"Loaded existing tilasto from {json_file.name}")
-                return tilasto
-        except Exception as e:
-            print(f"Warning: Could not load tilasto from {json_file.name}: {e}")
-            continue
+    tilasto = {}
+    try:
+        data = load_snapshot(data_dir)
+    except Exception as e:
+        print(f"Warning: Could not load the latest snapshot: {e}")
+        data = None
+
+    if data and "rajaneliohinta_tilasto" in data:
+        # Convert string keys back to integers
+        for year_str, months in data["rajaneliohinta_tilasto"].items():
+            year = int(year_str)
+            tilasto[year] = {int(m): p for m, p in months.items()}
+        print(f"Loaded existing tilasto from {load_latest(data_dir)['file']}")
+
+    history = last_values(
+        load_timeline(timeline_path or TIMELINE_PATH), "rajaneliohinta_tilasto"
+    )
+    restored = 0
+    for year, months in history.items():
+        for month, price in months.items():
+            if month not in tilasto.get(year, {}):
+                tilasto.setdefault(year, {})[month] = price
+                restored += 1
+    if restored:
+        print(f"Restored {restored} tilasto values from the git history backfill")
 
-    return None
+    return tilasto or None
 
 
 def add_new_value_to_tilasto(tilasto_data, new_price, valid_from_date):
@@ -184,7 +191,7 @@ def get_rajaneliohinta_tilasto(current_rajaneliohinta=None):
     """
     Get the rajaneliöhinta tilasto data.
     Accumulates data by:
-    1. Loading existing data from JSON files
+    1. Loading existing data from the latest published snapshot
     2. Adding new values from current_rajaneliohinta if provided
     3. Using hardcoded initial data as fallback
 
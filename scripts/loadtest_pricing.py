@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Load test for scripts/pricing_server.py.
+
+Each client thread keeps one HTTP/1.1 connection open and sends random
+apartments until the duration is up. Reports requests per second and p50/p99
+latency. Without --url an in-process server is started on a free port.
+
+Usage:
+    python scripts/loadtest_pricing.py [--url http://127.0.0.1:8080]
+        [--clients 8] [--duration 10] [--batch N]
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+from pricing_server import create_server
+
+
+def random_apartment(rng):
+    year = rng.randint(1990, 2025)
+    return {
+        "original_price": rng.randint(50_000, 600_000),
+        "year": year,
+        "month": rng.randint(1, 12),
+        "size": rng.randint(200, 1500) / 10,
+        "improvements": [
+            {"price": rng.randint(0, 40_000), "year": rng.randint(year, 2025), "month": rng.randint(1, 12)}
+            for _ in range(rng.randint(0, 2))
+        ],
+    }
+
+
+def run_client(host, port, batch, deadline, seed, latencies, errors):
+    """Send requests until deadline; append latencies (seconds) and error count."""
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    path = "/price/batch" if batch else "/price"
+    failed = 0
+
+    while time.perf_counter() < deadline:
+        if batch:
+            body = {"apartments": [random_apartment(rng) for _ in range(batch)]}
+        else:
+            body = random_apartment(rng)
+        payload = json.dumps(body).encode()
+
+        start = time.perf_counter()
+        try:
+            connection.request(
+                "POST", path, payload, {"Content-Type": "application/json"}
+            )
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                failed += 1
+        except (OSError, http.client.HTTPException):
+            failed += 1
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+    connection.close()
+    errors.append(failed)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="running server (default: start one in-process)")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument(
+        "--batch", type=int, default=0, help="apartments per /price/batch request"
+    )
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        server = create_server(port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address[:2]
+
+    latencies = []
+    errors = []
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(
+            target=run_client,
+            args=(host, port, args.batch, deadline, seed, latencies, errors),
+        )
+        for seed in range(args.clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    if server:
+        server.shutdown()
+        server.watcher.stop()
+
+    latencies.sort()
+    apartments = len(latencies) * (args.batch or 1)
+    print(f"{args.clients} clients, {elapsed:.1f} s, {'batch ' + str(args.batch) if args.batch else 'single'} requests")
+    print("=" * 50)
+    print(f"Requests:     {len(latencies)} ({sum(errors)} errors)")
+    print(f"Requests/s:   {len(latencies) / elapsed:,.0f}")
+    print(f"Apartments/s: {apartments / elapsed:,.0f}")
+    print(f"p50 latency:  {percentile(latencies, 0.50) * 1000:.2f} ms")
+    print(f"p99 latency:  {percentile(latencies, 0.99) * 1000:.2f} ms")
+    return 1 if sum(errors) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of parsed PDF results.
+
+Results are keyed by (parser name, parser version, PDF SHA-256) and stored
+as JSON in .cache/parse (override the root with HITAS_CACHE_DIR), so
+re-running a parser on the same document skips pdfplumber entirely. Bump
+the parser's PARSER_VERSION whenever its output changes.
+
+The cache is bounded by HITAS_PARSE_CACHE_MAX_BYTES (default 20 MB); the
+least recently used entries are evicted first.
+"""
+
+import os
+import json
+from pathlib import Path
+
+CACHE_DIR = Path(
+    os.environ.get("HITAS_CACHE_DIR", Path(__file__).parent.parent / ".cache")
+) / "parse"
+MAX_BYTES = int(os.environ.get("HITAS_PARSE_CACHE_MAX_BYTES", 20 * 1024 * 1024))
+
+
+def _entry_path(name, version, digest, cache_dir):
+    return cache_dir / f"{name}-v{version}-{digest}.json"
+
+
+def _restore_keys(value):
+    """Turn JSON string keys back into ints ({"2025": {"1": ...}})."""
+    if isinstance(value, dict):
+        return {
+            int(key) if key.isdigit() else key: _restore_keys(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_restore_keys(item) for item in value]
+    return value
+
+
+def get(name, version, digest, cache_dir=None):
+    """
+    Return the cached result of a parser for a PDF, or None on a miss.
+    Multi-value results (tuples) come back as tuples.
+    """
+    cache_dir = Path(cache_dir) if cache_dir else CACHE_DIR
+    path = _entry_path(name, version, digest, cache_dir)
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # Refresh the mtime so eviction drops the least recently used entries
+    os.utime(path)
+
+    result = _restore_keys(entry["result"])
+    return tuple(result) if entry.get("tuple") else result
+
+
+def put(name, version, digest, result, cache_dir=None, max_bytes=None):
+    """Store a parser result and evict old entries above the size limit."""
+    if result is None:
+        return
+
+    cache_dir = Path(cache_dir) if cache_dir else CACHE_DIR
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    path = _entry_path(name, version, digest, cache_dir)
+
+    entry = {"result": result, "tuple": isinstance(result, tuple)}
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False)
+    tmp_path.replace(path)
+
+    evict(cache_dir, MAX_BYTES if max_bytes is None else max_bytes)
+
+
+def evict(cache_dir=None, max_bytes=MAX_BYTES):
+    """Delete least recently used entries until the cache fits max_bytes."""
+    cache_dir = Path(cache_dir) if cache_dir else CACHE_DIR
+    if not cache_dir.exists():
+        return 0
+
+    entries = sorted(
+        (path.stat().st_mtime, path.stat().st_size, path)
+        for path in cache_dir.glob("*.json")
+    )
+    total = sum(size for _, size, _ in entries)
+
+    removed = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        path.unlink()
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear(cache_dir=None):
+    """Delete every cached parse result. Returns the number removed."""
+    cache_dir = Path(cache_dir) if cache_dir else CACHE_DIR
+    if not cache_dir.exists():
+        return 0
+
+    removed = 0
+    for path in cache_dir.glob("*.json"):
+        path.unlink()
+        removed += 1
+    return removed
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Interchangeable PDF text extraction backends for the importers.
+
+Every backend turns a PDF (path, bytes, file object or mapping) into the
+text of each page and into table rows (lists of cell strings):
+
+    pdfplumber  page.extract_text() and page.extract_tables(); the
+                reference the others are checked against
+    pdfminer    pdfminer's low-level interpreter without layout analysis;
+                characters are grouped into lines by baseline
+    pdfium      pypdfium2's text page, read in one call per page
+
+The text backends build table rows from lines whose cells after the first
+are all numbers. A backend created with workers > 1 reads a PDF given as a
+path in contiguous page shards in a process pool and returns the pages in
+order, so the parsers see the same rows as in a serial read.
+benchmark_pdf_backends.py runs every backend over the example and
+synthetic PDFs, checks that they give the same results and records the
+fastest one that does in .cache/pdf-backends.json, which the updater
+reads. The PDF libraries are imported only when a backend is used.
+
+Usage:
+    python scripts/pdf_backends.py [pdf] [--backend pdfium]   # print the rows
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import mmap
+import argparse
+import importlib.util
+from pathlib import Path
+
+CACHE_DIR = Path(os.environ.get("HITAS_CACHE_DIR", Path(__file__).parent.parent / ".cache"))
+SELECTION_FILE = CACHE_DIR / "pdf-backends.json"
+REFERENCE_BACKEND = "pdfplumber"
+# Sources whose importer reads the PDF through a backend; the indices parser
+# locates its tables with pdfium's text search
+BACKEND_SOURCES = ("old_market_index", "rajaneliohinta")
+
+# A table cell after the row label: a number, possibly in parentheses
+_NUMBER_CELL = re.compile(r"^\(?-?\d+(?:[.,]\d+)?\)?\*?$")
+
+
+def _open_source(pdf_data):
+    """pdfminer wants a file object; paths and bytes are wrapped."""
+    if isinstance(pdf_data, (str, Path)):
+        return open(pdf_data, "rb")
+    if isinstance(pdf_data, (bytes, bytearray, memoryview)):
+        return io.BytesIO(pdf_data)
+    # mmap or file object
+    return pdf_data
+
+
+def page_count(pdf_data):
+    """Number of pages, read with pdfium (which only parses the page tree)."""
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(str(pdf_data) if isinstance(pdf_data, Path) else pdf_data)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def shard_pages(count, workers):
+    """Split range(count) into at most workers contiguous, near-equal ranges."""
+    workers = max(1, min(workers, count))
+    bounds = [count * i // workers for i in range(workers + 1)]
+    return [range(start, stop) for start, stop in zip(bounds, bounds[1:])]
+
+
+def map_page_shards(function, path, workers, *args):
+    """
+    Run function(path, pages, *args) for contiguous page ranges of a PDF in
+    a process pool. Each worker opens the document itself, so only the path
+    and the (picklable) results cross process boundaries. Returns the
+    results in page order, which keeps merging them deterministic.
+    """
+    shards = shard_pages(page_count(path), workers)
+    if len(shards) <= 1:
+        return [function(path, shard, *args) for shard in shards]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        futures = [executor.submit(function, str(path), shard, *args) for shard in shards]
+        return [future.result() for future in futures]
+
+
+def _shard_texts(path, pages, name):
+    return list(BACKENDS[name]()._page_texts(path, pages))
+
+
+def _shard_rows(path, pages, name):
+    return list(BACKENDS[name]()._table_rows(path, pages))
+
+
+def _text_rows(text):
+    """Table rows of a page: lines whose cells after the first are numbers."""
+    rows = []
+    for line in text.splitlines():
+        cells = line.split()
+        if len(cells) > 1 and all(_NUMBER_CELL.match(cell) for cell in cells[1:]):
+            rows.append(cells)
+    return rows
+
+
+class PdfBackend:
+    """
+    Text and table rows of each page of a PDF. With workers > 1 a PDF given
+    as a path is read in page shards in parallel (see map_page_shards).
+    """
+
+    name = None
+    module = None
+
+    def __init__(self, workers=1):
+        self.workers = workers
+
+    @classmethod
+    def available(cls):
+        return importlib.util.find_spec(cls.module) is not None
+
+    def _sharded(self, pdf_data):
+        return self.workers > 1 and isinstance(pdf_data, (str, Path))
+
+    def page_texts(self, pdf_data, pages=None):
+        """Yield the text of each page (of pages, a range of page indices)."""
+        if pages is None and self._sharded(pdf_data):
+            for texts in map_page_shards(_shard_texts, pdf_data, self.workers, self.name):
+                yield from texts
+        else:
+            yield from self._page_texts(pdf_data, pages)
+
+    def table_rows(self, pdf_data, pages=None):
+        """Yield the table rows of each page, one list of rows per page."""
+        if pages is None and self._sharded(pdf_data):
+            for rows in map_page_shards(_shard_rows, pdf_data, self.workers, self.name):
+                yield from rows
+        else:
+            yield from self._table_rows(pdf_data, pages)
+
+    def _page_texts(self, pdf_data, pages):
+        raise NotImplementedError
+
+    def _table_rows(self, pdf_data, pages):
+        for text in self._page_texts(pdf_data, pages):
+            yield _text_rows(text)
+
+
+class PdfplumberBackend(PdfBackend):
+    name = "pdfplumber"
+    module = "pdfplumber"
+
+    def _open(self, pdf_data, pages):
+        import pdfplumber
+
+        if isinstance(pdf_data, Path):
+            pdf_data = str(pdf_data)
+        # pdfplumber numbers pages from 1
+        numbers = None if pages is None else [index + 1 for index in pages]
+        return pdfplumber.open(pdf_data, pages=numbers)
+
+    def _page_texts(self, pdf_data, pages):
+        with self._open(pdf_data, pages) as pdf:
+            for page in pdf.pages:
+                yield page.extract_text() or ""
+
+    def _table_rows(self, pdf_data, pages):
+        with self._open(pdf_data, pages) as pdf:
+            for page in pdf.pages:
+                yield [row for table in page.extract_tables() for row in table]
+
+
+class PdfminerBackend(PdfBackend):
+    name = "pdfminer"
+    module = "pdfminer"
+
+    def _page_texts(self, pdf_data, pages):
+        from pdfminer.converter import PDFPageAggregator
+        from pdfminer.layout import LTChar
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+
+        resources = PDFResourceManager(caching=True)
+        # Without LAParams the device only collects positioned characters,
+        # which skips pdfminer's (slow) layout analysis
+        device = PDFPageAggregator(resources, laparams=None)
+        interpreter = PDFPageInterpreter(resources, device)
+        source = _open_source(pdf_data)
+        try:
+            for page in PDFPage.get_pages(source, pagenos=None if pages is None else set(pages)):
+                interpreter.process_page(page)
+                chars = [item for item in device.get_result() if isinstance(item, LTChar)]
+                yield _chars_to_text(chars)
+        finally:
+            if source is not pdf_data:
+                source.close()
+
+
+def _chars_to_text(chars):
+    """
+    Join positioned characters into lines, top to bottom and left to right.
+    A character belongs to the line whose vertical band contains its middle,
+    so cells in another font or size than their row label stay on the row.
+    """
+    lines = []
+    for char in sorted(chars, key=lambda char: -(char.y0 + char.y1)):
+        middle = (char.y0 + char.y1) / 2
+        if lines and lines[-1][0] <= middle <= lines[-1][1]:
+            lines[-1][2].append(char)
+        else:
+            lines.append([char.y0, char.y1, [char]])
+
+    text = []
+    for _, _, line in lines:
+        line.sort(key=lambda char: char.x0)
+        parts = [line[0].get_text()]
+        for previous, char in zip(line, line[1:]):
+            # A gap wider than a quarter of the font size separates cells
+            if char.x0 - previous.x1 > previous.size * 0.25 and parts[-1] != " ":
+                parts.append(" ")
+            parts.append(char.get_text())
+        text.append("".join(parts).strip())
+    return "\n".join(text)
+
+
+class PdfiumBackend(PdfBackend):
+    name = "pdfium"
+    module = "pypdfium2"
+
+    def _page_texts(self, pdf_data, pages):
+        import pypdfium2 as pdfium
+
+        if isinstance(pdf_data, Path):
+            pdf_data = str(pdf_data)
+        elif isinstance(pdf_data, mmap.mmap):
+            # pdfium reads paths, bytes and file objects but not mappings
+            pdf_data = pdf_data[:]
+        pdf = pdfium.PdfDocument(pdf_data)
+        try:
+            for page_index in range(len(pdf)) if pages is None else pages:
+                page = pdf[page_index]
+                textpage = page.get_textpage()
+                text = textpage.get_text_range()
+                textpage.close()
+                page.close()
+                yield text.replace("\r\n", "\n")
+        finally:
+            pdf.close()
+
+
+BACKENDS = {
+    backend.name: backend for backend in (PdfplumberBackend, PdfminerBackend, PdfiumBackend)
+}
+
+
+def get_backend(name=None, workers=1):
+    """
+    Return a backend instance by name (default: the reference backend);
+    an instance is returned as it is.
+    """
+    if isinstance(name, PdfBackend):
+        return name
+    name = name or REFERENCE_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"unknown PDF backend {name} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name](workers)
+
+
+def available_backends():
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+
+def load_selection(path=SELECTION_FILE):
+    """Return the recorded {source: backend} choice, or {} if there is none."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("selected", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def select_backend(source, override=None, path=SELECTION_FILE):
+    """
+    Name of the backend to parse a source with: override (or the
+    HITAS_PDF_BACKEND environment variable) if given, else the fastest
+    backend that passed the parity check, else the reference backend.
+    """
+    if override in (None, "auto"):
+        override = os.environ.get("HITAS_PDF_BACKEND")
+    if override and override != "auto":
+        get_backend(override)
+        return override
+    selected = load_selection(path).get(source)
+    if selected in BACKENDS and BACKENDS[selected].available():
+        return selected
+    return REFERENCE_BACKEND
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "pdf",
+        nargs="?",
+        default=str(Path(__file__).parent.parent / "example-data" / "hitas-indeksit-2005-100.pdf"),
+    )
+    parser.add_argument("--backend", choices=list(BACKENDS), default=REFERENCE_BACKEND)
+    parser.add_argument("--text", action="store_true", help="print the page text instead")
+    args = parser.parse_args()
+
+    backend = get_backend(args.backend)
+    pages = backend.page_texts(args.pdf) if args.text else backend.table_rows(args.pdf)
+    for page_number, page in enumerate(pages, 1):
+        print(f"--- page {page_number} ({backend.name})")
+        if args.text:
+            print(page)
+        else:
+            for row in page:
+                print(row)
+    sys.exit(0)
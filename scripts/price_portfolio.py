@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Price a file of apartments with the current index data.
+
+Reads CSV (or Parquet, with pyarrow installed) in chunks and writes the
+priced rows as it goes, so memory use does not grow with the input. Input
+columns:
+
+    original_price, year, month, size, improvements
+
+year/month is the purchase (or completion) month. improvements is a JSON
+list like [{"price": 12000, "year": 2019, "month": 5}] and may be empty.
+Other columns are copied to the output unchanged. Output adds the columns
+in RESULT_COLUMNS; prices that cannot be calculated are left empty. A row
+that cannot be read (a missing or malformed number, invalid improvements
+JSON, a month outside 1..12) gets every result column empty, including
+max_price, and the run goes on.
+
+Usage:
+    python scripts/price_portfolio.py input.csv output.csv [--chunk-size N] [--workers N]
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+from hitas_pricing import load_pricing_tables, parse_record, price_batch, records_to_arrays
+from snapshot_store import DATA_DIR, load_snapshot
+
+INPUT_COLUMNS = ("original_price", "year", "month", "size", "improvements")
+RESULT_COLUMNS = (
+    "rakennuskustannus",
+    "markkinahinta",
+    "vanhat_markkinahinta",
+    "rajaneliohinta",
+    "improvements_value",
+    "max_price",
+)
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Pricing tables of this process, set directly or by the pool initializer
+_tables = None
+
+
+def _init_worker(tables):
+    global _tables
+    _tables = tables
+
+
+def _parse_improvements(value):
+    """Accept a JSON string (CSV) or a list of mappings (Parquet)."""
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        return json.loads(value)
+    return list(value)
+
+
+def price_chunk(rows):
+    """
+    Price a list of row dicts with the tables of this process.
+    Returns the rows with RESULT_COLUMNS added (None where not calculable,
+    and in every column of a row that cannot be read).
+    """
+    records = []
+    positions = []
+    for row_index, row in enumerate(rows):
+        try:
+            records.append(
+                parse_record({**row, "improvements": _parse_improvements(row.get("improvements"))})
+            )
+        except (KeyError, TypeError, ValueError):
+            continue
+        positions.append(row_index)
+
+    columns = {key: [None] * len(rows) for key in RESULT_COLUMNS}
+    if records:
+        prices = price_batch(_tables, **records_to_arrays(records))
+        prices["improvements_value"] = prices.pop("improvements")
+        for key in RESULT_COLUMNS:
+            for row_index, value in zip(positions, prices[key]):
+                columns[key][row_index] = None if np.isnan(value) else round(float(value), 2)
+
+    return [
+        {**row, **{key: columns[key][row_index] for key in RESULT_COLUMNS}}
+        for row_index, row in enumerate(rows)
+    ]
+
+
+def read_csv_chunks(path, chunk_size):
+    """Yield lists of row dicts from a CSV file."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        chunk = []
+        for row in csv.DictReader(f):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def read_parquet_chunks(path, chunk_size):
+    """Yield lists of row dicts from a Parquet file."""
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield batch.to_pylist()
+
+
+class CsvWriter:
+    """Write priced rows to CSV; the header comes from the first chunk."""
+
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8", newline="")
+        self.writer = None
+
+    def write(self, rows):
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.file, fieldnames=list(rows[0]))
+            self.writer.writeheader()
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Write priced rows to Parquet, one row group per chunk."""
+
+    def __init__(self, path):
+        self.path = path
+        self.writer = None
+
+    def write(self, rows):
+        table = pa.Table.from_pylist(rows)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def _is_parquet(path):
+    return str(path).endswith(".parquet")
+
+
+def price_stream(chunks, tables, workers=1):
+    """
+    Price chunks in input order. With workers > 1 chunks are priced in a
+    process pool, with at most two chunks per worker in flight.
+    """
+    workers = max(1, min(workers, os.cpu_count() or 1))
+    if workers == 1:
+        _init_worker(tables)
+        for chunk in chunks:
+            yield price_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(tables,)
+    ) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(price_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="CSV or .parquet file of apartments")
+    parser.add_argument("output", help="CSV or .parquet file for the results")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="price chunks in N processes"
+    )
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    args = parser.parse_args(argv)
+
+    if (_is_parquet(args.input) or _is_parquet(args.output)) and pq is None:
+        print("Parquet files require pyarrow: pip install pyarrow")
+        return 1
+
+    data = load_snapshot(args.data_dir)
+    if not data:
+        print(f"No index data in {args.data_dir}")
+        return 1
+    tables = load_pricing_tables(data)
+
+    if _is_parquet(args.input):
+        chunks = read_parquet_chunks(args.input, args.chunk_size)
+    else:
+        chunks = read_csv_chunks(args.input, args.chunk_size)
+    writer = ParquetWriter(args.output) if _is_parquet(args.output) else CsvWriter(args.output)
+
+    start = time.perf_counter()
+    rows = unreadable = 0
+    try:
+        for priced in price_stream(chunks, tables, args.workers):
+            writer.write(priced)
+            rows += len(priced)
+            # max_price is 0, not empty, for a readable row without prices
+            unreadable += sum(row["max_price"] is None for row in priced)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Priced {rows} rows in {elapsed:.2f} s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    if unreadable:
+        print(f"Warning: {unreadable} rows could not be read and were left unpriced")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+// Write reference results of lib/calculator.ts for scripts/hitas_pricing.py
+//
+// The committed golden file example-data/pricing-parity.json is written by
+// this script; regenerate it when the calculator rules change.
+//
+// Usage:
+//   npx tsx scripts/pricing-parity.ts > example-data/pricing-parity.json
+//   python scripts/hitas_pricing.py --parity example-data/pricing-parity.json
+import * as fs from 'fs'
+import * as path from 'path'
+import { calculateRajahinta, Improvement } from '../lib/calculator'
+import { indicesState } from '../lib/calculator-indices'
+
+const CASES = 300
+
+interface ParityCase {
+  originalPrice: number
+  year: number
+  month: number
+  size: number
+  improvements: Improvement[]
+}
+
+// Pre-2011 purchases and improvements, a rajaneliöhinta floor above every
+// index price, improvements at and just above the omavastuu (30 €/m²), a
+// purchase without index data and months outside 1..12, which
+// calculator.ts cannot price
+const EDGE_CASES: ParityCase[] = [
+  { originalPrice: 120000, year: 2005, month: 6, size: 55, improvements: [] },
+  { originalPrice: 90000, year: 2010, month: 12, size: 40, improvements: [{ price: 20000, year: 2008, month: 3 }] },
+  { originalPrice: 150000, year: 2011, month: 1, size: 60, improvements: [{ price: 15000, year: 2010, month: 11 }] },
+  { originalPrice: 20000, year: 2015, month: 5, size: 80, improvements: [] },
+  {
+    originalPrice: 200000,
+    year: 2018,
+    month: 3,
+    size: 50,
+    improvements: [
+      { price: 1500, year: 2019, month: 1 },
+      { price: 1501, year: 2019, month: 1 },
+    ],
+  },
+  { originalPrice: 300000, year: 2100, month: 1, size: 70, improvements: [] },
+  { originalPrice: 200000, year: 2018, month: 13, size: 50, improvements: [] },
+  { originalPrice: 200000, year: 2018, month: 0, size: 50, improvements: [] },
+  { originalPrice: 120000, year: 2005, month: 13, size: 55, improvements: [] },
+  { originalPrice: 120000, year: 2011, month: 0, size: 55, improvements: [] },
+  {
+    originalPrice: 200000,
+    year: 2018,
+    month: 6,
+    size: 50,
+    improvements: [
+      { price: 30000, year: 2020, month: 13 },
+      { price: 30000, year: 2009, month: 0 },
+    ],
+  },
+  { originalPrice: 200000, year: 2018, month: 6, size: 0, improvements: [{ price: 30000, year: 2020, month: 6 }] },
+]
+
+function loadSnapshot(dataPath: string): any {
+  const latest = JSON.parse(fs.readFileSync(path.join(dataPath, 'latest.json'), 'utf-8'))
+  return JSON.parse(fs.readFileSync(path.join(dataPath, latest.file), 'utf-8'))
+}
+
+// Small deterministic generator so every run produces the same cases
+function createRandom(seed: number): () => number {
+  let state = seed >>> 0
+  return () => {
+    state = (state * 1664525 + 1013904223) >>> 0
+    return state / 2 ** 32
+  }
+}
+
+function main() {
+  const data = loadSnapshot(path.join(__dirname, '..', 'public', 'data'))
+  indicesState.rakennuskustannusindeksi = data.rakennuskustannusindeksi
+  indicesState.markkinahintaindeksi = data.markkinahintaindeksi
+  indicesState.vanhatMarkkinahintaindeksi = data.vanhat_markkinahintaindeksi
+  indicesState.rajaneliohinta = data.rajaneliohinta
+
+  const random = createRandom(2011)
+  const between = (low: number, high: number) => low + Math.floor(random() * (high - low + 1))
+  const today = new Date()
+  const thisYear = today.getFullYear()
+
+  const inputs: ParityCase[] = [...EDGE_CASES]
+  for (let i = 0; i < CASES; i++) {
+    const year = between(1985, thisYear)
+    const improvements: Improvement[] = []
+    for (let j = between(0, 3); j > 0; j--) {
+      improvements.push({ price: between(0, 40000), year: between(year, thisYear), month: between(1, 12) })
+    }
+    const originalPrice = between(50000, 600000)
+    const month = between(1, 12)
+    // Include size 0 to cover the missing rajaneliöhinta branch
+    const size = i % 100 === 0 ? 0 : between(200, 1500) / 10
+    inputs.push({ originalPrice, year, month, size, improvements })
+  }
+
+  const cases = []
+  for (const { originalPrice, year, month, size, improvements } of inputs) {
+    const result = calculateRajahinta(originalPrice, year, month, size, improvements)
+    const candidates = [
+      result.rakennuskustannus,
+      result.markkinahinta,
+      result.vanhatMarkkinahinta,
+      result.rajaneliohinta,
+    ].filter((candidate) => candidate !== null)
+
+    cases.push({
+      originalPrice,
+      year,
+      month,
+      size,
+      improvements,
+      expected: {
+        rakennuskustannus: result.rakennuskustannus?.price ?? null,
+        markkinahinta: result.markkinahinta?.price ?? null,
+        vanhat_markkinahinta: result.vanhatMarkkinahinta?.price ?? null,
+        rajaneliohinta: result.rajaneliohinta?.price ?? null,
+        improvements: result.improvements?.totalIndexedValue ?? 0,
+        max_price: candidates.length > 0 ? Math.max(...candidates.map((c) => c!.price)) : 0,
+      },
+    })
+  }
+
+  const isoToday = `${thisYear}-${String(today.getMonth() + 1).padStart(2, '0')}-${String(today.getDate()).padStart(2, '0')}`
+  process.stdout.write(JSON.stringify({ today: isoToday, data, cases }))
+}
+
+main()
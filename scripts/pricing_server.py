@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Local HTTP/JSON service for the maximum price calculation.
+
+Endpoints:
+    GET  /health                 current snapshot
+    GET  /price?original_price=…&year=…&month=…&size=…
+    POST /price                  {"original_price", "year", "month", "size", "improvements"}
+    POST /price/batch            {"apartments": [...]} (priced with price_batch)
+
+Every apartment is validated with hitas_pricing.parse_record on both
+endpoints, so a row with a malformed value or a month outside 1..12 gets
+a 400 from /price as well as from /price/batch. The index data is held in
+memory and the multipliers of the most recently used (series, year,
+month) are memoized. A watcher thread polls public/data/latest.json and
+swaps in a new snapshot when update_indices.py publishes one (or when the
+month changes, since "current index" depends on the date). Each request
+reads the snapshot reference once, so a swap never mixes two snapshots and
+no request is dropped.
+
+Usage:
+    python scripts/pricing_server.py [--port 8080] [--poll-interval 5]
+    python scripts/pricing_server.py --check   # /price and /price/batch agree
+"""
+
+import sys
+import json
+import math
+import time
+import argparse
+import threading
+import http.client
+from datetime import date
+from functools import lru_cache, partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from hitas_pricing import (
+    load_pricing_tables,
+    parse_record,
+    price_apartment,
+    price_batch,
+    records_to_arrays,
+    series_multiplier,
+)
+from snapshot_store import DATA_DIR, LATEST_NAME, load_latest, load_snapshot
+
+RESULT_KEYS = (
+    "rakennuskustannus",
+    "markkinahinta",
+    "vanhat_markkinahinta",
+    "rajaneliohinta",
+    "improvements",
+    "max_price",
+)
+MAX_BODY_BYTES = 16 * 1024 * 1024
+# Memoized multipliers per snapshot; (series, year, month) comes from the
+# client, so the cache must be bounded (the tables span ~1,000 months each)
+MULTIPLIER_CACHE_SIZE = 4096
+
+# Rows both endpoints must reject, for --check
+INVALID_APARTMENTS = (
+    {"original_price": 150000, "year": 2018, "month": 13, "size": 50},
+    {"original_price": 150000, "year": 2018, "month": 0, "size": 50},
+    {"original_price": "", "year": 2018, "month": 5, "size": 50},
+    {"original_price": 150000, "year": 2018, "month": 5},
+    {
+        "original_price": 150000,
+        "year": 2018,
+        "month": 5,
+        "size": 50,
+        "improvements": [{"price": 20000, "year": 2019, "month": 13}],
+    },
+)
+
+
+def _json_value(value):
+    value = float(value)
+    return None if math.isnan(value) else round(value, 2)
+
+
+class PricingSnapshot:
+    """Pricing tables of one published snapshot with memoized multipliers."""
+
+    def __init__(self, data, sha256, today=None):
+        self.today = today or date.today()
+        self.sha256 = sha256
+        self.loaded = time.time()
+        self.tables = load_pricing_tables(data, self.today)
+        self.multiplier = lru_cache(maxsize=MULTIPLIER_CACHE_SIZE)(
+            partial(series_multiplier, self.tables)
+        )
+
+    def price(self, record):
+        record = parse_record(record)
+        prices = price_apartment(
+            self.tables,
+            record["original_price"],
+            record["year"],
+            record["month"],
+            record["size"],
+            record["improvements"],
+            multiplier=self.multiplier,
+        )
+        return {key: _json_value(prices[key]) for key in RESULT_KEYS}
+
+    def price_many(self, records):
+        prices = price_batch(self.tables, **records_to_arrays(records))
+        columns = {key: [_json_value(value) for value in prices[key]] for key in RESULT_KEYS}
+        return [
+            {key: columns[key][row] for key in RESULT_KEYS} for row in range(len(records))
+        ]
+
+
+class SnapshotWatcher:
+    """Keep the newest published snapshot in self.current."""
+
+    def __init__(self, data_dir=DATA_DIR, poll_interval=5.0):
+        self.data_dir = Path(data_dir)
+        self.poll_interval = poll_interval
+        self.current = None
+        self._stamp = None
+        self._stop = threading.Event()
+        if not self.reload():
+            raise RuntimeError(f"No index data in {self.data_dir}")
+
+    def _manifest_stamp(self):
+        try:
+            stat = (self.data_dir / LATEST_NAME).stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self):
+        """
+        Load the snapshot if the manifest or month changed; returns True if
+        a snapshot is loaded. A failed load keeps serving the previous one.
+        """
+        stamp = self._manifest_stamp()
+        today = date.today()
+        current = self.current
+        same_month = current is not None and (
+            (current.today.year, current.today.month) == (today.year, today.month)
+        )
+        if same_month and stamp == self._stamp:
+            return True
+
+        try:
+            latest = load_latest(self.data_dir)
+            if same_month and latest and latest["sha256"] == current.sha256:
+                self._stamp = stamp
+                return True
+            data = load_snapshot(self.data_dir, latest)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Reload failed, keeping the current snapshot: {e}", file=sys.stderr)
+            return current is not None
+
+        if not data:
+            return current is not None
+
+        # Build fully before publishing; assigning the reference is atomic
+        self.current = PricingSnapshot(data, latest["sha256"], today)
+        self._stamp = stamp
+        print(f"Loaded snapshot {latest['sha256'][:16]}", file=sys.stderr)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self.reload()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+
+class PricingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY each
+    # keep-alive response waits for the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+    watcher = None
+
+    def log_message(self, format, *args):
+        # Logging every request to stderr would cost more than pricing it
+        pass
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError("request body too large")
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        snapshot = self.watcher.current
+
+        if url.path == "/health":
+            self._send_json(
+                200,
+                {
+                    "snapshot": snapshot.sha256,
+                    "loaded": snapshot.loaded,
+                    "today": snapshot.today.isoformat(),
+                },
+            )
+        elif url.path == "/price":
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            self._respond(lambda: snapshot.price(query), snapshot)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        snapshot = self.watcher.current
+
+        try:
+            body = self._read_json()
+        except ValueError as e:
+            self._send_json(400, {"error": f"invalid JSON: {e}"})
+            return
+
+        if url.path == "/price":
+            self._respond(lambda: snapshot.price(body), snapshot)
+        elif url.path == "/price/batch":
+            apartments = body.get("apartments") if isinstance(body, dict) else body
+            self._respond(
+                lambda: {"results": snapshot.price_many(apartments or [])}, snapshot
+            )
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _respond(self, calculate, snapshot):
+        try:
+            result = calculate()
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            self._send_json(400, {"error": f"invalid apartment: {e!r}"})
+            return
+        result["snapshot"] = snapshot.sha256
+        self._send_json(200, result)
+
+
+def create_server(host="127.0.0.1", port=8080, data_dir=DATA_DIR, poll_interval=5.0):
+    """Create a server and start its snapshot watcher; call serve_forever()."""
+    watcher = SnapshotWatcher(data_dir, poll_interval)
+    watcher.start()
+    handler = type("Handler", (PricingHandler,), {"watcher": watcher})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.watcher = watcher
+    return server
+
+
+def _post(connection, path, body):
+    connection.request(
+        "POST", path, json.dumps(body), {"Content-Type": "application/json"}
+    )
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def check_endpoints(data_dir=DATA_DIR):
+    """
+    Send valid and invalid apartments to /price and /price/batch on an
+    in-process server; returns a list of disagreements.
+    """
+    server = create_server(port=0, data_dir=data_dir, poll_interval=3600)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+    failures = []
+    try:
+        valid = {
+            "original_price": 150000,
+            "year": 2015,
+            "month": 5,
+            "size": 50,
+            "improvements": [{"price": 20000, "year": 2019, "month": 4}],
+        }
+        single_status, single = _post(connection, "/price", valid)
+        batch_status, batch = _post(connection, "/price/batch", {"apartments": [valid]})
+        if single_status != 200 or batch_status != 200:
+            failures.append(f"valid apartment: {single_status} and {batch_status}")
+        elif any(single[key] != batch["results"][0][key] for key in RESULT_KEYS):
+            failures.append("valid apartment priced differently")
+
+        for apartment in INVALID_APARTMENTS:
+            single_status, _ = _post(connection, "/price", apartment)
+            batch_status, _ = _post(connection, "/price/batch", {"apartments": [apartment]})
+            if (single_status, batch_status) != (400, 400):
+                failures.append(f"{apartment}: {single_status} and {batch_status}, expected 400")
+    finally:
+        connection.close()
+        server.shutdown()
+        server.watcher.stop()
+        server.server_close()
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--poll-interval", type=float, default=5.0)
+    parser.add_argument(
+        "--check", action="store_true", help="check that both endpoints validate alike"
+    )
+    args = parser.parse_args(argv)
+
+    if args.check:
+        print("Checking /price against /price/batch...")
+        print("=" * 50)
+        failures = check_endpoints(args.data_dir)
+        for failure in failures:
+            print(f"❌ {failure}")
+        if failures:
+            return 1
+        print(
+            f"✅ Both endpoints agree on 1 valid and "
+            f"{len(INVALID_APARTMENTS)} invalid apartments"
+        )
+        return 0
+
+    server = create_server(args.host, args.port, args.data_dir, args.poll_interval)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.watcher.stop()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
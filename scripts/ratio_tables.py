@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Precomputed price multipliers for every index series.
+
+For each (series, year, month) the table holds current_index / index_at_month,
+where current_index is the latest value that is not in the future, resolved
+the same way as getLatestIndex in lib/calculator.ts. Pricing an apartment or
+improvement is then one array lookup and a multiplication.
+
+Because "not in the future" depends on the date, each series records
+valid_until: the first month at which a later value becomes current and the
+table has to be rebuilt. The tables are written to public/data/ratios.json.
+
+Usage:
+    python scripts/ratio_tables.py   # rebuild from the current snapshot
+"""
+
+import sys
+import json
+from datetime import date
+from pathlib import Path
+
+from dense_format import SERIES_KEYS
+from snapshot_store import (
+    DATA_DIR,
+    RATIOS_NAME,
+    load_snapshot,
+    payload_hash,
+    refresh_manifest,
+)
+
+# Multipliers are ~0.5-6; 8 decimals keeps the relative error below 1e-8
+MULTIPLIER_DECIMALS = 8
+
+# Series priced with multipliers (rajaneliohinta_tilasto is a €/m² history)
+RATIO_SERIES = tuple(key for key in SERIES_KEYS if key != "rajaneliohinta_tilasto")
+
+
+def _points(series):
+    """Return {(year, month): value} for a nested series with any key type."""
+    return {
+        (int(year), int(month)): value
+        for year, months in series.items()
+        for month, value in months.items()
+        if isinstance(value, (int, float))
+    }
+
+
+def build_series_table(series, today):
+    """
+    Build the multiplier table of one series as of today.
+    Returns None if the series has no value up to today.
+    """
+    points = _points(series)
+    now = (today.year, today.month)
+
+    past = [key for key in points if key <= now]
+    if not past:
+        return None
+    current = max(past)
+    future = [key for key in points if key > now]
+
+    first = min(points)
+    last = max(points)
+    start_index = first[0] * 12 + first[1] - 1
+    end_index = last[0] * 12 + last[1] - 1
+
+    current_value = points[current]
+    multipliers = []
+    for index in range(start_index, end_index + 1):
+        value = points.get((index // 12, index % 12 + 1))
+        multipliers.append(
+            round(current_value / value, MULTIPLIER_DECIMALS) if value else None
+        )
+
+    return {
+        "current": {"year": current[0], "month": current[1], "value": current_value},
+        "valid_until": list(min(future)) if future else None,
+        "start": [first[0], first[1]],
+        "multipliers": multipliers,
+    }
+
+
+def build_ratio_tables(data, today=None):
+    """Build the ratio tables of every priced series in a payload."""
+    today = today or date.today()
+    tables = {}
+    for key in RATIO_SERIES:
+        if data.get(key):
+            table = build_series_table(data[key], today)
+            if table:
+                tables[key] = table
+
+    return {"snapshot": payload_hash(data), "series": tables}
+
+
+def is_stale(ratios, data=None, today=None):
+    """
+    Check whether ratio tables need rebuilding: a later value has become
+    current, or they were built from a different snapshot than data.
+    """
+    if not ratios:
+        return True
+    if data is not None and ratios.get("snapshot") != payload_hash(data):
+        return True
+
+    today = today or date.today()
+    now = [today.year, today.month]
+    return any(
+        table["valid_until"] and table["valid_until"] <= now
+        for table in ratios.get("series", {}).values()
+    )
+
+
+def load_ratio_tables(data_dir=DATA_DIR):
+    """Load ratios.json, or None if it has not been written yet."""
+    path = Path(data_dir) / RATIOS_NAME
+    if not path.exists():
+        return None
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_ratio_tables(data, data_dir=DATA_DIR, today=None):
+    """Write ratios.json for a payload; returns the tables."""
+    ratios = build_ratio_tables(data, today)
+    path = Path(data_dir) / RATIOS_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(ratios, f, separators=(",", ":"), ensure_ascii=False)
+        f.write("\n")
+    tmp_path.replace(path)
+    print(f"Wrote {RATIOS_NAME} ({path.stat().st_size} bytes)")
+    return ratios
+
+
+def multiplier(ratios, key, year, month):
+    """Look up the multiplier of a series for a purchase month, or None."""
+    table = ratios["series"].get(key)
+    if not table:
+        return None
+
+    index = year * 12 + month - 1 - (table["start"][0] * 12 + table["start"][1] - 1)
+    if 0 <= index < len(table["multipliers"]):
+        return table["multipliers"][index]
+    return None
+
+
+if __name__ == "__main__":
+    snapshot = load_snapshot()
+    if not snapshot:
+        print("Snapshot store is empty")
+        sys.exit(1)
+
+    ratios = write_ratio_tables(snapshot)
+    refresh_manifest()
+    for key, table in ratios["series"].items():
+        current = table["current"]
+        print(
+            f"{key}: current {current['month']}/{current['year']} = {current['value']}, "
+            f"valid until {table['valid_until'] or '-'}"
+        )
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Spans, counters and profiling hooks for update runs.
+
+A RunMetrics object collects timed spans (fetch, parse, write, ...) and
+counters (bytes downloaded, pages parsed, rows extracted, cache hits) while
+it is active. Code deep in the pipeline calls the module-level span() and
+count(), which do nothing when no run is being recorded, so the parsers and
+writers stay usable on their own.
+
+The result is written as a JSON run report and optionally as OpenMetrics
+text (for a Prometheus textfile collector or Pushgateway). profiled() wraps
+a run in cProfile or tracemalloc and dumps the profile to a file.
+
+Usage:
+    python scripts/update_indices.py --report run.json --openmetrics run.prom
+    python scripts/update_indices.py --profile cpu --serial   # .cache/profile/
+    python -m pstats .cache/profile/update-<timestamp>.prof
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from pathlib import Path
+
+PROFILE_DIR = Path(
+    os.environ.get("HITAS_CACHE_DIR", Path(__file__).parent.parent / ".cache")
+) / "profile"
+PROFILE_KINDS = ("cpu", "memory")
+METRIC_PREFIX = "hitas_update"
+
+_active = None
+
+
+class RunMetrics:
+    """Spans and counters of one update run."""
+
+    def __init__(self):
+        self.started = datetime.now().isoformat(timespec="seconds")
+        self.spans = []
+        self.counters = {}
+        self._start = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time a block; spans opened inside it get it as their parent."""
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stack.pop()
+            self.record(name, time.perf_counter() - start, start, parent, **attrs)
+
+    def record(self, name, seconds, start=None, parent=None, **attrs):
+        """Add a span timed elsewhere (e.g. in a worker process)."""
+        if start is None:
+            start = time.perf_counter() - seconds
+        if parent is None and self._stack():
+            parent = self._stack()[-1]
+        span = {
+            "name": name,
+            "start": round(start - self._start, 6),
+            "seconds": round(seconds, 6),
+        }
+        if parent:
+            span["parent"] = parent
+        if attrs:
+            span["attrs"] = attrs
+        with self._lock:
+            self.spans.append(span)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self, status=None):
+        """The run as a JSON-serializable dict."""
+        return {
+            "started": self.started,
+            "seconds": round(time.perf_counter() - self._start, 6),
+            "status": status,
+            "argv": sys.argv[1:],
+            "python": platform.python_version(),
+            "peak_rss_kb": peak_rss_kb(),
+            "spans": sorted(self.spans, key=lambda span: span["start"]),
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def openmetrics(self, status=None):
+        """The run in the OpenMetrics text format."""
+        report = self.report(status)
+        lines = [
+            f"# TYPE {METRIC_PREFIX}_stage_seconds gauge",
+            f"# UNIT {METRIC_PREFIX}_stage_seconds seconds",
+            f"# HELP {METRIC_PREFIX}_stage_seconds Wall-clock time of each stage.",
+        ]
+        totals = {}
+        for span in report["spans"]:
+            totals[span["name"]] = totals.get(span["name"], 0) + span["seconds"]
+        for name, seconds in totals.items():
+            lines.append(f'{METRIC_PREFIX}_stage_seconds{{stage="{_label(name)}"}} {seconds}')
+
+        for name, value in report["counters"].items():
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}_total {value}")
+
+        for name, value in (
+            ("run_seconds", report["seconds"]),
+            ("peak_rss_bytes", report["peak_rss_kb"] * 1024),
+            ("exit_status", status if status is not None else -1),
+            ("last_run_timestamp_seconds", round(time.time(), 3)),
+        ):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+            lines.append(f"{METRIC_PREFIX}_{name} {value}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path, status=None):
+        _write_text(path, json.dumps(self.report(status), indent=2, ensure_ascii=False) + "\n")
+
+    def write_openmetrics(self, path, status=None):
+        _write_text(path, self.openmetrics(status))
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_text(path, text):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def peak_rss_kb():
+    """
+    Peak RSS of this process in KB. On Linux this is VmHWM of the current
+    address space; ru_maxrss would include the parent's RSS at fork time.
+    """
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+@contextmanager
+def recording(metrics):
+    """Make metrics the target of span(), record() and count()."""
+    global _active
+    previous, _active = _active, metrics
+    try:
+        yield metrics
+    finally:
+        _active = previous
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time a block into the active run, if any."""
+    if _active is None:
+        yield
+        return
+    with _active.span(name, **attrs):
+        yield
+
+
+def record(name, seconds, **attrs):
+    if _active is not None:
+        _active.record(name, seconds, **attrs)
+
+
+def count(name, amount=1):
+    if _active is not None:
+        _active.count(name, amount)
+
+
+@contextmanager
+def profiled(kind=None, output=None):
+    """
+    Profile the block with cProfile ("cpu") or tracemalloc ("memory") and
+    write the result to output (default .cache/profile/update-<time>.prof
+    or .txt). cProfile only sees the calling thread, so parse with --serial
+    to include the parsers. Does nothing when kind is None.
+    """
+    if kind is None:
+        yield None
+        return
+    if kind not in PROFILE_KINDS:
+        raise ValueError(f"unknown profile kind {kind}")
+
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    suffix = ".prof" if kind == "cpu" else ".txt"
+    output = Path(output) if output else PROFILE_DIR / f"update-{stamp}{suffix}"
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    if kind == "cpu":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield output
+        finally:
+            profiler.disable()
+            profiler.dump_stats(output)
+            print(f"CPU profile written to {output} (python -m pstats {output})")
+        return
+
+    import tracemalloc
+
+    tracemalloc.start(25)
+    try:
+        yield output
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stats = snapshot.statistics("lineno")
+        lines = [
+            f"Traced memory: current {current / 1024:.1f} KB, peak {peak / 1024:.1f} KB",
+            "",
+            "Top allocations still alive at the end of the run:",
+        ]
+        lines += [str(stat) for stat in stats[:50]]
+        _write_text(output, "\n".join(lines) + "\n")
+        print(f"Memory profile written to {output}")
+
+
+if __name__ == "__main__":
+    # Self-check of the report formats
+    metrics = RunMetrics()
+    with recording(metrics):
+        with span("fetch"):
+            count("bytes_downloaded", 1234)
+            with span("fetch indices"):
+                time.sleep(0.01)
+        record("parse indices", 0.25)
+        count("pages_parsed", 3)
+
+    report = metrics.report(0)
+    text = metrics.openmetrics(0)
+    print(json.dumps(report, indent=2))
+    print(text)
+    print("=" * 50)
+    spans = {span["name"]: span for span in report["spans"]}
+    assert spans["fetch indices"]["parent"] == "fetch"
+    assert "parent" not in spans["parse indices"]
+    assert report["counters"] == {"bytes_downloaded": 1234, "pages_parsed": 3}
+    assert 'stage="fetch indices"' in text and text.endswith("# EOF\n")
+    assert "hitas_update_pages_parsed_total 3" in text
+
+    # Nothing is recorded without an active run
+    with span("ignored"):
+        count("ignored")
+    assert len(metrics.spans) == 3 and "ignored" not in metrics.counters
+    print("✅ Run metrics work")
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Delta patches between consecutive published snapshots.
+
+When the snapshot changes, the updater diffs the previous payload against
+the new one and writes the difference to public/data/patches/<from>-<to>.json
+(16-character hash prefixes). The diff is a JSON merge patch (RFC 7386) of
+the payloads without their "updated" and "sha256" fields: changed values
+and new months replace, nested objects merge and null removes a key. A
+patch document is
+
+    {"from": sha256, "to": sha256, "updated": "YYYY-MM-DD", "patch": {...}}
+
+so a day with one revised provisional month costs a few hundred bytes
+instead of the full snapshot. latest.json lists the patches leading to the
+current snapshot under "patches" (oldest first, at most MAX_PATCH_HOPS). A
+client holding a listed version applies every later patch in order and
+checks the payload hash; one that is further behind, or for which the
+patches add up to more than the snapshot, fetches the snapshot instead.
+Patches that fall off the chain are deleted.
+
+The only client that applies patches is sync, the Python mirror below.
+The web app (lib/indices.ts) fetches a changed snapshot in full: the
+canonical hash keeps the difference between 102.0 and 102, which
+JavaScript's JSON.parse loses, so a browser could not verify a patched
+payload.
+
+Usage:
+    python scripts/snapshot_patches.py build    # patches for the published history
+    python scripts/snapshot_patches.py verify   # apply the chain, check the hashes
+    python scripts/snapshot_patches.py sync MIRROR_DIR --base-url https://.../data/
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+from urllib.parse import urljoin
+
+from snapshot_store import (
+    DATA_DIR,
+    HASH_PREFIX_LENGTH,
+    LATEST_NAME,
+    MAX_PATCH_HOPS,
+    PATCHES_DIR_NAME,
+    load_history,
+    load_latest,
+    load_snapshot,
+    patch_relpath,
+    patch_transitions,
+    payload_fields,
+    payload_hash,
+    refresh_manifest,
+    stamp,
+)
+
+
+def _same(a, b):
+    # 4159 and 4159.0 are equal in Python but not in the published JSON
+    return json.dumps(a, sort_keys=True) == json.dumps(b, sort_keys=True)
+
+
+def _has_null(value):
+    if value is None:
+        return True
+    if isinstance(value, dict):
+        return any(_has_null(item) for item in value.values())
+    if isinstance(value, list):
+        return any(_has_null(item) for item in value)
+    return False
+
+
+def diff(old, new):
+    """
+    JSON merge patch turning old into new (both dicts). Raises ValueError
+    if new holds a null, which a merge patch cannot express.
+    """
+    patch = {key: None for key in old if key not in new}
+    for key, value in new.items():
+        if isinstance(value, dict) and isinstance(old.get(key), dict):
+            nested = diff(old[key], value)
+            if nested:
+                patch[key] = nested
+        elif key not in old or not _same(old[key], value):
+            if _has_null(value):
+                raise ValueError(f"{key} holds a null value")
+            patch[key] = value
+    return patch
+
+
+def apply(target, patch):
+    """Apply a JSON merge patch to target; returns a new object."""
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply(result.get(key), value)
+    return result
+
+
+def make_patch(old, new):
+    """Patch document from payload old to payload new."""
+    return {
+        "from": payload_hash(old),
+        "to": payload_hash(new),
+        "updated": new.get("updated"),
+        "patch": diff(payload_fields(old), payload_fields(new)),
+    }
+
+
+def apply_patch(data, document):
+    """
+    Apply a patch document to the payload it starts from. Raises ValueError
+    if data is not that payload or the result does not hash to "to".
+    """
+    if payload_hash(data) != document["from"]:
+        raise ValueError(f"patch starts from {document['from'][:HASH_PREFIX_LENGTH]}")
+    result = apply(payload_fields(data), document["patch"])
+    if payload_hash(result) != document["to"]:
+        raise ValueError(f"patched payload does not match {document['to'][:HASH_PREFIX_LENGTH]}")
+    return stamp({"updated": document.get("updated"), **result}, document["to"])
+
+
+def _write_compact(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+        f.write("\n")
+    tmp_path.replace(path)
+
+
+def prune_patches(history, data_dir=DATA_DIR):
+    """Delete patches that are no longer on the chain; returns the count."""
+    keep = {
+        Path(patch_relpath(from_digest, to_digest)).name
+        for from_digest, to_digest in patch_transitions(history)
+    }
+    removed = 0
+    for path in (Path(data_dir) / PATCHES_DIR_NAME).glob("*.json"):
+        if path.name not in keep:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def write_patch(old, new, data_dir=DATA_DIR, history=None):
+    """
+    Write the patch from the previous snapshot old to the new one and prune
+    patches that have fallen off the chain of history (index.json, with the
+    new version). Returns the relative path, or None if no patch was written.
+    """
+    data_dir = Path(data_dir)
+    try:
+        document = make_patch(old, new)
+    except ValueError as e:
+        print(f"Warning: no delta patch for this version: {e}")
+        return None
+    if document["from"] == document["to"]:
+        return None
+
+    # A patch that does not reproduce the snapshot must never be published
+    apply_patch(old, document)
+    relpath = patch_relpath(document["from"], document["to"])
+    _write_compact(data_dir / relpath, document)
+    print(f"Wrote delta patch {relpath} ({(data_dir / relpath).stat().st_size} bytes)")
+
+    prune_patches(load_history(data_dir) if history is None else history, data_dir)
+    return relpath
+
+
+def plan(manifest, digest):
+    """
+    Patches a client holding payload digest should apply to reach the
+    manifest's snapshot, or None when it should fetch the snapshot in full
+    (not on the chain, or the patches are larger than the snapshot).
+    """
+    chain = manifest.get("patches") or []
+    starts = [entry["from"] for entry in chain]
+    if digest not in starts:
+        return None
+    steps = chain[starts.index(digest):]
+    if sum(entry["bytes"] for entry in steps) >= manifest.get("bytes", 0):
+        return None
+    return steps
+
+
+def build(data_dir=DATA_DIR):
+    """Write the patches of the last published transitions; returns the count."""
+    data_dir = Path(data_dir)
+    history = load_history(data_dir)
+    files = {version["sha256"]: version["file"] for version in history}
+    written = 0
+    for from_digest, to_digest in patch_transitions(history):
+        payloads = []
+        for digest in (from_digest, to_digest):
+            with open(data_dir / files[digest], "r", encoding="utf-8") as f:
+                payloads.append(json.load(f))
+        if write_patch(*payloads, data_dir, history):
+            written += 1
+    refresh_manifest(data_dir)
+    return written
+
+
+def verify(data_dir=DATA_DIR):
+    """
+    Apply the chain from every version on it to the current snapshot.
+    Returns [(from digest, hops, patch bytes)]; raises ValueError on a bad patch.
+    """
+    data_dir = Path(data_dir)
+    latest = load_latest(data_dir)
+    files = {version["sha256"]: version["file"] for version in load_history(data_dir)}
+    results = []
+    for entry in latest.get("patches") or []:
+        with open(data_dir / files[entry["from"]], "r", encoding="utf-8") as f:
+            data = json.load(f)
+        steps = latest["patches"][latest["patches"].index(entry):]
+        for step in steps:
+            with open(data_dir / step["file"], "r", encoding="utf-8") as f:
+                data = apply_patch(data, json.load(f))
+        if payload_hash(data) != latest["sha256"]:
+            raise ValueError(f"chain from {entry['from'][:HASH_PREFIX_LENGTH]} ends elsewhere")
+        results.append((entry["from"], len(steps), sum(step["bytes"] for step in steps)))
+    return results
+
+
+def _fetch_json(client, url, dest_dir):
+    download = client.download(url, dest_dir)
+    try:
+        with open(download.path, "r", encoding="utf-8") as f:
+            return json.load(f), download.size
+    finally:
+        os.unlink(download.path)
+
+
+def sync(mirror_dir, base_url, client=None):
+    """
+    Bring a mirror (latest.json and the current snapshot) up to date with
+    the published data at base_url, through the patch chain when possible.
+    Returns (mode, bytes downloaded) with mode "current", "patched" or "full".
+    """
+    from http_client import HTTPStatusError, default_client
+
+    client = client or default_client()
+    mirror_dir = Path(mirror_dir)
+    base_url = base_url.rstrip("/") + "/"
+
+    manifest, downloaded = _fetch_json(client, urljoin(base_url, LATEST_NAME), mirror_dir)
+    local = load_latest(mirror_dir)
+    if local and local["sha256"] == manifest["sha256"]:
+        return "current", downloaded
+
+    data = None
+    steps = plan(manifest, local["sha256"]) if local else None
+    if steps:
+        try:
+            data = load_snapshot(mirror_dir, local)
+            for step in steps:
+                document, size = _fetch_json(client, urljoin(base_url, step["file"]), mirror_dir)
+                downloaded += size
+                data = apply_patch(data, document)
+            mode = "patched"
+        except (OSError, ValueError, HTTPStatusError) as e:
+            print(f"Patching failed ({e}), fetching the full snapshot")
+            data = None
+    if data is None:
+        data, size = _fetch_json(client, urljoin(base_url, manifest["file"]), mirror_dir)
+        downloaded += size
+        if payload_hash(data) != manifest["sha256"]:
+            raise ValueError(f"{manifest['file']} does not match the manifest")
+        mode = "full"
+
+    _write_compact(mirror_dir / manifest["file"], data)
+    _write_compact(mirror_dir / LATEST_NAME, manifest)
+    if local and local["file"] != manifest["file"]:
+        (mirror_dir / local["file"]).unlink(missing_ok=True)
+    return mode, downloaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("build", help=f"write patches for the last {MAX_PATCH_HOPS} versions")
+    commands.add_parser("verify", help="apply the patch chain and check the hashes")
+    mirror = commands.add_parser("sync", help="update a mirror of the published data")
+    mirror.add_argument("mirror_dir")
+    mirror.add_argument("--base-url", required=True, help="URL of public/data")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        print(f"Wrote {build()} patches")
+        return 0
+
+    if args.command == "sync":
+        mode, downloaded = sync(args.mirror_dir, args.base_url)
+        print(f"Mirror {mode}, {downloaded} bytes downloaded")
+        return 0
+
+    latest = load_latest()
+    if not latest:
+        print("Snapshot store is empty")
+        return 1
+    print(f"Patch chain to {latest['file']} ({latest['bytes']} bytes):")
+    print("=" * 50)
+    try:
+        for digest, hops, size in verify():
+            print(f"  from {digest[:HASH_PREFIX_LENGTH]}: {hops} patch(es), {size} bytes")
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        return 1
+    print("\n✅ Every patch chain reproduces the current snapshot")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
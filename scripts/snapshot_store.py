@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store for published index snapshots.
+
+Instead of writing a full indices-YYYY-MM-DD.json every day, the payload
+(everything except the "updated" and "sha256" fields) is hashed and written
+to public/data/snapshots/<hash>.json only when it actually changes, stamped
+with that hash in its "sha256" field, together with a minified dense
+columnar copy in <hash>.dense.json (see dense_format).
+public/data/latest.json is the manifest that points to the current snapshot
+and public/data/snapshots/index.json lists every published version;
+public/data/latest.sha256 holds just the current hash and file name for
+clients that only need to revalidate a cached copy. Each
+change of snapshot also writes a small delta patch from the previous one
+into public/data/patches/ (see snapshot_patches), chained from latest.json.
+
+Usage:
+    python scripts/snapshot_store.py compact   # fold dated files into the store
+    python scripts/snapshot_store.py manifest  # rewrite latest.json
+    python scripts/snapshot_store.py show      # print the current manifest
+"""
+
+import re
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+from dense_format import SERIES_KEYS, to_dense
+
+DATA_DIR = Path(__file__).parent.parent / "public" / "data"
+SNAPSHOT_DIR_NAME = "snapshots"
+LATEST_NAME = "latest.json"
+STAMP_NAME = "latest.sha256"
+RATIOS_NAME = "ratios.json"
+CHARTS_DIR_NAME = "charts"
+PATCHES_DIR_NAME = "patches"
+HISTORY_NAME = "index.json"
+HASH_PREFIX_LENGTH = 16
+MANIFEST_VERSION = 1
+# Delta patches kept (and listed in the manifest) behind the current snapshot
+MAX_PATCH_HOPS = 8
+
+# Fields that describe a payload rather than belong to it
+STAMP_FIELDS = ("updated", "sha256")
+
+DATED_FILE_PATTERN = re.compile(r"^indices-(\d{4}-\d{2}-\d{2})\.json$")
+
+
+def payload_fields(data):
+    """The payload without its stamp fields (see STAMP_FIELDS)."""
+    return {key: value for key, value in data.items() if key not in STAMP_FIELDS}
+
+
+def canonical_payload(data):
+    """
+    Serialize the index payload canonically for hashing.
+    The "updated" and "sha256" fields are excluded so that re-publishing
+    identical data on a later day produces the same hash, and the hash can
+    be stamped into the published file.
+    """
+    payload = payload_fields(data)
+    return json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+def payload_hash(data):
+    """Return the SHA-256 hex digest of the canonical payload."""
+    return hashlib.sha256(canonical_payload(data)).hexdigest()
+
+
+def stamp(data, digest):
+    """The payload with its content hash as the "sha256" field."""
+    return {"updated": data.get("updated"), "sha256": digest, **payload_fields(data)}
+
+
+def snapshot_relpath(digest):
+    """Path of a snapshot blob relative to the data directory."""
+    return f"{SNAPSHOT_DIR_NAME}/{digest[:HASH_PREFIX_LENGTH]}.json"
+
+
+def dense_relpath(relpath):
+    """Path of the dense copy of a snapshot blob."""
+    return relpath[: -len(".json")] + ".dense.json"
+
+
+def patch_relpath(from_digest, to_digest):
+    """Path of the delta patch between two snapshots (see snapshot_patches)."""
+    return (
+        f"{PATCHES_DIR_NAME}/{from_digest[:HASH_PREFIX_LENGTH]}"
+        f"-{to_digest[:HASH_PREFIX_LENGTH]}.json"
+    )
+
+
+def patch_transitions(history, hops=MAX_PATCH_HOPS):
+    """The last hops (from, to) version transitions of index.json."""
+    digests = [version["sha256"] for version in history]
+    transitions = [(a, b) for a, b in zip(digests, digests[1:]) if a != b]
+    return transitions[-hops:] if hops else []
+
+
+def patch_chain(data_dir=DATA_DIR, history=None):
+    """
+    The delta patches that lead to the current snapshot, oldest first, as
+    [{"from", "file", "bytes"}]. The chain stops at the first missing patch,
+    so a client can apply every entry from its own version on.
+    """
+    data_dir = Path(data_dir)
+    history = load_history(data_dir) if history is None else history
+    chain = []
+    for from_digest, to_digest in reversed(patch_transitions(history)):
+        path = data_dir / patch_relpath(from_digest, to_digest)
+        if not path.exists():
+            break
+        chain.append(
+            {
+                "from": from_digest,
+                "file": patch_relpath(from_digest, to_digest),
+                "bytes": path.stat().st_size,
+            }
+        )
+    return chain[::-1]
+
+
+def _write_json(path, data, indent=2):
+    """
+    Write JSON atomically so readers never see a half-written file.
+    indent=None writes minified JSON.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    separators = (",", ":") if indent is None else None
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent, separators=separators, ensure_ascii=False)
+        f.write("\n")
+    tmp_path.replace(path)
+
+
+def write_dense(data, relpath, data_dir=DATA_DIR, force=False):
+    """Write the dense columnar copy of a snapshot if it is missing."""
+    dense_path = Path(data_dir) / dense_relpath(relpath)
+    if force or not dense_path.exists():
+        _write_json(dense_path, to_dense(data), indent=None)
+        print(f"Wrote dense snapshot {dense_relpath(relpath)}")
+
+
+def stamp_snapshot(relpath, digest, data_dir=DATA_DIR):
+    """
+    Load a stored snapshot, first stamping it (and its dense copy) with its
+    content hash if it was written before payloads carried one. The hash
+    does not change, as the stamp is not part of the payload.
+    """
+    blob_path = Path(data_dir) / relpath
+    with open(blob_path, "r", encoding="utf-8") as f:
+        stored = json.load(f)
+    if stored.get("sha256") != digest:
+        stored = stamp(stored, digest)
+        _write_json(blob_path, stored)
+        write_dense(stored, relpath, data_dir, force=True)
+        print(f"Stamped {relpath} with its content hash")
+    return stored
+
+
+def load_latest(data_dir=DATA_DIR):
+    """Load the latest.json pointer, or None if the store is empty."""
+    latest_path = Path(data_dir) / LATEST_NAME
+    if not latest_path.exists():
+        return None
+
+    with open(latest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_history(data_dir=DATA_DIR):
+    """Load the list of published versions (oldest first)."""
+    history_path = Path(data_dir) / SNAPSHOT_DIR_NAME / HISTORY_NAME
+    if not history_path.exists():
+        return []
+
+    with open(history_path, "r", encoding="utf-8") as f:
+        return json.load(f).get("versions", [])
+
+
+def series_coverage(data):
+    """Return {series: {"last_year": y, "last_month": m}} for the manifest."""
+    coverage = {}
+    for key in SERIES_KEYS:
+        series = data.get(key)
+        if not series:
+            continue
+        last_year = max(int(year) for year in series)
+        months = series.get(str(last_year), series.get(last_year, {}))
+        last_month = max((int(month) for month in months), default=None)
+        coverage[key] = {"last_year": last_year, "last_month": last_month}
+    return coverage
+
+
+def build_manifest(
+    data,
+    relpath,
+    digest,
+    size,
+    sources=None,
+    dense_size=None,
+    ratios_size=None,
+    charts_sizes=None,
+    patches=None,
+):
+    """
+    Build the latest.json manifest for a stored snapshot.
+    sources maps source document names to the SHA-256 of the PDF the
+    snapshot was parsed from, charts_sizes chart series resolutions to the
+    size of their file (see chart_series), patches is the patch_chain().
+    """
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "updated": data.get("updated"),
+        "file": relpath,
+        "sha256": digest,
+        "bytes": size,
+        "series": series_coverage(data),
+    }
+    if dense_size is not None:
+        manifest["dense"] = {"file": dense_relpath(relpath), "bytes": dense_size}
+    if ratios_size is not None:
+        manifest["ratios"] = {"file": RATIOS_NAME, "bytes": ratios_size}
+    if charts_sizes:
+        manifest["charts"] = {
+            resolution: {"file": f"{CHARTS_DIR_NAME}/{resolution}.json", "bytes": size}
+            for resolution, size in sorted(charts_sizes.items())
+        }
+    if patches:
+        manifest["patches"] = patches
+    if sources:
+        manifest["sources"] = dict(sorted(sources.items()))
+    return manifest
+
+
+def write_manifest(data, relpath, digest, data_dir=DATA_DIR, sources=None):
+    """
+    Write latest.json for the given snapshot.
+    The content only depends on the snapshot and its sources, so rewriting it
+    on every run leaves the file byte-identical when nothing changed.
+    """
+    data_dir = Path(data_dir)
+    size = (data_dir / relpath).stat().st_size
+    dense_path = data_dir / dense_relpath(relpath)
+    dense_size = dense_path.stat().st_size if dense_path.exists() else None
+    ratios_path = data_dir / RATIOS_NAME
+    ratios_size = ratios_path.stat().st_size if ratios_path.exists() else None
+    charts_sizes = {
+        path.stem: path.stat().st_size
+        for path in (data_dir / CHARTS_DIR_NAME).glob("*.json")
+    }
+    # Only a chain that ends at this snapshot is of use to clients
+    history = load_history(data_dir)
+    patches = None
+    if history and history[-1]["sha256"] == digest:
+        patches = patch_chain(data_dir, history)
+    manifest = build_manifest(
+        data,
+        relpath,
+        digest,
+        size,
+        sources,
+        dense_size,
+        ratios_size,
+        charts_sizes,
+        patches,
+    )
+    _write_json(data_dir / LATEST_NAME, manifest)
+
+    # The smallest possible revalidation request: "<sha256>  <file>"
+    stamp_path = data_dir / STAMP_NAME
+    tmp_path = stamp_path.with_name(STAMP_NAME + ".tmp")
+    tmp_path.write_text(f"{digest}  {relpath}\n", encoding="utf-8")
+    tmp_path.replace(stamp_path)
+    return manifest
+
+
+def load_snapshot(data_dir=DATA_DIR, latest=None):
+    """
+    Load the snapshot that latest.json points to.
+    Returns the full data dict or None if the store is empty.
+    """
+    data_dir = Path(data_dir)
+    latest = latest or load_latest(data_dir)
+    if not latest:
+        return None
+
+    with open(data_dir / latest["file"], "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def publish_snapshot(data, data_dir=DATA_DIR, sources=None):
+    """
+    Publish an index payload into the store.
+
+    A new blob is written only if the payload hash differs from every stored
+    blob, and index.json only grows when the current snapshot changes.
+    latest.json is rewritten on every run, recording sources if given.
+    Returns (relative_path, changed).
+    """
+    data_dir = Path(data_dir)
+    digest = payload_hash(data)
+    relpath = snapshot_relpath(digest)
+
+    latest = load_latest(data_dir)
+    if latest and latest.get("sha256") == digest:
+        print(f"Snapshot unchanged ({digest[:HASH_PREFIX_LENGTH]}), nothing to write")
+        stored = stamp_snapshot(relpath, digest, data_dir)
+        write_dense(stored, relpath, data_dir)
+        write_manifest(
+            stored,
+            relpath,
+            digest,
+            data_dir,
+            sources or latest.get("sources"),
+        )
+        return relpath, False
+
+    blob_path = data_dir / relpath
+    if not blob_path.exists():
+        _write_json(blob_path, stamp(data, digest))
+        print(f"Wrote snapshot {relpath}")
+    else:
+        print(f"Snapshot {relpath} already stored, reusing it")
+
+    history = load_history(data_dir)
+    history.append(
+        {"sha256": digest, "file": relpath, "published": data.get("updated")}
+    )
+    _write_json(
+        data_dir / SNAPSHOT_DIR_NAME / HISTORY_NAME, {"versions": history}
+    )
+
+    stored = stamp_snapshot(relpath, digest, data_dir)
+    if latest:
+        # Imported here as snapshot_patches builds on this module
+        from snapshot_patches import write_patch
+
+        write_patch(load_snapshot(data_dir, latest), stored, data_dir, history)
+    write_dense(stored, relpath, data_dir)
+    write_manifest(stored, relpath, digest, data_dir, sources)
+    print(f"Updated {LATEST_NAME} -> {relpath}")
+
+    return relpath, True
+
+
+def refresh_manifest(data_dir=DATA_DIR):
+    """
+    Rewrite latest.json (and a missing dense copy) for the current snapshot,
+    e.g. after derived files next to it have changed.
+    Returns the manifest or None if the store is empty.
+    """
+    latest = load_latest(data_dir)
+    if not latest:
+        return None
+
+    stored = stamp_snapshot(latest["file"], latest["sha256"], data_dir)
+    write_dense(stored, latest["file"], data_dir)
+    return write_manifest(
+        stored, latest["file"], latest["sha256"], data_dir, latest.get("sources")
+    )
+
+
+def find_dated_files(data_dir=DATA_DIR):
+    """Return legacy indices-YYYY-MM-DD.json files sorted by date."""
+    dated = []
+    for path in Path(data_dir).glob("indices-*.json"):
+        match = DATED_FILE_PATTERN.match(path.name)
+        if match:
+            dated.append((match.group(1), path))
+    return [path for _, path in sorted(dated)]
+
+
+def compact(data_dir=DATA_DIR, keep_dated=False):
+    """
+    Fold legacy daily files into the content-addressed layout.
+
+    Files are replayed in date order, so every change of payload becomes one
+    version in index.json and the newest file becomes latest.json. The dated
+    files are removed afterwards unless keep_dated is set.
+    """
+    data_dir = Path(data_dir)
+    dated_files = find_dated_files(data_dir)
+    if not dated_files:
+        print("No dated indices files to compact")
+        return 0
+
+    print(f"Compacting {len(dated_files)} dated files...")
+    versions_before = len(load_history(data_dir))
+
+    for path in dated_files:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        publish_snapshot(data, data_dir)
+
+    history = load_history(data_dir)
+    blobs = len({version["sha256"] for version in history})
+
+    if not keep_dated:
+        for path in dated_files:
+            path.unlink()
+        print(f"Removed {len(dated_files)} dated files")
+
+    print(
+        f"Compaction done: {len(history) - versions_before} new versions, "
+        f"{blobs} snapshot blobs"
+    )
+    return 0
+
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compact_parser = subparsers.add_parser(
+        "compact", help="fold indices-YYYY-MM-DD.json files into the store"
+    )
+    compact_parser.add_argument(
+        "--keep-dated", action="store_true", help="do not delete the dated files"
+    )
+    subparsers.add_parser("manifest", help="rewrite latest.json from the store")
+    subparsers.add_parser("show", help="print the current latest.json manifest")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compact":
+        return compact(keep_dated=args.keep_dated)
+
+    latest = load_latest()
+    if not latest:
+        print("Snapshot store is empty")
+        return 1
+
+    if args.command == "manifest":
+        refresh_manifest()
+        print(f"Rewrote {LATEST_NAME} for {latest['file']}")
+        return 0
+
+    print(json.dumps(latest, indent=2, ensure_ascii=False))
+    print(f"Versions published: {len(load_history())}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""
+Synthetic versions of the source PDFs for benchmarks and parser checks.
+
+Generates documents with the same layout as the Helsinki sources: the
+"Vuosi/kk" monthly tables of both indices (newest year first, header
+repeated after page breaks), the ruled "V/KK" table of the old market index
+and the rajaneliöhinta sentence. Table sizes, parenthesised provisional
+values and rows per page are configurable, so parsers can be measured as
+history grows without touching the network.
+
+Pages are laid out once as text runs and lines and rendered either as SVG
+through cairosvg (as create_og_image.py does) or with the small built-in
+PDF writer, which needs no native libraries. "auto" uses cairosvg when the
+cairo library can be loaded.
+
+Usage:
+    python scripts/synthetic_pdfs.py [--years 50] [--provisional 2]
+        [--rows-per-page N] [--renderer auto|cairosvg|builtin] [--out DIR]
+    python scripts/synthetic_pdfs.py --scaling 10,25,50,100   # parse time per size
+"""
+
+import io
+import sys
+import time
+import random
+import argparse
+import contextlib
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+try:
+    import cairosvg
+except (ImportError, OSError):
+    # OSError: cairosvg is installed but the cairo library is missing
+    cairosvg = None
+
+RENDERERS = ("auto", "cairosvg", "builtin")
+
+PAGE_WIDTH = 595.2
+PAGE_HEIGHT = 841.92
+MARGIN_LEFT = 56
+MARGIN_BOTTOM = 60
+ROW_HEIGHT = 13
+FONT_SIZE = 9
+
+# Column positions of the year and the 12 monthly values
+YEAR_X = MARGIN_LEFT
+MONTH_X = [MARGIN_LEFT + 50 + 38 * month for month in range(12)]
+
+
+def random_walk_table(first_year, years, last_month, start_value, decimals, seed):
+    """
+    {year: {month: value}} for years starting at first_year, drifting
+    upwards like the real indices. The last year has last_month months.
+    """
+    rng = random.Random(seed)
+    table = {}
+    value = start_value
+    last_year = first_year + years - 1
+    for year in range(first_year, last_year + 1):
+        months = last_month if year == last_year else 12
+        table[year] = {}
+        for month in range(1, months + 1):
+            value = max(1.0, value * (1 + rng.uniform(-0.006, 0.01)))
+            table[year][month] = round(value, decimals)
+    return table
+
+
+def _format(value, decimals):
+    return f"{value:.{decimals}f}"
+
+
+class Layout:
+    """Pages of ("text", x, y, size, string) and ("line", x0, y0, x1, y1) items."""
+
+    def __init__(self):
+        self.pages = []
+        self.y = 0
+        self.new_page()
+
+    def new_page(self):
+        self.pages.append([])
+        self.y = PAGE_HEIGHT - 60
+
+    def text(self, x, string, size=FONT_SIZE):
+        self.pages[-1].append(("text", x, self.y, size, string))
+
+    def line(self, x0, y0, x1, y1):
+        self.pages[-1].append(("line", x0, y0, x1, y1))
+
+    def advance(self, height=ROW_HEIGHT):
+        self.y -= height
+
+    def fits(self, rows=1):
+        return self.y - rows * ROW_HEIGHT >= MARGIN_BOTTOM
+
+
+def _page_header(layout, title):
+    layout.text(MARGIN_LEFT, f"HELSINGIN KAUPUNKI {len(layout.pages)}")
+    layout.advance()
+    layout.text(MARGIN_LEFT, "Kaupunkiympäristö – Asumisen palvelut")
+    layout.advance()
+    layout.text(MARGIN_LEFT, title, size=12)
+    layout.advance(ROW_HEIGHT * 2)
+
+
+def _index_section(layout, title, table, decimals, source, provisional, rows_per_page):
+    """
+    One "Vuosi/kk" table, continued on new pages with a repeated header.
+    provisional is {year: [months]} of values printed in parentheses.
+    """
+    layout.text(MARGIN_LEFT, f"{title} 2005=100", size=11)
+    layout.advance(ROW_HEIGHT * 1.5)
+    layout.text(
+        MARGIN_LEFT,
+        "Karkea hinta-arvio saadaan kertomalla hankintahinta indeksien suhteella.",
+    )
+    layout.advance(ROW_HEIGHT * 1.5)
+
+    def header():
+        layout.text(YEAR_X, "Vuosi/kk")
+        for month, x in enumerate(MONTH_X, 1):
+            layout.text(x, str(month))
+        layout.advance()
+
+    header()
+    rows_on_page = 0
+    for year in sorted(table, reverse=True):
+        if not layout.fits(2) or rows_on_page == rows_per_page:
+            layout.new_page()
+            _page_header(layout, "MARKKINAHINTA- JA RAKENNUSKUSTANNUSINDEKSI")
+            header()
+            rows_on_page = 0
+        layout.text(YEAR_X, str(year))
+        for month, value in sorted(table[year].items()):
+            text = _format(value, decimals)
+            if month in provisional.get(year, ()):
+                text = f"({text})"
+            layout.text(MONTH_X[month - 1], text)
+        layout.advance()
+        rows_on_page += 1
+
+    layout.text(MARGIN_LEFT, f"Lähde: {source}. Tilastokeskus")
+    layout.advance()
+
+
+def index_layout(rakennuskustannus, markkinahinta, provisional=None, rows_per_page=None):
+    """
+    Layout of hitas-indeksit-2005-100.pdf: one index table per section.
+    provisional is {series_key: {year: [months]}} as published.
+    """
+    provisional = provisional or {}
+    layout = Layout()
+    _page_header(layout, "MARKKINAHINTA- JA RAKENNUSKUSTANNUSINDEKSI")
+    _index_section(
+        layout,
+        "Rakennuskustannusindeksi",
+        rakennuskustannus,
+        2,
+        "Rakennuskustannusindeksi",
+        provisional.get("rakennuskustannusindeksi", {}),
+        rows_per_page,
+    )
+    layout.new_page()
+    _page_header(layout, "MARKKINAHINTA- JA RAKENNUSKUSTANNUSINDEKSI")
+    _index_section(
+        layout,
+        "Markkinahintaindeksi",
+        markkinahinta,
+        1,
+        "Osakeasuntojen hinnat",
+        provisional.get("markkinahintaindeksi", {}),
+        rows_per_page,
+    )
+    return layout
+
+
+def old_index_layout(table, rows_per_page=None):
+    """Layout of hitas-markkinahintaindeksi.pdf: a ruled V/KK table."""
+    layout = Layout()
+    left = YEAR_X - 4
+    right = MONTH_X[-1] + 34
+    columns = [left, MONTH_X[0] - 6] + [x + 32 for x in MONTH_X]
+
+    def title():
+        _page_header(layout, "VANHOJEN OSAKEASUNTOJEN HINTAINDEKSI")
+        layout.text(MARGIN_LEFT, "Vanhojen osakeasuntojen hintaindeksi 1983=100", size=11)
+        layout.advance(ROW_HEIGHT * 2)
+
+    def row(cells):
+        top = layout.y + ROW_HEIGHT - 3
+        layout.text(YEAR_X, cells[0])
+        for x, cell in zip(MONTH_X, cells[1:]):
+            layout.text(x, cell)
+        bottom = top - ROW_HEIGHT
+        layout.line(left, top, right, top)
+        layout.line(left, bottom, right, bottom)
+        for x in columns:
+            layout.line(x, top, x, bottom)
+        layout.advance()
+
+    title()
+    row(["V/KK"] + [str(month) for month in range(1, 13)])
+    rows_on_page = 0
+    for year in sorted(table, reverse=True):
+        if not layout.fits(2) or rows_on_page == rows_per_page:
+            layout.new_page()
+            title()
+            row(["V/KK"] + [str(month) for month in range(1, 13)])
+            rows_on_page = 0
+        values = [_format(table[year][month], 1) for month in sorted(table[year])]
+        row([str(year)] + values + [""] * (12 - len(values)))
+        rows_on_page += 1
+
+    layout.text(MARGIN_LEFT, "Lähde: Tilastokeskus")
+    return layout
+
+
+def rajahinta_layout(price_per_sqm, valid_until):
+    """Layout of hitas-rajahinta.pdf: the rajaneliöhinta sentence."""
+    layout = Layout()
+    _page_header(layout, "HITAS-RAJAHINTA")
+    price = f"{int(price_per_sqm):,}".replace(",", " ")
+    day, month, year = valid_until
+    layout.text(
+        MARGIN_LEFT,
+        f"Hitas-rajaneliöhinta on {price} euroa/m² ja se on voimassa "
+        f"{day}.{month}.{year} asti.",
+    )
+    return layout
+
+
+def _pdf_string(text):
+    """Encode text as a PDF literal string in WinAnsiEncoding."""
+    out = []
+    for byte in text.encode("cp1252"):
+        if byte in (0x28, 0x29, 0x5C):
+            out.append("\\" + chr(byte))
+        elif 32 <= byte < 127:
+            out.append(chr(byte))
+        else:
+            out.append(f"\\{byte:03o}")
+    return "(" + "".join(out) + ")"
+
+
+def render_svg(items):
+    """One page of layout items as an SVG document (y measured from the top)."""
+    parts = [
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        f'width="{PAGE_WIDTH}pt" height="{PAGE_HEIGHT}pt" '
+        f'viewBox="0 0 {PAGE_WIDTH} {PAGE_HEIGHT}">',
+        '<rect width="100%" height="100%" fill="white"/>',
+        '<g font-family="Helvetica, Arial, sans-serif" fill="black">',
+    ]
+    for item in items:
+        if item[0] == "text":
+            _, x, y, size, string = item
+            parts.append(
+                f'<text x="{x:.2f}" y="{PAGE_HEIGHT - y:.2f}" font-size="{size}" '
+                f'xml:space="preserve">{escape(string)}</text>'
+            )
+        else:
+            _, x0, y0, x1, y1 = item
+            parts.append(
+                f'<line x1="{x0:.2f}" y1="{PAGE_HEIGHT - y0:.2f}" x2="{x1:.2f}" '
+                f'y2="{PAGE_HEIGHT - y1:.2f}" stroke="black" stroke-width="0.5"/>'
+            )
+    parts.append("</g></svg>")
+    return "\n".join(parts)
+
+
+def merge_pdfs(documents):
+    """Concatenate single-page (or any) PDFs into one document with pdfium."""
+    import pypdfium2 as pdfium
+
+    merged = pdfium.PdfDocument.new()
+    for data in documents:
+        merged.import_pages(pdfium.PdfDocument(data))
+    out = io.BytesIO()
+    merged.save(out)
+    return out.getvalue()
+
+
+def render_cairosvg(layout):
+    """Render every page as SVG with cairosvg and merge them into one PDF."""
+    if cairosvg is None:
+        raise RuntimeError("cairosvg (and the cairo library) is required for this renderer")
+    return merge_pdfs(
+        cairosvg.svg2pdf(bytestring=render_svg(items).encode("utf-8"))
+        for items in layout.pages
+    )
+
+
+def resolve_renderer(renderer="auto"):
+    """The renderer actually used for a choice ("auto" prefers cairosvg)."""
+    if renderer not in RENDERERS:
+        raise ValueError(f"unknown renderer {renderer}")
+    if renderer == "auto":
+        return "cairosvg" if cairosvg is not None else "builtin"
+    return renderer
+
+
+def render(layout, renderer="auto"):
+    """Render a layout to PDF bytes with the chosen renderer."""
+    if resolve_renderer(renderer) == "cairosvg":
+        return render_cairosvg(layout)
+    return render_pdf(layout)
+
+
+def render_pdf(layout):
+    """Write a layout as a PDF using the standard Helvetica font."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+        b"/Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for items in layout.pages:
+        ops = ["0.5 w"]
+        for item in items:
+            if item[0] == "text":
+                _, x, y, size, string = item
+                ops.append(
+                    f"BT /F1 {size} Tf {x:.2f} {y:.2f} Td {_pdf_string(string)} Tj ET"
+                )
+            else:
+                _, x0, y0, x1, y1 = item
+                ops.append(f"{x0:.2f} {y0:.2f} m {x1:.2f} {y1:.2f} l S")
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+        objects.append(
+            (
+                "<< /Type /Page /Parent 2 0 R "
+                f"/MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+            ).encode("ascii")
+        )
+        page_ids.append(len(objects))
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(
+        b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+        % (len(objects) + 1, xref)
+    )
+    return out.getvalue()
+
+
+def fixture_set(
+    years=50,
+    last_month=10,
+    seed=0,
+    provisional=0,
+    rows_per_page=None,
+    renderer="auto",
+    old_years=None,
+):
+    """
+    Build the three source PDFs plus the values they contain.
+
+    Tables start at the base year of each index (the parsers only accept
+    rows from 2005 and 1978 on, up to 2100) and grow forward, so the index
+    tables hold at most 96 years; old_years defaults to years. The last
+    provisional months of both index tables are printed in parentheses.
+    Returns {"pdfs": {source: bytes}, "expected": {source: parsed value},
+    "provisional": {series_key: {year: [months]}}}.
+    """
+    index_years = min(years, 2100 - 2005 + 1)
+    rakennuskustannus = random_walk_table(2005, index_years, last_month, 98.6, 2, seed)
+    markkinahinta = random_walk_table(2005, index_years, last_month, 96.4, 1, seed + 1)
+    old_index = random_walk_table(
+        1983, old_years or years, last_month, 100.0, 1, seed + 2
+    )
+    rajahinta = {"price_per_sqm": 4008.0, "valid_until": (31, 10, 2025)}
+
+    flagged = {}
+    for key, table in (
+        ("rakennuskustannusindeksi", rakennuskustannus),
+        ("markkinahintaindeksi", markkinahinta),
+    ):
+        months = [(year, month) for year in sorted(table) for month in sorted(table[year])]
+        for year, month in months[len(months) - provisional :] if provisional else []:
+            flagged.setdefault(key, {}).setdefault(year, []).append(month)
+
+    return {
+        "pdfs": {
+            "indices": render(
+                index_layout(rakennuskustannus, markkinahinta, flagged, rows_per_page),
+                renderer,
+            ),
+            "old_market_index": render(old_index_layout(old_index, rows_per_page), renderer),
+            "rajaneliohinta": render(
+                rajahinta_layout(rajahinta["price_per_sqm"], rajahinta["valid_until"]),
+                renderer,
+            ),
+        },
+        "expected": {
+            "indices": (rakennuskustannus, markkinahinta),
+            "old_market_index": old_index,
+            "rajaneliohinta": rajahinta["price_per_sqm"],
+        },
+        "provisional": flagged,
+    }
+
+
+FIXTURE_NAMES = {
+    "indices": "hitas-indeksit-2005-100.pdf",
+    "old_market_index": "hitas-markkinahintaindeksi.pdf",
+    "rajaneliohinta": "hitas-rajahinta.pdf",
+}
+
+
+def write_fixture_set(out_dir, years=50, **kwargs):
+    """Write a fixture set under the source file names; returns the expected values."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    fixtures = fixture_set(years, **kwargs)
+    for source, data in fixtures["pdfs"].items():
+        (out_dir / FIXTURE_NAMES[source]).write_bytes(data)
+    return fixtures["expected"]
+
+
+def check_parsers(fixtures):
+    """Parse a fixture set with the real parsers; returns the list of failures."""
+    from import_old_market_index import parse_old_market_index_table
+    from import_rajaneliohinta import parse_rajaneliohinta_from_pdf
+    from update_indices import INDEX_SECTIONS, extract_indices_incremental, prior_index_tables
+
+    pdfs = fixtures["pdfs"]
+    expected = fixtures["expected"]
+    with contextlib.redirect_stdout(io.StringIO()):
+        rakennuskustannus, markkinahinta, provisional = extract_indices_incremental(
+            io.BytesIO(pdfs["indices"])
+        )
+        # Re-parse with the full parse as the previous snapshot: the settled
+        # history must be taken from it, also when the tables span pages
+        tables = dict(zip(INDEX_SECTIONS.values(), (rakennuskustannus, markkinahinta)))
+        snapshot = {
+            key: {
+                str(year): {str(month): value for month, value in months.items()}
+                for year, months in table.items()
+            }
+            for key, table in tables.items()
+        }
+        snapshot["provisional"] = {
+            key: {str(year): months for year, months in years.items()}
+            for key, years in provisional.items()
+        }
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            incremental = extract_indices_incremental(
+                io.BytesIO(pdfs["indices"]), prior_index_tables(snapshot)
+            )
+        results = {
+            "indices": (rakennuskustannus, markkinahinta),
+            "old_market_index": parse_old_market_index_table(
+                io.BytesIO(pdfs["old_market_index"])
+            ),
+            "rajaneliohinta": (
+                parse_rajaneliohinta_from_pdf(io.BytesIO(pdfs["rajaneliohinta"])) or {}
+            ).get("price_per_sqm"),
+        }
+
+    failures = [source for source in expected if results[source] != expected[source]]
+    full_parse = (rakennuskustannus, markkinahinta, provisional)
+    if incremental != full_parse or "parsing all rows" in log.getvalue():
+        failures.append("incremental indices")
+    flagged = {key: years for key, years in provisional.items() if years}
+    if flagged != fixtures["provisional"]:
+        failures.append("provisional")
+    return failures
+
+
+def scaling(sizes, renderer="auto", rounds=3):
+    """Print the parse time of each parser for every history size."""
+    from import_old_market_index import parse_old_market_index_table
+    from update_indices import extract_indices_from_pdf, extract_indices_full_text
+
+    parsers = (
+        ("table regions (pdfium)", "indices", extract_indices_from_pdf),
+        ("full text (pdfplumber)", "indices", extract_indices_full_text),
+        ("old market index", "old_market_index", parse_old_market_index_table),
+    )
+    print(f"{'years':>5}  " + "  ".join(f"{name:>24}" for name, _, _ in parsers))
+    for years in sizes:
+        pdfs = fixture_set(years, renderer=renderer)["pdfs"]
+        cells = []
+        for _, source, parse in parsers:
+            best = None
+            for _ in range(rounds):
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    parse(io.BytesIO(pdfs[source]))
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            cells.append(f"{best * 1000:21.1f} ms")
+        print(f"{years:>5}  " + "  ".join(cells))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, default=50)
+    parser.add_argument(
+        "--provisional", type=int, default=2, help="trailing months in parentheses"
+    )
+    parser.add_argument("--rows-per-page", type=int, help="force page breaks")
+    parser.add_argument("--renderer", choices=RENDERERS, default="auto")
+    parser.add_argument("--out", help="directory for the generated PDFs")
+    parser.add_argument("--scaling", help="comma-separated sizes to time the parsers at")
+    args = parser.parse_args()
+
+    if args.scaling:
+        scaling([int(size) for size in args.scaling.split(",")], args.renderer)
+        sys.exit(0)
+
+    options = {
+        "provisional": args.provisional,
+        "rows_per_page": args.rows_per_page,
+        "renderer": args.renderer,
+    }
+    fixtures = fixture_set(args.years, **options)
+    if args.out:
+        write_fixture_set(args.out, args.years, **options)
+        print(f"Wrote {len(FIXTURE_NAMES)} PDFs to {args.out}")
+
+    print(f"Renderer: {resolve_renderer(args.renderer)}")
+    for source, data in fixtures["pdfs"].items():
+        print(f"{FIXTURE_NAMES[source]}: {len(data)} bytes")
+
+    failures = check_parsers(fixtures)
+    if not args.rows_per_page:
+        # The same history spread over pages, as long source PDFs are
+        paged = fixture_set(args.years, **{**options, "rows_per_page": 8})
+        failures += [f"{failure} (paged)" for failure in check_parsers(paged)]
+    if failures:
+        print(f"\n❌ Parsed values differ for: {', '.join(failures)}")
+        sys.exit(1)
+    print(f"\n✅ Parsers read back all {args.years} years")
@@ -2,47 +2,353 @@
 """
 Update HITAS indices from Helsinki city's PDF file.
 Downloads the latest PDF, parses the index tables, and creates JSON files.
+
+pdfplumber and pypdfium2 are imported only when a PDF is actually parsed,
+so --help and runs where no source changed start without them.
 """
 
+import os
 import sys
 import json
+import time
+import random
+import hashlib
+import argparse
+from datetime import date
+from contextlib import contextmanager
 from pathlib import Path
-import urllib.request
-import ssl
-import io
-
-try:
-    import pdfplumber
-except ImportError:
-    print("Error: pdfplumber not installed. Install with: pip install pdfplumber")
-    sys.exit(1)
-
-# Import the old market index importer and rajaneliöhinta importer
-from import_old_market_index import get_old_market_index
-from import_rajaneliohinta import get_rajaneliohinta
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+import parse_cache
+import run_metrics
+from chart_series import refresh_chart_series, update_placeholders, write_chart_series
+from compress_artifacts import compress_published, print_size_report
+from history_store import update_history
+from http_cache import fetch, source_url
+from import_old_market_index import (
+    OLD_INDEX_PDF_URL,
+    PARSER_VERSION as OLD_INDEX_PARSER_VERSION,
+    parse_old_market_index_table,
+)
+from import_rajaneliohinta import (
+    RAJAHINTA_PDF_URL,
+    PARSER_VERSION as RAJAHINTA_PARSER_VERSION,
+    parse_rajaneliohinta_from_pdf,
+)
 from import_rajaneliohinta_tilasto import get_rajaneliohinta_tilasto
-
-PDF_URL = "https://www.hel.fi/static/kv/asunto-osasto/hitas-indeksit-2005-100.pdf"
-# HTML_PATH no longer needed - Next.js handles file references automatically
+from pdf_backends import (
+    BACKEND_SOURCES,
+    BACKENDS,
+    REFERENCE_BACKEND,
+    get_backend,
+    map_page_shards,
+    page_count,
+    select_backend,
+)
+from ratio_tables import is_stale, load_ratio_tables, write_ratio_tables
+from snapshot_store import (
+    DATA_DIR,
+    load_latest,
+    load_snapshot,
+    publish_snapshot,
+    refresh_manifest,
+)
+
+PDF_URL = source_url("hitas-indeksit-2005-100.pdf")
+# Bump when the output of extract_indices_from_pdf changes (invalidates the parse cache)
+PARSER_VERSION = 3
+
+# Section titles of the two index tables (in document order) and their JSON keys
+INDEX_SECTIONS = {
+    "Rakennuskustannusindeksi": "rakennuskustannusindeksi",
+    "Markkinahintaindeksi": "markkinahintaindeksi",
+}
+# Settled history rows re-checked against the previous snapshot on each run
+HISTORY_SAMPLE_SIZE = 3
+
+# Source documents in the order they are processed
+SOURCES = (
+    ("indices", PDF_URL),
+    ("old_market_index", OLD_INDEX_PDF_URL),
+    ("rajaneliohinta", RAJAHINTA_PDF_URL),
+)
 
 
 def download_pdf():
-    """Download the latest PDF from Helsinki city website to memory."""
+    """Download the latest PDF through the HTTP cache; returns its path in the cache."""
     print(f"Downloading PDF from {PDF_URL}...")
 
     try:
-        # Create SSL context that doesn't verify certificates (for compatibility)
-        ssl_context = ssl._create_unverified_context()
-
-        with urllib.request.urlopen(PDF_URL, context=ssl_context) as response:
-            pdf_data = response.read()
-        print(f"PDF downloaded successfully ({len(pdf_data)} bytes)")
-        return io.BytesIO(pdf_data)
+        result = fetch(PDF_URL)
+        print(f"PDF downloaded successfully ({result.size} bytes)")
+        # The parsers open the cached file themselves; no copy in memory
+        return result.path
     except Exception as e:
         print(f"Error downloading PDF: {e}")
         return None
 
 
+@contextmanager
+def timed(stage, timings):
+    """Record the wall-clock time of a stage into timings and the run metrics."""
+    start = time.perf_counter()
+    try:
+        with run_metrics.span(stage):
+            yield
+    finally:
+        timings[stage] = time.perf_counter() - start
+
+
+class _CurrentThreadExecutor(Executor):
+    """Run submitted calls immediately in the calling thread (visible to cProfile)."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def _fetch_source(name, url):
+    """Download one source; returns (FetchResult or None, seconds)."""
+    start = time.perf_counter()
+    print(f"Downloading {url}...")
+    try:
+        result = fetch(url)
+        print(f"Downloaded {name} ({result.size} bytes)")
+    except Exception as e:
+        print(f"Error downloading {name}: {e}")
+        result = None
+    return result, time.perf_counter() - start
+
+
+def fetch_sources(timings=None, workers=len(SOURCES)):
+    """
+    Download all source PDFs concurrently through the HTTP cache.
+    Returns {name: FetchResult}, with None for sources that failed.
+    """
+    timings = {} if timings is None else timings
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            name: executor.submit(_fetch_source, name, url) for name, url in SOURCES
+        }
+
+    # Join in SOURCES order so the result does not depend on timing
+    results = {}
+    for name, _ in SOURCES:
+        results[name], timings[f"fetch {name}"] = futures[name].result()
+        result = results[name]
+        run_metrics.record(f"fetch {name}", timings[f"fetch {name}"])
+        run_metrics.count("http_requests")
+        if result is None:
+            run_metrics.count("fetch_errors")
+        elif result.status == 304:
+            run_metrics.count("http_not_modified")
+        else:
+            run_metrics.count("bytes_downloaded", result.size)
+        if result is not None and not result.changed:
+            run_metrics.count("http_cache_hits")
+    return results
+
+
+# The parsers get the path of the cached body, the name of the PDF backend
+# (see pdf_backends) and the number of page workers; every backend reads
+# the file itself, so no PDF is copied into memory
+
+
+def _parse_indices(path, backend, page_workers, prior=None):
+    # The index tables are located with pdfium's text search, backend is None
+    return extract_indices_incremental(str(path), prior, page_workers)
+
+
+def _with_fallback(parser, path, backend, page_workers):
+    """Parse with backend, retrying with the reference backend if it finds nothing."""
+    result = parser(str(path), get_backend(backend, page_workers))
+    if not result and backend != REFERENCE_BACKEND:
+        print(f"The {backend} backend found nothing, retrying with {REFERENCE_BACKEND}")
+        result = parser(str(path), get_backend(REFERENCE_BACKEND, page_workers))
+    return result
+
+
+def _parse_old_market_index(path, backend, page_workers):
+    return _with_fallback(parse_old_market_index_table, path, backend, page_workers)
+
+
+def _parse_rajaneliohinta(path, backend, page_workers):
+    return _with_fallback(parse_rajaneliohinta_from_pdf, path, backend, page_workers)
+
+
+# Parser and parser version of each source
+PARSERS = {
+    "indices": (_parse_indices, PARSER_VERSION),
+    "old_market_index": (_parse_old_market_index, OLD_INDEX_PARSER_VERSION),
+    "rajaneliohinta": (_parse_rajaneliohinta, RAJAHINTA_PARSER_VERSION),
+}
+
+
+def _run_parser(name, path, backend, page_workers, *args):
+    """Run the parser of one source on its cached body; returns (result, seconds)."""
+    start = time.perf_counter()
+    parser, _ = PARSERS[name]
+    result = parser(path, backend, page_workers, *args)
+    return result, time.perf_counter() - start
+
+
+def parse_sources(
+    sources,
+    timings=None,
+    workers=len(SOURCES),
+    use_cache=True,
+    parser_args=None,
+    backend=None,
+    page_workers=1,
+):
+    """
+    Parse the downloaded PDFs in a process pool. Parsing is CPU-bound, so
+    the pool is capped at the number of CPUs and skipped entirely on one.
+    Results found in the parse cache are reused without opening the PDF.
+    parser_args maps source names to extra arguments for their parser.
+    backend forces a PDF backend; by default each source uses the one
+    selected by benchmark_pdf_backends.py (see pdf_backends.select_backend).
+    page_workers > 1 additionally splits each PDF into page shards parsed
+    in their own process pool.
+    Returns {name: parsed result}, with None for sources that were not
+    downloaded or whose parser raised.
+    """
+    timings = {} if timings is None else timings
+    parser_args = parser_args or {}
+
+    results = {}
+    cached = {}
+    if use_cache:
+        for name, _ in SOURCES:
+            if sources.get(name):
+                _, version = PARSERS[name]
+                result = parse_cache.get(name, version, sources[name].sha256)
+                if result is not None:
+                    print(f"Using cached parse result for {name}")
+                    run_metrics.count("parse_cache_hits")
+                    cached[name] = result
+
+    available = [
+        name for name, _ in SOURCES if sources.get(name) and name not in cached
+    ]
+    workers = max(1, min(workers, len(available), os.cpu_count() or 1))
+
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+    else:
+        executor = _CurrentThreadExecutor()
+
+    backends = {
+        name: select_backend(name, backend) if name in BACKEND_SOURCES else None
+        for name in available
+    }
+    with executor:
+        futures = {
+            name: executor.submit(
+                _run_parser,
+                name,
+                str(sources[name].path),
+                backends[name],
+                page_workers,
+                *parser_args.get(name, ()),
+            )
+            for name in available
+        }
+
+    for name, _ in SOURCES:
+        results[name] = cached.get(name)
+        if name not in futures:
+            continue
+        try:
+            results[name], timings[f"parse {name}"] = futures[name].result()
+        except Exception as e:
+            print(f"Error parsing {name}: {e}")
+            run_metrics.count("parse_errors")
+            continue
+        attrs = {"backend": backends[name]} if backends[name] else {}
+        run_metrics.record(f"parse {name}", timings[f"parse {name}"], **attrs)
+        run_metrics.count("pages_parsed", page_count(str(sources[name].path)))
+        if use_cache:
+            _, version = PARSERS[name]
+            parse_cache.put(name, version, sources[name].sha256, results[name])
+    return results
+
+
+def _row_count(table):
+    """Number of monthly values in a {year: {month: value}} table."""
+    return sum(len(months) for months in (table or {}).values())
+
+
+def sources_unchanged(results, latest):
+    """
+    Check whether every source PDF is identical to the ones the current
+    snapshot was built from, in which case parsing can be skipped.
+    """
+    if not latest or not latest.get("sources"):
+        return False
+
+    for name, _ in SOURCES:
+        result = results.get(name)
+        if result is None or latest["sources"].get(name) != result.sha256:
+            return False
+    return True
+
+
+def _row_year(line):
+    """Return the year a table row starts with, or None for other lines."""
+    first = line.split(maxsplit=1)[:1]
+    if not first or not first[0].isdigit():
+        return None
+
+    year = int(first[0])
+    return year if 2005 <= year <= 2100 else None  # Reasonable year range
+
+
+def parse_index_row(line):
+    """
+    Parse one table row ("2025 151.50 151.70 ... (153.70)").
+    Returns (year, {month: value}, [provisional months]) or None if the line
+    is not a table row.
+    """
+    parts = line.split()
+    if len(parts) < 2:
+        return None
+
+    year = _row_year(line)
+    if year is None:
+        # Not a valid year line
+        return None
+
+    # Parse monthly values (skip the year)
+    months = {}
+    provisional = []
+    month = 1
+    for value_str in parts[1:]:
+        is_provisional = value_str.startswith("(") and value_str.endswith(")")
+        if is_provisional:
+            # Provisional value in parentheses
+            value_str = value_str[1:-1]
+
+        try:
+            months[month] = float(value_str)
+        except ValueError:
+            # Not a valid number, skip
+            continue
+
+        if is_provisional:
+            provisional.append(month)
+        month += 1
+
+    return year, months, provisional
+
+
 def parse_index_table(text, index_name):
     """Parse index table from text content."""
     indices = {}
@@ -67,63 +373,295 @@ def parse_index_table(text, index_name):
             continue
 
         if in_table:
-            # Try to parse year and monthly values
-            parts = line.split()
-            if len(parts) >= 2:
-                try:
-                    year = int(parts[0])
-                    if 2005 <= year <= 2100:  # Reasonable year range
-                        indices[year] = {}
-
-                        # Parse monthly values (skip the year)
-                        month = 1
-                        for value_str in parts[1:]:
-                            if value_str.startswith("(") and value_str.endswith(")"):
-                                # Provisional value in parentheses
-                                value_str = value_str[1:-1]
-
-                            try:
-                                value = float(value_str)
-                                indices[year][month] = value
-                                month += 1
-                            except ValueError:
-                                # Not a valid number, skip
-                                pass
-                except ValueError:
-                    # Not a valid year line
-                    pass
+            row = parse_index_row(line)
+            if row:
+                year, months, _ = row
+                indices[year] = months
 
     return indices
 
 
+def _find_boxes(textpage, term):
+    """Return the (left, bottom, right, top) box of each match of term."""
+    boxes = []
+    searcher = textpage.search(term, match_case=True)
+    match = searcher.get_next()
+    while match:
+        boxes.append(textpage.get_charbox(match[0]))
+        match = searcher.get_next()
+    searcher.close()
+    return boxes
+
+
+def _index_regions(pdf_data, pages=None, state=None):
+    """
+    Yield (section, text) for the index tables on pages (default: all).
+    state["section"] is the current section title, carried from page to
+    page; tables above the first title of the range get the section the
+    state starts with (None when reading a shard, see below).
+    """
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(pdf_data)
+    state = {"section": None} if state is None else state
+
+    try:
+        for page_index in range(len(pdf)) if pages is None else pages:
+            page = pdf[page_index]
+            textpage = page.get_textpage()
+            width, _ = page.get_size()
+
+            # (top, kind, title) markers sorted from the top of the page down
+            markers = [
+                (box[3], "title", title)
+                for title in INDEX_SECTIONS
+                for box in _find_boxes(textpage, title)
+            ]
+            markers += [(box[3], "header", None) for box in _find_boxes(textpage, "Vuosi/kk")]
+            markers += [(box[3], "end", None) for box in _find_boxes(textpage, "Lähde:")]
+            markers.sort(key=lambda marker: -marker[0])
+
+            for i, (top, kind, title) in enumerate(markers):
+                if kind == "title":
+                    state["section"] = title
+                elif kind == "header":
+                    bottom = next(
+                        (
+                            other_top
+                            for other_top, other_kind, _ in markers[i + 1 :]
+                            if other_kind != "title"
+                        ),
+                        0,
+                    )
+                    yield state["section"], textpage.get_text_bounded(
+                        left=0, bottom=bottom, right=width, top=top + 1
+                    )
+
+            textpage.close()
+            page.close()
+    finally:
+        pdf.close()
+
+
+def _index_regions_shard(path, pages):
+    """The tables of one page shard, plus the section in force after it."""
+    state = {"section": None}
+    regions = list(_index_regions(path, pages, state))
+    return regions, state["section"]
+
+
+def iter_index_table_regions(pdf_data, workers=1):
+    """
+    Locate the index tables and yield (section, text) for each of them.
+
+    Section titles, "Vuosi/kk" headers and "Lähde:" lines are found with
+    pdfium's text search, and only the band between a header and the next
+    source line is extracted. A table belongs to the closest section title
+    above it, carried over from previous pages if needed.
+
+    With workers > 1 and a path, page shards are searched in parallel. A
+    shard cannot see the titles on earlier pages, so its leading tables come
+    back without a section; merging the shards in page order gives them the
+    section in force at the end of the previous shard.
+    """
+    if workers > 1 and isinstance(pdf_data, (str, Path)):
+        carried = None
+        for regions, last_section in map_page_shards(_index_regions_shard, pdf_data, workers):
+            for section, text in regions:
+                if section or carried:
+                    yield section or carried, text
+            carried = last_section or carried
+        return
+
+    for section, text in _index_regions(pdf_data):
+        # A table above every section title is not an index table
+        if section:
+            yield section, text
+
+
+def prior_index_tables(snapshot):
+    """
+    Convert a published snapshot into the prior state for incremental
+    parsing: {section: ({year: {month: value}}, {year: [provisional months]})}.
+    Returns None for snapshots written before provisional flags existed,
+    since their settled values cannot be told apart.
+    """
+    if not snapshot or "provisional" not in snapshot:
+        return None
+
+    prior = {}
+    for section, key in INDEX_SECTIONS.items():
+        values = {
+            int(year): {int(month): value for month, value in months.items()}
+            for year, months in snapshot.get(key, {}).items()
+        }
+        provisional = {
+            int(year): list(months)
+            for year, months in snapshot["provisional"].get(key, {}).items()
+        }
+        prior[section] = (values, provisional)
+    return prior
+
+
+def _rows_checksum(table, years):
+    """Checksum of the given rows of a {year: {month: value}} table."""
+    rows = {str(year): table.get(year) for year in sorted(years)}
+    return hashlib.sha256(
+        json.dumps(rows, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def _parse_table_lines(lines, prior, sample_seed):
+    """
+    Parse the lines of one index table.
+
+    Without a prior state every row is parsed. With one, only the rows that
+    can still change (the two newest years and any year with provisional
+    values) are parsed; older rows keep the prior values after a sampled
+    checksum of HISTORY_SAMPLE_SIZE rows matches. Any mismatch falls back
+    to parsing the full table.
+    Returns ({year: {month: value}}, {year: [provisional months]}).
+    """
+    table = {}
+    provisional = {}
+
+    if prior:
+        prior_values, prior_provisional = prior
+        cutoff = min([max(prior_values, default=0) - 1, *prior_provisional])
+    else:
+        cutoff = 0
+
+    history = []
+    for line in lines:
+        year = _row_year(line)
+        if year is None:
+            continue
+        if year < cutoff:
+            # Settled history: only the year is looked at here
+            history.append((year, line))
+            continue
+
+        row = parse_index_row(line)
+        if row:
+            year, months, provisional_months = row
+            table[year] = months
+            if provisional_months:
+                provisional[year] = provisional_months
+
+    if not history:
+        return table, provisional
+
+    history_years = [year for year, _ in history]
+    sample = random.Random(sample_seed).sample(
+        history_years, min(HISTORY_SAMPLE_SIZE, len(history_years))
+    )
+    sampled = {}
+    for year, line in history:
+        if year in sample:
+            sampled[year] = parse_index_row(line)[1]
+
+    settled_years = {year for year in prior_values if year < cutoff}
+    if set(history_years) == settled_years and _rows_checksum(
+        sampled, sample
+    ) == _rows_checksum(prior_values, sample):
+        for year in history_years:
+            table[year] = dict(prior_values[year])
+        return table, provisional
+
+    print("Warning: history rows differ from the previous snapshot, parsing all rows")
+    for year, line in history:
+        year, months, provisional_months = parse_index_row(line)
+        table[year] = months
+        if provisional_months:
+            provisional[year] = provisional_months
+    return table, provisional
+
+
+def _extract_index_tables(pdf_data, prior=None, sample_seed=None, workers=1):
+    """
+    Extract both index tables from PDF.
+    Only the table regions are read; workers > 1 reads page shards in
+    parallel. The regions of a table that spans pages are joined before
+    parsing, so the settled history is checked against the whole table.
+    Returns ({section: table}, {section: {year: [provisional months]}}).
+    """
+    tables = {section: {} for section in INDEX_SECTIONS}
+    provisional = {section: {} for section in INDEX_SECTIONS}
+    if sample_seed is None:
+        sample_seed = date.today().toordinal()
+
+    lines = {section: [] for section in INDEX_SECTIONS}
+    for section, text in iter_index_table_regions(pdf_data, workers):
+        lines[section].extend(text.splitlines())
+
+    for section, section_lines in lines.items():
+        table, flags = _parse_table_lines(
+            section_lines, prior.get(section) if prior else None, sample_seed
+        )
+        tables[section].update(table)
+        provisional[section].update(flags)
+
+    for section, table in tables.items():
+        if table:
+            print(f"Parsed {section}: {len(table)} years")
+
+    return tables, provisional
+
+
 def extract_indices_from_pdf(pdf_data):
     """Extract both index tables from PDF."""
+    print("Parsing PDF...")
+    tables, _ = _extract_index_tables(pdf_data)
+    return tables["Rakennuskustannusindeksi"], tables["Markkinahintaindeksi"]
+
+
+def extract_indices_incremental(pdf_data, prior=None, workers=1):
+    """
+    Extract both index tables plus their provisional months.
+    prior comes from prior_index_tables(); when given, settled history is
+    taken from it and only the newest rows are parsed. workers > 1 reads
+    the pages of a PDF given as a path in parallel.
+    Returns (rakennuskustannus, markkinahinta, provisional) where
+    provisional is {series_key: {year: [months]}}.
+    """
+    print("Parsing PDF" + (" incrementally..." if prior else "..."))
+    tables, flags = _extract_index_tables(pdf_data, prior, workers=workers)
+    provisional = {key: flags[section] for section, key in INDEX_SECTIONS.items()}
+    return (
+        tables["Rakennuskustannusindeksi"],
+        tables["Markkinahintaindeksi"],
+        provisional,
+    )
+
+
+def extract_indices_full_text(pdf_data, backend=None):
+    """
+    Extract both index tables from the full text of every page.
+    This is the original pdfplumber parser, kept as a reference for
+    benchmarks and parity checks; backend selects another pdf_backends
+    backend for the text.
+    """
     rakennuskustannus = {}
     markkinahinta = {}
 
-    print("Parsing PDF...")
-
-    with pdfplumber.open(pdf_data) as pdf:
-        full_text = ""
-        for page in pdf.pages:
-            full_text += page.extract_text() + "\n"
-
-        # Split into sections
-        sections = full_text.split("Rakennuskustannusindeksi")
-        if len(sections) > 1:
-            # First section after "Rakennuskustannusindeksi" contains the table
-            rakennuskustannus_section = sections[1].split("Markkinahintaindeksi")[0]
-            rakennuskustannus = parse_index_table(
-                rakennuskustannus_section, "Rakennuskustannus"
-            )
-            print(f"Parsed Rakennuskustannusindeksi: {len(rakennuskustannus)} years")
+    full_text = ""
+    for text in get_backend(backend).page_texts(pdf_data):
+        full_text += text + "\n"
+
+    # Split into sections
+    sections = full_text.split("Rakennuskustannusindeksi")
+    if len(sections) > 1:
+        # First section after "Rakennuskustannusindeksi" contains the table
+        rakennuskustannus_section = sections[1].split("Markkinahintaindeksi")[0]
+        rakennuskustannus = parse_index_table(
+            rakennuskustannus_section, "Rakennuskustannus"
+        )
 
-        sections = full_text.split("Markkinahintaindeksi")
-        if len(sections) > 1:
-            # Section after "Markkinahintaindeksi"
-            markkinahinta_section = sections[1]
-            markkinahinta = parse_index_table(markkinahinta_section, "Markkinahinta")
-            print(f"Parsed Markkinahintaindeksi: {len(markkinahinta)} years")
+    sections = full_text.split("Markkinahintaindeksi")
+    if len(sections) > 1:
+        # Section after "Markkinahintaindeksi"
+        markkinahinta_section = sections[1]
+        markkinahinta = parse_index_table(markkinahinta_section, "Markkinahinta")
 
     return rakennuskustannus, markkinahinta
 
@@ -134,15 +672,18 @@ def create_json_file(
     old_market_index,
     rajaneliohinta,
     rajaneliohinta_tilasto,
+    sources=None,
+    provisional=None,
+    data_dir=DATA_DIR,
 ):
-    """Create JSON file with current date in filename."""
+    """
+    Publish the indices into the content-addressed snapshot store.
+    A new JSON file is written only when the data differs from the current
+    snapshot; latest.json always points to the current one.
+    """
     from datetime import datetime
 
     today = datetime.now().strftime("%Y-%m-%d")
-    json_filename = f"indices-{today}.json"
-    json_path = Path(__file__).parent.parent / "public" / "data" / json_filename
-
-    print(f"Creating {json_path}...")
 
     # Convert all keys to strings for JSON compatibility
     data = {
@@ -161,6 +702,13 @@ def create_json_file(
         },
     }
 
+    # Provisional (parenthesised) months of each index, {series: {year: [months]}}
+    if provisional is not None:
+        data["provisional"] = {
+            key: {str(year): sorted(months) for year, months in years.items()}
+            for key, years in provisional.items()
+        }
+
     # Add rajaneliöhinta if available
     if rajaneliohinta:
         data["rajaneliohinta"] = rajaneliohinta
@@ -172,13 +720,44 @@ def create_json_file(
             for year, months in rajaneliohinta_tilasto.items()
         }
 
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Multipliers for O(1) pricing, published next to the snapshot
+    with run_metrics.span("write ratio tables"):
+        write_ratio_tables(data, data_dir)
 
-    print(f"JSON file created: {json_filename}")
+    # Downsampled series and placeholder images for the graphs page
+    with run_metrics.span("write chart series"):
+        write_chart_series(data, data_dir)
+        update_placeholders(data, data_dir)
+
+    with run_metrics.span("publish snapshot"):
+        json_filename, changed = publish_snapshot(data, data_dir, sources=sources)
+    with run_metrics.span("update history"):
+        update_history(data, today, data_dir)
+
+    if changed:
+        print(f"JSON file created: {json_filename}")
+    else:
+        print(f"Indices unchanged, keeping {json_filename}")
     return json_filename
 
 
+def refresh_ratio_tables():
+    """
+    Rebuild ratios.json when a later index value has become current since it
+    was written. Needed on runs that skip parsing, as the tables depend on
+    the date as well as on the data.
+    """
+    snapshot = load_snapshot()
+    if not snapshot or not is_stale(load_ratio_tables(), snapshot):
+        return False
+
+    print("Ratio tables are out of date, rebuilding them")
+    write_ratio_tables(snapshot)
+    refresh_manifest()
+    compress_published()
+    return True
+
+
 def update_html_reference(json_filename):
     """
     Update HTML to reference the new JSON file.
@@ -190,40 +769,149 @@ def update_html_reference(json_filename):
     return True
 
 
-def main():
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Update HITAS indices.")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="parse and publish even if the source PDFs are unchanged",
+    )
+    parser.add_argument(
+        "--no-parse-cache",
+        action="store_true",
+        help="always parse the PDFs, ignoring and not updating the parse cache",
+    )
+    parser.add_argument(
+        "--clear-parse-cache",
+        action="store_true",
+        help="delete all cached parse results before running",
+    )
+    parser.add_argument(
+        "--full-parse",
+        action="store_true",
+        help="parse every table row instead of only the rows that can change",
+    )
+    parser.add_argument(
+        "--serial",
+        action="store_true",
+        help="download and parse one source at a time",
+    )
+    parser.add_argument(
+        "--pdf-backend",
+        choices=["auto", *BACKENDS],
+        default="auto",
+        help="PDF text backend (default: the fastest one that passed the parity check)",
+    )
+    parser.add_argument(
+        "--page-workers",
+        type=int,
+        default=1,
+        help="parse the pages of each PDF in this many processes (default 1)",
+    )
+    parser.add_argument("--report", help="write a JSON run report (spans, counters)")
+    parser.add_argument("--openmetrics", help="write the run metrics as OpenMetrics text")
+    parser.add_argument(
+        "--profile",
+        choices=run_metrics.PROFILE_KINDS,
+        help="profile the run with cProfile (cpu) or tracemalloc (memory)",
+    )
+    parser.add_argument(
+        "--profile-output", help="profile file (default .cache/profile/update-<time>)"
+    )
+    return parser.parse_args(argv)
+
+
+def print_timings(timings):
+    """Print the wall-clock time of each stage."""
+    print("\n" + "=" * 50)
+    print("TIMINGS")
+    print("=" * 50)
+    for stage, seconds in timings.items():
+        print(f"{stage:<30} {seconds:8.3f} s")
+
+
+def main(argv=None):
     """Main function."""
+    args = parse_args(argv)
+    metrics = run_metrics.RunMetrics()
+    status = None
+    try:
+        with run_metrics.recording(metrics):
+            with run_metrics.profiled(args.profile, args.profile_output):
+                status = update(args)
+        return status
+    finally:
+        # Written even when the run fails, with status null on an exception
+        if args.report:
+            metrics.write_report(args.report, status)
+            print(f"Run report written to {args.report}")
+        if args.openmetrics:
+            metrics.write_openmetrics(args.openmetrics, status)
+
+
+def update(args):
+    """Run the update with parsed command line arguments; returns the exit code."""
+    workers = 1 if args.serial else len(SOURCES)
+    timings = {}
+    run_start = time.perf_counter()
+
     print("HITAS Index Updater")
     print("=" * 50)
 
-    # Download PDF
-    pdf_data = download_pdf()
-    if not pdf_data:
+    if args.clear_parse_cache:
+        print(f"Cleared {parse_cache.clear()} cached parse results")
+
+    # Download PDFs (conditional requests against the HTTP cache)
+    with timed("fetch (wall clock)", timings):
+        sources = fetch_sources(timings, workers)
+    if not sources["indices"]:
         print("Error: Failed to download PDF")
         return 1
 
-    # Extract indices
-    rakennuskustannus, markkinahinta = extract_indices_from_pdf(pdf_data)
+    if not args.force and sources_unchanged(sources, load_latest()):
+        print("\nSource PDFs unchanged since the last update, nothing to parse")
+        refresh_ratio_tables()
+        if refresh_chart_series():
+            compress_published()
+        snapshot = load_snapshot()
+        if snapshot:
+            update_history(snapshot)
+        timings["total"] = time.perf_counter() - run_start
+        print_timings(timings)
+        return 0
 
+    # Parse all PDFs; a failing source only drops that source
+    print("\n" + "=" * 50)
+    print("Parsing source PDFs...")
+    print("=" * 50)
+    prior = None if args.full_parse else prior_index_tables(load_snapshot())
+    with timed("parse (wall clock)", timings):
+        parsed = parse_sources(
+            sources,
+            timings,
+            workers,
+            use_cache=not args.no_parse_cache,
+            parser_args={"indices": (prior,)},
+            backend=args.pdf_backend,
+            page_workers=args.page_workers,
+        )
+
+    rakennuskustannus, markkinahinta, provisional = parsed["indices"] or ({}, {}, {})
+    for table in (rakennuskustannus, markkinahinta, parsed["old_market_index"]):
+        run_metrics.count("rows_extracted", _row_count(table))
     if not rakennuskustannus or not markkinahinta:
         print("Error: Failed to extract indices from PDF")
         return 1
 
-    # Get old market index (for apartments before 2011)
-    print("\n" + "=" * 50)
-    print("Fetching old market index (pre-2011)...")
-    print("=" * 50)
-    old_market_index = get_old_market_index()
-
+    # Old market index (for apartments before 2011)
+    old_market_index = parsed["old_market_index"] or {}
     if not old_market_index:
         print("Warning: Failed to get old market index")
         print("Continuing without old market index data...")
 
-    # Get rajaneliöhinta (price floor for all HITAS apartments)
-    print("\n" + "=" * 50)
-    print("Fetching rajaneliöhinta...")
-    print("=" * 50)
-    rajaneliohinta = get_rajaneliohinta()
-
+    # Rajaneliöhinta (price floor for all HITAS apartments)
+    rajaneliohinta = parsed["rajaneliohinta"]
     if not rajaneliohinta:
         print("Warning: Failed to get rajaneliöhinta")
         print("Continuing without rajaneliöhinta data...")
@@ -233,9 +921,10 @@ def main():
     print("\n" + "=" * 50)
     print("Fetching rajaneliöhinta tilasto (historical data)...")
     print("=" * 50)
-    rajaneliohinta_tilasto = get_rajaneliohinta_tilasto(
-        current_rajaneliohinta=rajaneliohinta if rajaneliohinta else None
-    )
+    with timed("rajaneliöhinta tilasto", timings):
+        rajaneliohinta_tilasto = get_rajaneliohinta_tilasto(
+            current_rajaneliohinta=rajaneliohinta if rajaneliohinta else None
+        )
 
     if not rajaneliohinta_tilasto:
         print("Warning: Failed to get rajaneliöhinta tilasto")
@@ -280,13 +969,26 @@ def main():
     print("=" * 50)
 
     # Create JSON file
-    json_filename = create_json_file(
-        rakennuskustannus,
-        markkinahinta,
-        old_market_index if old_market_index else {},
-        rajaneliohinta if rajaneliohinta else None,
-        rajaneliohinta_tilasto if rajaneliohinta_tilasto else None,
-    )
+    with timed("write", timings):
+        json_filename = create_json_file(
+            rakennuskustannus,
+            markkinahinta,
+            old_market_index if old_market_index else {},
+            rajaneliohinta if rajaneliohinta else None,
+            rajaneliohinta_tilasto if rajaneliohinta_tilasto else None,
+            sources={
+                name: result.sha256 for name, result in sources.items() if result
+            },
+            provisional=provisional,
+        )
+
+    # Pre-compressed copies for servers and mirrors that can use them
+    with timed("compress", timings):
+        size_report = compress_published()
+    print_size_report(size_report)
+
+    timings["total"] = time.perf_counter() - run_start
+    print_timings(timings)
 
     # Update HTML reference
     if update_html_reference(json_filename):